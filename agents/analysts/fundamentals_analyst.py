@@ -6,7 +6,7 @@ from core.llm_interface import LLMInterface
 from dataflows.interface import DataInterface
 import pandas as pd
 
-def run_fundamentals_analyst(state: AgentState, llm: LLMInterface) -> AgentState:
+def run_fundamentals_analyst(state: AgentState, llm: LLMInterface) -> dict:
     """
     Runs the fundamentals analyst agent. This agent fetches financial data
     and uses the LLM to generate an analysis report.
@@ -16,20 +16,25 @@ def run_fundamentals_analyst(state: AgentState, llm: LLMInterface) -> AgentState
         llm (LLMInterface): The language model interface to use for analysis.
         
     Returns:
-        AgentState: The updated state with the new analysis report.
+        dict: The state update: the new analysis report and its log entry.
     """
     stock_symbol = state['stock_symbol']
     print(f"--- Running Fundamentals Analyst for {stock_symbol} ---")
     
     # 1. Fetch data using the unified interface
-    data_interface = DataInterface()
+    data_interface = DataInterface(as_of_date=state.get('as_of_date'))
+    unavailable = data_interface.unavailable_sources(['finnhub'])
+    if unavailable:
+        log_message = f"Fundamentals Analyst: Skipping {stock_symbol} in {data_interface.degraded_note(unavailable)}."
+        print(log_message)
+        return {"workflow_log": [log_message]}
+
     fundamentals = data_interface.get_financial_fundamentals(stock_symbol)
     
     if not fundamentals:
         log_message = f"Fundamentals Analyst: No fundamental data found for {stock_symbol}. Skipping."
         print(log_message)
-        state['workflow_log'].append(log_message)
-        return state
+        return {"workflow_log": [log_message]}
 
     # 2. Construct a detailed prompt
     prompt = f"""
@@ -67,16 +72,13 @@ def run_fundamentals_analyst(state: AgentState, llm: LLMInterface) -> AgentState
         response = llm.invoke(prompt)
         report = f"## Fundamental Analysis Report for {stock_symbol}\n\n{response}"
         
-        # 4. Update the state
-        state['analyst_reports'].append(report)
+        # 4. Return the state update
         log_message = f"Fundamentals Analyst: Successfully generated report for {stock_symbol}."
         print(log_message)
-        state['workflow_log'].append(log_message)
+        return {"analyst_reports": [report], "workflow_log": [log_message]}
         
     except Exception as e:
         error_message = f"Fundamentals Analyst: Failed to get analysis from LLM. Error: {e}"
         print(error_message)
-        state['workflow_log'].append(error_message)
-
-    return state
+        return {"workflow_log": [error_message]}
 
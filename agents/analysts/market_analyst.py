@@ -6,7 +6,7 @@ from core.llm_interface import LLMInterface
 from dataflows.interface import DataInterface
 import pandas as pd
 
-def run_market_analyst(state: AgentState, llm: LLMInterface) -> AgentState:
+def run_market_analyst(state: AgentState, llm: LLMInterface) -> dict:
     """
     Runs the market analyst agent. This agent fetches historical price data
     and technical indicators, then uses the LLM to generate a technical analysis report.
@@ -16,25 +16,32 @@ def run_market_analyst(state: AgentState, llm: LLMInterface) -> AgentState:
         llm (LLMInterface): The language model interface for analysis.
         
     Returns:
-        AgentState: The updated state with the new technical analysis report.
+        dict: The state update: the new technical analysis report and its log entry.
     """
     stock_symbol = state['stock_symbol']
     print(f"--- Running Market Analyst for {stock_symbol} ---")
 
     # 1. Fetch data
-    data_interface = DataInterface()
+    data_interface = DataInterface(as_of_date=state.get('as_of_date'))
+
+    # Historical runs read the local price snapshot, so only live runs depend on Yahoo
+    unavailable = [] if state.get('as_of_date') else data_interface.unavailable_sources(['yahoo'])
+    if unavailable:
+        log_message = f"Market Analyst: Skipping {stock_symbol} in {data_interface.degraded_note(unavailable)}."
+        print(log_message)
+        return {"workflow_log": [log_message]}
+
     historical_data = data_interface.get_historical_data(stock_symbol, period="3mo")
     
     if historical_data.empty:
         log_message = f"Market Analyst: No historical data found for {stock_symbol}. Skipping."
         print(log_message)
-        state['workflow_log'].append(log_message)
-        return state
+        return {"workflow_log": [log_message]}
 
     data_with_indicators = data_interface.add_technical_indicators(historical_data)
 
     # 2. Construct a detailed prompt
-    recent_data_str = data_with_indicators.tail(15).to_string()
+    recent_data_str = data_interface.encode_indicators(data_with_indicators, rows=15)
     
     prompt = f"""
     You are a quantitative analyst specializing in technical analysis.
@@ -46,8 +53,9 @@ def run_market_analyst(state: AgentState, llm: LLMInterface) -> AgentState:
     2.  **MACD Analysis**: Interpret the MACD, signal line ('macds'), and histogram ('macdh'). Is it showing bullish or bearish momentum? Are there any crossovers?
     3.  **RSI Analysis**: Interpret the 14-day RSI ('rsi_14'). Is the stock overbought (above 70), oversold (below 30), or in a neutral range?
     4.  **Overall Conclusion**: Provide a brief, neutral summary of the technical outlook based *only* on the data provided.
+    5.  **Technical Bias**: A single-word rating of the technical picture. Choose from: **Bullish**, **Bearish**, or **Neutral**.
 
-    **Recent Data for {stock_symbol}:**
+    **Recent Data for {stock_symbol}** (derived summary, then one row per session):
     {recent_data_str}
 
     Generate the report.
@@ -59,15 +67,12 @@ def run_market_analyst(state: AgentState, llm: LLMInterface) -> AgentState:
         response = llm.invoke(prompt)
         report = f"## Technical Analysis Report for {stock_symbol}\n\n{response}"
         
-        # 4. Update the state
-        state['analyst_reports'].append(report)
+        # 4. Return the state update
         log_message = f"Market Analyst: Successfully generated report for {stock_symbol}."
         print(log_message)
-        state['workflow_log'].append(log_message)
+        return {"analyst_reports": [report], "workflow_log": [log_message]}
         
     except Exception as e:
         error_message = f"Market Analyst: Failed to get analysis from LLM. Error: {e}"
         print(error_message)
-        state['workflow_log'].append(error_message)
-
-    return state
+        return {"workflow_log": [error_message]}
@@ -4,9 +4,10 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..',
 from graph.state import AgentState
 from core.llm_interface import LLMInterface
 from dataflows.interface import DataInterface
+from config.default_config import Config
 import pandas as pd
 
-def run_news_analyst(state: AgentState, llm: LLMInterface) -> AgentState:
+def run_news_analyst(state: AgentState, llm: LLMInterface) -> dict:
     """
     Runs the news analyst agent. This agent fetches company and general news,
     and uses the LLM to generate a summarized report with a sentiment score.
@@ -16,30 +17,41 @@ def run_news_analyst(state: AgentState, llm: LLMInterface) -> AgentState:
         llm (LLMInterface): The language model interface for analysis.
         
     Returns:
-        AgentState: The updated state with the new news analysis report.
+        dict: The state update: the new news analysis report and its log entry.
     """
     stock_symbol = state['stock_symbol']
     print(f"--- Running News Analyst for {stock_symbol} ---")
     
     # 1. Fetch data
-    data_interface = DataInterface()
+    data_interface = DataInterface(as_of_date=state.get('as_of_date'))
+
+    # Either news provider is enough; only skip when both are failing fast
+    workflow_log = []
+    unavailable = data_interface.unavailable_sources(['finnhub', 'google_news'])
+    if unavailable:
+        skipping = len(unavailable) == 2
+        log_message = f"News Analyst: {'Skipping' if skipping else 'Continuing with'} {stock_symbol} in {data_interface.degraded_note(unavailable)}."
+        print(log_message)
+        workflow_log.append(log_message)
+        if skipping:
+            return {"workflow_log": workflow_log}
+
     company_name = data_interface.get_financial_fundamentals(stock_symbol).get('name', stock_symbol)
     
-    company_news = data_interface.get_company_news(stock_symbol)
-    google_news = data_interface.get_google_news(f"{company_name} stock")
+    # Syndicated copies of a story are collapsed, so fetch a wider window than the prompt shows
+    recent_news = data_interface.get_recent_news(stock_symbol, company_name, n=Config.NEWS_PROMPT_ITEMS * 5)
     
-    if company_news.empty and google_news.empty:
+    if recent_news.empty:
         log_message = f"News Analyst: No news found for {stock_symbol}. Skipping."
         print(log_message)
-        state['workflow_log'].append(log_message)
-        return state
+        return {"workflow_log": workflow_log + [log_message]}
 
-    # 2. Combine and format news headlines for the prompt
-    all_headlines = []
-    if not company_news.empty:
-        all_headlines.extend(f"- {h} (Source: {s})" for h, s in zip(company_news['headline'], company_news['source']))
-    if not google_news.empty:
-        all_headlines.extend(f"- {h} (Source: {s})" for h, s in zip(google_news['title'], google_news['source']))
+    # 2. Collapse near-duplicates and format the newest distinct stories for the prompt
+    stories = data_interface.collapse_news_duplicates(recent_news).head(Config.NEWS_PROMPT_ITEMS)
+    all_headlines = [
+        f"- {h} (Source: {s})" if n == 1 else f"- {h} (Sources: {s}; {n} reports)"
+        for h, s, n in zip(stories['headline'], stories['sources'], stories['cluster_size'])
+    ]
     
     news_string = "\n".join(all_headlines)
 
@@ -64,15 +76,12 @@ def run_news_analyst(state: AgentState, llm: LLMInterface) -> AgentState:
         response = llm.invoke(prompt)
         report = f"## News Analysis Report for {stock_symbol}\n\n{response}"
         
-        # 5. Update the state
-        state['analyst_reports'].append(report)
+        # 5. Return the state update
         log_message = f"News Analyst: Successfully generated report for {stock_symbol}."
         print(log_message)
-        state['workflow_log'].append(log_message)
+        return {"analyst_reports": [report], "workflow_log": workflow_log + [log_message]}
         
     except Exception as e:
         error_message = f"News Analyst: Failed to get analysis from LLM. Error: {e}"
         print(error_message)
-        state['workflow_log'].append(error_message)
-
-    return state
+        return {"workflow_log": workflow_log + [error_message]}
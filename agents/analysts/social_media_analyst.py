@@ -6,7 +6,10 @@ from core.llm_interface import LLMInterface
 from dataflows.interface import DataInterface
 import pandas as pd
 
-def run_social_media_analyst(state: AgentState, llm: LLMInterface) -> AgentState:
+# Subreddits scanned for retail sentiment; shared with batch watchlist registration
+REDDIT_SUBREDDITS = ['wallstreetbets', 'stocks', 'investing']
+
+def run_social_media_analyst(state: AgentState, llm: LLMInterface) -> dict:
     """
     Runs the social media analyst agent. This agent fetches Reddit posts and uses
     the LLM to determine the overall retail investor sentiment.
@@ -16,23 +19,28 @@ def run_social_media_analyst(state: AgentState, llm: LLMInterface) -> AgentState
         llm (LLMInterface): The language model interface for analysis.
         
     Returns:
-        AgentState: The updated state with the new social media analysis report.
+        dict: The state update: the new social media analysis report and its log entry.
     """
     stock_symbol = state['stock_symbol']
     print(f"--- Running Social Media Analyst for {stock_symbol} ---")
 
     # 1. Fetch data
-    data_interface = DataInterface()
-    reddit_posts = data_interface.get_reddit_sentiment(
+    data_interface = DataInterface(as_of_date=state.get('as_of_date'))
+    unavailable = data_interface.unavailable_sources(['reddit'])
+    if unavailable:
+        log_message = f"Social Media Analyst: Skipping {stock_symbol} in {data_interface.degraded_note(unavailable)}."
+        print(log_message)
+        return {"workflow_log": [log_message]}
+
+    reddit_posts = data_interface.get_reddit_mentions(
         stock_symbol, 
-        subreddits=['wallstreetbets', 'stocks', 'investing']
+        subreddits=REDDIT_SUBREDDITS
     )
     
     if reddit_posts.empty:
         log_message = f"Social Media Analyst: No Reddit posts found for {stock_symbol}. Skipping."
         print(log_message)
-        state['workflow_log'].append(log_message)
-        return state
+        return {"workflow_log": [log_message]}
 
     # 2. Construct a detailed prompt
     post_titles = "\n".join(f"- {title}" for title in reddit_posts['title'])
@@ -58,15 +66,12 @@ def run_social_media_analyst(state: AgentState, llm: LLMInterface) -> AgentState
         response = llm.invoke(prompt)
         report = f"## Social Media Sentiment Report for {stock_symbol}\n\n{response}"
         
-        # 4. Update the state
-        state['analyst_reports'].append(report)
+        # 4. Return the state update
         log_message = f"Social Media Analyst: Successfully generated report for {stock_symbol}."
         print(log_message)
-        state['workflow_log'].append(log_message)
+        return {"analyst_reports": [report], "workflow_log": [log_message]}
         
     except Exception as e:
         error_message = f"Social Media Analyst: Failed to get analysis from LLM. Error: {e}"
         print(error_message)
-        state['workflow_log'].append(error_message)
-
-    return state
+        return {"workflow_log": [error_message]}
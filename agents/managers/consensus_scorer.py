@@ -0,0 +1,83 @@
+import sys
+import os
+import re
+from typing import Dict, Optional
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from graph.state import AgentState
+from config.default_config import Config
+
+# Report heading, rating field and label scale of each analyst that emits a signal.
+# Scores are normalized to [-1, 1] on each analyst's own scale.
+SIGNAL_SOURCES = {
+    "news": ("## News Analysis Report", "Overall Sentiment",
+             {"positive": 1.0, "neutral": 0.0, "negative": -1.0}),
+    "technical": ("## Technical Analysis Report", "Technical Bias",
+                  {"bullish": 1.0, "neutral": 0.0, "bearish": -1.0}),
+    "social": ("## Social Media Sentiment Report", "Overall Sentiment",
+               {"very bullish": 1.0, "bullish": 0.5, "neutral": 0.0, "bearish": -0.5, "very bearish": -1.0})
+}
+
+def extract_signal(report: str, field: str, scale: Dict[str, float]) -> Optional[str]:
+    """Returns the rating label that follows `field` in a report (e.g. 'Technical Bias: **Bullish**'), or None."""
+    labels = "|".join(sorted((re.escape(label) for label in scale), key=len, reverse=True))
+    match = re.search(rf"{re.escape(field)}[^a-zA-Z]{{0,40}}({labels})\b", report, re.IGNORECASE)
+    return match.group(1).lower() if match else None
+
+def score_consensus(state: AgentState) -> dict:
+    """
+    Scores how strongly the analysts agree.
+
+    Returns:
+        A dict with the parsed 'signals' (label per source, None if missing), their mean
+        normalized 'score' in [-1, 1] (missing signals count as neutral), the 'direction'
+        and the absolute 'strength' of the consensus.
+    """
+    signals, scores = {}, []
+    for source, (heading, field, scale) in SIGNAL_SOURCES.items():
+        report = next((r for r in state.get('analyst_reports') or [] if r.startswith(heading)), None)
+        label = extract_signal(report, field, scale) if report else None
+        signals[source] = label
+        scores.append(scale[label] if label else 0.0)
+
+    score = sum(scores) / len(scores)
+    direction = "bullish" if score > 0 else "bearish" if score < 0 else "mixed"
+    return {"signals": signals, "score": round(score, 3), "direction": direction, "strength": round(abs(score), 3)}
+
+def run_consensus_scorer(state: AgentState) -> dict:
+    """
+    Scores analyst consensus without an LLM call and decides which debates can be
+    skipped: the bull/bear debate at CONSENSUS_SKIP_DEBATE_THRESHOLD and the risk
+    debate at CONSENSUS_SKIP_RISK_DEBATE_THRESHOLD. Returns the state update: the
+    'consensus', its log entry and, when the risk debate is skipped, the note saying so.
+    """
+    stock_symbol = state['stock_symbol']
+    print(f"--- Running Consensus Scorer for {stock_symbol} ---")
+
+    consensus = score_consensus(state)
+    consensus['skip_debate'] = consensus['strength'] >= Config.CONSENSUS_SKIP_DEBATE_THRESHOLD
+    consensus['skip_risk_debate'] = consensus['strength'] >= Config.CONSENSUS_SKIP_RISK_DEBATE_THRESHOLD
+
+    signals = ", ".join(f"{source}={label or 'n/a'}" for source, label in consensus['signals'].items())
+    skipped = [name for name, skip in (("bull/bear debate", consensus['skip_debate']), ("risk debate", consensus['skip_risk_debate'])) if skip]
+    log_message = (
+        f"Consensus Scorer: {signals}; {consensus['direction']} strength {consensus['strength']:.2f}. "
+        + (f"Skipping {' and '.join(skipped)}." if skipped else "Running all debates.")
+    )
+    print(log_message)
+
+    update = {"consensus": consensus, "workflow_log": [log_message]}
+    if consensus['skip_risk_debate']:
+        update['risk_analysis'] = (
+            f"Risk debate skipped: the news, technical and social signals were unanimously "
+            f"{consensus['direction']} (consensus strength {consensus['strength']:.2f})."
+        )
+    return update
+
+def should_debate(state: AgentState) -> str:
+    """Conditional edge after the scorer: 'debate' or 'skip'."""
+    return "skip" if (state.get('consensus') or {}).get('skip_debate') else "debate"
+
+def should_debate_risk(state: AgentState) -> str:
+    """Conditional edge after the research manager: 'debate' or 'skip'."""
+    return "skip" if (state.get('consensus') or {}).get('skip_risk_debate') else "debate"
@@ -0,0 +1,154 @@
+import sys
+import os
+import re
+import json
+from typing import Dict, List
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from graph.state import AgentState
+from core.llm_interface import LLMInterface
+from core.telemetry import instrument_node
+from config.default_config import Config
+from agents.managers.risk_manager import run_risk_manager
+
+DECISION_PATTERN = re.compile(r"^\W*(BUY|HOLD|SELL|AVOID)\b\W*\s*(.*)$", re.IGNORECASE | re.DOTALL)
+
+def _ticker_section(state: AgentState) -> str:
+    return (
+        f"=== {state['stock_symbol']} ===\n"
+        f"**Final Investment Plan:**\n{state.get('investment_plan') or 'Not available.'}\n\n"
+        f"**Risk Debate Arguments:**\n{state.get('risk_analysis') or 'No risk analysis provided.'}\n"
+    )
+
+def chunk_states(states: List[AgentState], max_prompt_chars: int = None, max_symbols: int = None) -> List[List[AgentState]]:
+    """
+    Splits ticker states into chunks whose combined sections fit the prompt budget.
+    A ticker larger than the budget on its own gets a chunk by itself.
+
+    Args:
+        states: Per-ticker states that have finished the risk debate.
+        max_prompt_chars: Character budget for the ticker sections of one prompt.
+        max_symbols: Maximum tickers per chunk, which bounds the output length.
+    """
+    max_prompt_chars = max_prompt_chars or Config.PORTFOLIO_RISK_MAX_PROMPT_CHARS
+    max_symbols = max_symbols or Config.PORTFOLIO_RISK_MAX_SYMBOLS
+    chunks, current, size = [], [], 0
+    for state in states:
+        section_size = len(_ticker_section(state))
+        if current and (size + section_size > max_prompt_chars or len(current) >= max_symbols):
+            chunks.append(current)
+            current, size = [], 0
+        current.append(state)
+        size += section_size
+    if current:
+        chunks.append(current)
+    return chunks
+
+def parse_portfolio_decisions(response: str, symbols: List[str]) -> Dict[str, str]:
+    """
+    Extracts per-symbol decisions from the batched completion.
+
+    Returns:
+        A dict mapping each symbol with a valid decision to its 'DECISION: justification'
+        line. Symbols that are missing or malformed are left out.
+    """
+    match = re.search(r"\{.*\}", response or '', re.DOTALL)
+    if not match:
+        return {}
+    try:
+        data = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+
+    by_symbol = {str(key).strip().upper(): value for key, value in data.items()}
+    decisions = {}
+    for symbol in symbols:
+        value = by_symbol.get(symbol.upper())
+        decision_match = DECISION_PATTERN.match(value) if isinstance(value, str) else None
+        if decision_match:
+            decisions[symbol] = f"{decision_match.group(1).upper()}: {decision_match.group(2).strip()}"
+    return decisions
+
+def _decide_chunk(states: List[AgentState], llm: LLMInterface, fallback_llm: LLMInterface) -> List[AgentState]:
+    symbols = [state['stock_symbol'] for state in states]
+    sections = "\n".join(_ticker_section(state) for state in states)
+
+    prompt = f"""
+    You are the head of risk management at an investment firm.
+    Your decisions are final. For each of the following {len(symbols)} stocks you have been presented with a final investment plan and opposing viewpoints from your team.
+
+    For every stock, produce the "Final Trade Decision". Each decision must be one of the following four options, exactly as written:
+    - **BUY**: The potential reward significantly outweighs the risks.
+    - **HOLD**: The situation is uncertain. Monitor for now, but do not commit new capital.
+    - **SELL**: The risks significantly outweigh the potential reward.
+    - **AVOID**: The asset is too volatile or unpredictable. Do not engage.
+
+    Judge each stock only on its own plan and debate, and give a brief, one-sentence justification for each choice.
+
+    {sections}
+
+    Respond with only a JSON object with one entry per stock symbol ({', '.join(symbols)}) and no other text, for example:
+    {{"{symbols[0]}": "BUY: The strong market position and positive sentiment suggest a high probability of upside."}}
+    """
+
+    print(f"Invoking LLM for final trade decisions on {len(symbols)} symbol(s): {', '.join(symbols)}...")
+    try:
+        decisions = parse_portfolio_decisions(llm.invoke(prompt), symbols)
+    except Exception as e:
+        print(f"Portfolio Risk Manager: Batched call failed. Error: {e}")
+        decisions = {}
+
+    for state in states:
+        symbol = state['stock_symbol']
+        if symbol not in decisions:
+            log_message = f"Portfolio Risk Manager: No valid batched decision for {symbol}. Falling back to a per-symbol call."
+            print(log_message)
+            state['workflow_log'].append(log_message)
+            # The risk manager returns a partial update rather than writing to the state
+            update = run_risk_manager(state, fallback_llm)
+            if 'final_trade_decision' in update:
+                state['final_trade_decision'] = update['final_trade_decision']
+            state['workflow_log'].extend(update.get('workflow_log', []))
+            continue
+        state['final_trade_decision'] = decisions[symbol]
+        log_message = f"Portfolio Risk Manager: Produced the Final Trade Decision for {symbol} in a batch of {len(symbols)}."
+        print(log_message)
+        state['workflow_log'].append(log_message)
+    return states
+
+def run_portfolio_risk_manager(states: List[AgentState], llm: LLMInterface, fallback_llm: LLMInterface = None,
+                               max_prompt_chars: int = None, max_symbols: int = None) -> List[AgentState]:
+    """
+    Makes the final trade decision for many tickers with one LLM request per chunk
+    instead of one per ticker. Tickers whose decision is missing or malformed in the
+    batched response fall back to the per-symbol risk manager.
+
+    Args:
+        states: Per-ticker states that have finished the risk debate.
+        llm: The language model interface for the batched decisions.
+        fallback_llm: The model of the per-symbol fallback, which answers with a single
+                      decision line rather than JSON. Defaults to `llm`.
+        max_prompt_chars: Character budget of one chunk's ticker sections.
+        max_symbols: Maximum tickers per chunk.
+
+    Returns:
+        The same states, each with 'final_trade_decision' set where possible.
+    """
+    fallback_llm = fallback_llm or llm
+    chunks = chunk_states(states, max_prompt_chars, max_symbols)
+    print(f"--- Running Portfolio Risk Manager for {len(states)} symbol(s) in {len(chunks)} request(s) ---")
+    for chunk in chunks:
+        def decide(batch_state):
+            _decide_chunk(chunk, llm, fallback_llm)
+            return batch_state
+
+        # The chunk's metrics are collected once and attached to every ticker in it
+        batch = {"stock_symbol": ",".join(state['stock_symbol'] for state in chunk), "workflow_log": [], "node_metrics": []}
+        instrument_node("portfolio_risk_manager", decide)(batch)
+        summary = dict(batch['node_metrics'][0], batch_size=len(chunk))
+        for state in chunk:
+            state.setdefault('node_metrics', []).append(summary)
+            state['workflow_log'].extend(batch['workflow_log'])
+    return states
@@ -5,9 +5,10 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..',
 from graph.state import AgentState
 from core.llm_interface import LLMInterface
 
-def run_risk_manager(state: AgentState, llm: LLMInterface) -> AgentState:
+def run_risk_manager(state: AgentState, llm: LLMInterface) -> dict:
     """
-    Moderates the risk debate and produces the final trade decision.
+    Moderates the risk debate and produces the final trade decision. Returns the
+    state update: 'final_trade_decision' and its log entry.
     """
     stock_symbol = state['stock_symbol']
     print(f"--- Running Risk Manager for {stock_symbol} ---")
@@ -40,13 +41,10 @@ def run_risk_manager(state: AgentState, llm: LLMInterface) -> AgentState:
     print("Invoking LLM for final trade decision...")
     try:
         response = llm.invoke(prompt)
-        state['final_trade_decision'] = response
         log_message = "Risk Manager: Successfully produced the Final Trade Decision."
         print(log_message)
-        state['workflow_log'].append(log_message)
+        return {"final_trade_decision": response, "workflow_log": [log_message]}
     except Exception as e:
         error_message = f"Risk Manager: Failed to make a final decision. Error: {e}"
         print(error_message)
-        state['workflow_log'].append(error_message)
-            
-    return state
+        return {"workflow_log": [error_message]}
@@ -4,15 +4,19 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..',
 
 from graph.state import AgentState
 from core.llm_interface import LLMInterface
+from agents.researchers.debate_moderator import format_debate_context
 
-def run_bear_researcher(state: AgentState, llm: LLMInterface) -> AgentState:
+def run_bear_researcher(state: AgentState, llm: LLMInterface) -> dict:
     """
-    Constructs a bearish investment argument based on the initial analyst reports.
+    Constructs a bearish investment argument based on the analyst reports, the bull's
+    latest argument and, from the second round on, the rolling debate summary.
+    Returns the state update: the new 'bear_case' and its log entry.
     """
     stock_symbol = state['stock_symbol']
     print(f"--- Running Bear Researcher for {stock_symbol} ---")
     
     reports = "\n\n".join(state['analyst_reports'])
+    debate_context = format_debate_context(state, 'bull_case', 'Bull')
     
     prompt = f"""
     You are a skeptical, bearish financial analyst. Your task is to review the following reports
@@ -24,20 +28,19 @@ def run_bear_researcher(state: AgentState, llm: LLMInterface) -> AgentState:
     **Source Reports:**
     {reports}
 
+    {debate_context}
+
+    If a debate is under way, answer the opposing argument directly and sharpen or revise your position.
     Generate a concise, one-paragraph bear case.
     """
     
     print("Invoking LLM for Bear Case analysis...")
     try:
         response = llm.invoke(prompt)
-        report = f"## Bear Case for {stock_symbol}\n\n{response}"
-        state['analyst_reports'].append(report)
         log_message = "Bear Researcher: Successfully generated bear case."
         print(log_message)
-        state['workflow_log'].append(log_message)
+        return {"bear_case": response, "workflow_log": [log_message]}
     except Exception as e:
         error_message = f"Bear Researcher: Failed to generate report. Error: {e}"
         print(error_message)
-        state['workflow_log'].append(error_message)
-        
-    return state
+        return {"workflow_log": [error_message]}
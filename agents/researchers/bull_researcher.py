@@ -5,15 +5,19 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..',
 
 from graph.state import AgentState
 from core.llm_interface import LLMInterface
+from agents.researchers.debate_moderator import format_debate_context
 
-def run_bull_researcher(state: AgentState, llm: LLMInterface) -> AgentState:
+def run_bull_researcher(state: AgentState, llm: LLMInterface) -> dict:
     """
-    Constructs a bullish investment argument based on the initial analyst reports.
+    Constructs a bullish investment argument based on the analyst reports and, from the
+    second round on, the rolling debate summary and the opposing argument.
+    Returns the state update: the new 'bull_case' and its log entry.
     """
     stock_symbol = state['stock_symbol']
     print(f"--- Running Bull Researcher for {stock_symbol} ---")
     
     reports = "\n\n".join(state['analyst_reports'])
+    debate_context = format_debate_context(state, 'bear_case', 'Bear')
     
     prompt = f"""
     You are a bullish financial analyst. Your task is to review the following reports
@@ -25,20 +29,19 @@ def run_bull_researcher(state: AgentState, llm: LLMInterface) -> AgentState:
     **Source Reports:**
     {reports}
 
+    {debate_context}
+
+    If a debate is under way, answer the opposing argument directly and sharpen or revise your position.
     Generate a concise, one-paragraph bull case.
     """
     
     print("Invoking LLM for Bull Case analysis...")
     try:
         response = llm.invoke(prompt)
-        report = f"## Bull Case for {stock_symbol}\n\n{response}"
-        state['analyst_reports'].append(report)
         log_message = "Bull Researcher: Successfully generated bull case."
         print(log_message)
-        state['workflow_log'].append(log_message)
+        return {"bull_case": response, "workflow_log": [log_message]}
     except Exception as e:
         error_message = f"Bull Researcher: Failed to generate report. Error: {e}"
         print(error_message)
-        state['workflow_log'].append(error_message)
-        
-    return state
+        return {"workflow_log": [error_message]}
@@ -0,0 +1,116 @@
+import sys
+import os
+from typing import Callable, List
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from graph.state import AgentState
+from core.llm_interface import LLMInterface
+from config.default_config import Config
+from core.deadline import deadline_passed
+
+CONTINUE_DEBATE = "continue"
+END_DEBATE = "end"
+
+def format_debate_context(state: AgentState, opponent_key: str, opponent_label: str) -> str:
+    """
+    Builds the debate section of a researcher prompt: the rolling summary of earlier
+    rounds plus the opponent's latest argument. The full transcript is never sent, so
+    prompts stay the same size however many rounds are run.
+    """
+    parts = []
+    if state.get('debate_summary'):
+        parts.append(f"**Debate So Far (summary of earlier rounds):**\n{state['debate_summary']}")
+    if state.get(opponent_key):
+        parts.append(f"**Latest {opponent_label} Argument (rebut it):**\n{state[opponent_key]}")
+    return "\n\n".join(parts)
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    norm = np.linalg.norm(a) * np.linalg.norm(b)
+    return float(a @ b / norm) if norm else 0.0
+
+def run_debate_moderator(state: AgentState, llm: LLMInterface, embed: Callable[[List[str]], List[List[float]]] = None) -> dict:
+    """
+    Closes a bull/bear round. Measures how far each side's position moved since the
+    previous round (embedding cosine similarity), marks the debate converged when
+    neither side moved, and folds the round into the rolling summary when another
+    round will follow.
+
+    Args:
+        state (AgentState): The current state of the graph.
+        llm (LLMInterface): The language model used to compress the debate.
+        embed: Function that embeds a list of texts. Without it, convergence is not checked.
+
+    Returns:
+        dict: The state update: the round count, convergence, the round's history entry,
+              the new summary when another round follows, and the log entry.
+    """
+    stock_symbol = state['stock_symbol']
+    rounds = (state.get('debate_rounds') or 0) + 1
+    print(f"--- Running Debate Moderator for {stock_symbol} (round {rounds}/{Config.MAX_DEBATE_ROUNDS}) ---")
+
+    bull_case = state.get('bull_case') or ''
+    bear_case = state.get('bear_case') or ''
+    history = state.get('debate_history') or []
+
+    # Similarity is only needed when the round limit would otherwise allow another round
+    similarity = None
+    out_of_time = deadline_passed(state)
+    if history and embed and rounds < Config.MAX_DEBATE_ROUNDS and not out_of_time:
+        try:
+            previous = history[-1]
+            vectors = embed([previous['bull'], previous['bear'], bull_case, bear_case])
+            similarity = min(_cosine(vectors[0], vectors[2]), _cosine(vectors[1], vectors[3]))
+        except Exception as e:
+            print(f"Debate Moderator: Could not measure convergence. Error: {e}")
+
+    converged = similarity is not None and similarity >= Config.DEBATE_CONVERGENCE_THRESHOLD
+    update = {
+        "debate_rounds": rounds,
+        "debate_converged": converged,
+        "debate_history": [{"round": rounds, "bull": bull_case, "bear": bear_case, "similarity": similarity}],
+    }
+
+    if converged or rounds >= Config.MAX_DEBATE_ROUNDS or out_of_time:
+        reason = (f"positions converged (similarity {similarity:.3f})" if converged
+                  else "round limit reached" if rounds >= Config.MAX_DEBATE_ROUNDS else "run deadline passed")
+        log_message = f"Debate Moderator: Ending debate after {rounds} round(s); {reason}."
+        print(log_message)
+        return {**update, "workflow_log": [log_message]}
+
+    prompt = f"""
+    You are the moderator of an investment debate about {stock_symbol}.
+    Update the running summary of the debate with the latest round. Keep each side's strongest
+    points, the concessions made and the open disagreements. Use at most 150 words.
+
+    **Summary of Earlier Rounds:**
+    {state.get('debate_summary') or 'None, this was the first round.'}
+
+    **Round {rounds} Bull Case:**
+    {bull_case}
+
+    **Round {rounds} Bear Case:**
+    {bear_case}
+
+    Generate the updated summary.
+    """
+
+    print("Invoking LLM to update the debate summary...")
+    try:
+        summary = llm.invoke(prompt)
+        log_message = f"Debate Moderator: Round {rounds} summarized" + (f" (similarity {similarity:.3f})." if similarity is not None else ".")
+        print(log_message)
+        return {**update, "debate_summary": summary, "workflow_log": [log_message]}
+    except Exception as e:
+        error_message = f"Debate Moderator: Failed to update the summary. Error: {e}"
+        print(error_message)
+        return {**update, "workflow_log": [error_message]}
+
+def should_continue_debate(state: AgentState) -> str:
+    """Conditional edge: another bull/bear round, or on to the research manager."""
+    if (state.get('debate_converged') or (state.get('debate_rounds') or 0) >= Config.MAX_DEBATE_ROUNDS
+            or deadline_passed(state)):
+        return END_DEBATE
+    return CONTINUE_DEBATE
@@ -0,0 +1,108 @@
+import sys
+import os
+import re
+import json
+from typing import Dict
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from graph.state import AgentState
+from core.llm_interface import LLMInterface
+from agents.risk_mgmt.aggressive_debator import run_aggressive_debator
+from agents.risk_mgmt.conservative_debator import run_conservative_debator
+from agents.risk_mgmt.neutral_debator import run_neutral_debator
+
+# JSON key, report heading and per-role fallback of each persona, in debate order
+PERSONAS = [
+    ("aggressive", "Aggressive Take", run_aggressive_debator),
+    ("conservative", "Conservative Take", run_conservative_debator),
+    ("neutral", "Balanced Take", run_neutral_debator)
+]
+
+MIN_TAKE_CHARS = 40
+
+def parse_risk_takes(response: str) -> dict:
+    """
+    Extracts and validates the three takes from the combined completion.
+
+    The response must contain one JSON object whose 'aggressive', 'conservative' and
+    'neutral' keys are non-trivial strings; surrounding prose and code fences are ignored.
+
+    Returns:
+        A dict mapping each persona key to its take.
+
+    Raises:
+        ValueError: If no valid object is found.
+    """
+    match = re.search(r"\{.*\}", response or '', re.DOTALL)
+    if not match:
+        raise ValueError("no JSON object in the response")
+    try:
+        data = json.loads(match.group(0))
+    except json.JSONDecodeError as e:
+        raise ValueError(f"invalid JSON ({e})")
+    if not isinstance(data, dict):
+        raise ValueError("the JSON value is not an object")
+
+    takes = {}
+    for key, _, _ in PERSONAS:
+        take = data.get(key)
+        if not isinstance(take, str) or len(take.strip()) < MIN_TAKE_CHARS:
+            raise ValueError(f"missing or empty '{key}' take")
+        takes[key] = take.strip()
+    return takes
+
+def run_combined_risk_debate(state: AgentState, llm: LLMInterface, fallback_llms: Dict[str, LLMInterface] = None) -> dict:
+    """
+    Produces the aggressive, conservative and neutral takes in a single structured
+    completion, so the investment plan is sent once instead of three times. If the
+    response does not validate, the three per-role debators run instead.
+
+    Args:
+        state (AgentState): The current state of the workflow.
+        llm (LLMInterface): The model for the combined call.
+        fallback_llms (Dict[str, LLMInterface]): The per-role debators' models by persona
+                                                 key, used in the fallback; defaults to `llm`.
+
+    Returns:
+        dict: The state update: the three takes to append to 'risk_analysis' and the log entries.
+    """
+    stock_symbol = state['stock_symbol']
+    print(f"--- Running Combined Risk Debate for {stock_symbol} ---")
+
+    investment_plan = state['investment_plan']
+
+    prompt = f"""
+    You are moderating a risk debate between three members of an investment firm about the following "Final Investment Plan" for {stock_symbol}.
+
+    - **aggressive**: A high-risk, high-reward trader focused only on the upside. Emphasizes the potential for significant gains, minimizes the stated risks and argues why the rewards strongly outweigh any downside.
+    - **conservative**: A risk-averse portfolio manager focused on capital preservation. Emphasizes the potential for losses, highlights uncertainties and bearish points, and argues why the risks might be too high for a prudent investor.
+    - **neutral**: A balanced portfolio strategist. Objectively weighs the upside against the risks and gives the most reasonable, middle-ground perspective.
+
+    **Investment Plan to Analyze:**
+    {investment_plan}
+
+    Write each member's short, sharp take (at most 120 words each).
+    Respond with only a JSON object of exactly this form, with no other text:
+    {{"aggressive": "...", "conservative": "...", "neutral": "..."}}
+    """
+
+    print("Invoking LLM for all three risk takes...")
+    try:
+        takes = parse_risk_takes(llm.invoke(prompt))
+    except Exception as e:
+        log_message = f"Combined Risk Debate: Falling back to per-role debators. Reason: {e}"
+        print(log_message)
+        # The per-role debators each return a partial update; merge them into one
+        update = {"risk_analysis": "", "workflow_log": [log_message]}
+        fallback_llms = fallback_llms or {}
+        for key, _, run_debator in PERSONAS:
+            debator_update = run_debator(state, fallback_llms.get(key, llm))
+            update["risk_analysis"] += debator_update.get('risk_analysis', '')
+            update["workflow_log"] += debator_update['workflow_log']
+        return update
+
+    reports = [f"### {heading}\n{takes[key]}" for key, heading, _ in PERSONAS]
+
+    log_message = "Combined Risk Debate: Successfully generated all three takes in one call."
+    print(log_message)
+    return {"risk_analysis": "".join("\n\n" + report for report in reports), "workflow_log": [log_message]}
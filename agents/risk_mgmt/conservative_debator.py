@@ -5,9 +5,10 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..',
 from graph.state import AgentState
 from core.llm_interface import LLMInterface
 
-def run_conservative_debator(state: AgentState, llm: LLMInterface) -> AgentState:
+def run_conservative_debator(state: AgentState, llm: LLMInterface) -> dict:
     """
     Analyzes the investment plan from a conservative, capital-preservation perspective.
+    Returns the state update: the take to append to 'risk_analysis' and its log entry.
     """
     stock_symbol = state['stock_symbol']
     print(f"--- Running Conservative Risk Debator for {stock_symbol} ---")
@@ -33,15 +34,10 @@ def run_conservative_debator(state: AgentState, llm: LLMInterface) -> AgentState
         response = llm.invoke(prompt)
         report = f"### Conservative Take\n{response}"
         
-        current_analysis = state.get('risk_analysis') or ''
-        state['risk_analysis'] = current_analysis + "\n\n" + report
-        
         log_message = "Conservative Debator: Successfully generated its take."
         print(log_message)
-        state['workflow_log'].append(log_message)
+        return {"risk_analysis": "\n\n" + report, "workflow_log": [log_message]}
     except Exception as e:
         error_message = f"Conservative Debator: Failed to generate report. Error: {e}"
         print(error_message)
-        state['workflow_log'].append(error_message)
-        
-    return state
+        return {"workflow_log": [error_message]}
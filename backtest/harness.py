@@ -0,0 +1,192 @@
+import sys
+import os
+import re
+import json
+import time
+import argparse
+from concurrent.futures import as_completed
+from typing import List, Dict, Tuple
+import pandas as pd
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.default_config import Config
+from graph.state import create_initial_state
+from core.process_pool import forked_pool, inherited
+from core.embedding_interface import create_embedding_model
+from dataflows.snapshot_utils import ensure_price_snapshot, get_forward_return
+from dataflows.shared_prices import SharedPriceStore, attach_shared_prices
+
+DECISIONS = ("BUY", "HOLD", "SELL", "AVOID")
+
+# The compiled graph of each worker process, built once by _init_worker
+_worker_app = None
+
+
+def _init_worker(use_llm_cache: bool, price_manifest: Dict):
+    """
+    Builds one compiled graph per worker process, behind the shared LLM cache if enabled,
+    around the embedding model inherited from the parent, and attaches the shared prices.
+    """
+    global _worker_app
+    from graph.builder import TradingAgentsGraph, create_role_llms
+    from core.llm_cache import CachedLLM
+
+    attach_shared_prices(price_manifest)
+    wrap = (lambda llm: CachedLLM(llm, Config.LLM_CACHE_PATH)) if use_llm_cache else None
+    _worker_app = TradingAgentsGraph(llms=create_role_llms(wrap), embedding_model=inherited('embedding_model')).build()
+
+
+def _run_one(stock_symbol: str, as_of_date: str) -> Dict:
+    """Runs the full graph for one (symbol, date) pair inside a worker process."""
+    started = time.perf_counter()
+    try:
+        final_state = _worker_app.invoke(create_initial_state(stock_symbol, as_of_date=as_of_date))
+        decision_text = final_state.get('final_trade_decision') or ''
+        error = None
+    except Exception as e:
+        decision_text, error = '', str(e)
+    return {
+        "stock_symbol": stock_symbol,
+        "as_of_date": as_of_date,
+        "decision_text": decision_text,
+        "decision": parse_decision(decision_text),
+        "elapsed_seconds": round(time.perf_counter() - started, 2),
+        "error": error
+    }
+
+
+def parse_decision(decision_text: str) -> str | None:
+    """Extracts BUY/HOLD/SELL/AVOID from the risk manager's 'DECISION: justification' output."""
+    match = re.search(r"\b(BUY|HOLD|SELL|AVOID)\b", decision_text or '', re.IGNORECASE)
+    return match.group(1).upper() if match else None
+
+
+def score_decision(decision: str | None, forward_return: float | None, band: float) -> Tuple[bool | None, float | None]:
+    """
+    Scores one call against the realized forward return.
+
+    BUY is correct when the return beats +band, SELL when it is below -band, and
+    HOLD/AVOID when the move stays inside the band. The strategy return is the
+    forward return for BUY, its negative for SELL and zero otherwise.
+
+    Returns:
+        (correct, strategy_return), with None for calls that cannot be scored.
+    """
+    if decision is None or forward_return is None:
+        return None, None
+    if decision == "BUY":
+        return forward_return > band, forward_return
+    if decision == "SELL":
+        return forward_return < -band, -forward_return
+    return abs(forward_return) <= band, 0.0
+
+
+def summarize(results: pd.DataFrame) -> Dict:
+    """Aggregates per-run scores into an overall and per-decision summary."""
+    scored = results.dropna(subset=['correct'])
+    summary = {
+        "runs": int(len(results)),
+        "errors": int(results['error'].notna().sum()),
+        "scored": int(len(scored)),
+        "hit_rate": float(scored['correct'].astype(float).mean()) if len(scored) else None,
+        "mean_strategy_return": float(scored['strategy_return'].mean()) if len(scored) else None,
+        "by_decision": {}
+    }
+    for decision in DECISIONS:
+        group = scored[scored['decision'] == decision]
+        if group.empty:
+            continue
+        summary["by_decision"][decision] = {
+            "count": int(len(group)),
+            "hit_rate": float(group['correct'].astype(float).mean()),
+            "mean_forward_return": float(group['forward_return'].mean())
+        }
+    return summary
+
+
+def run_backtest(symbols: List[str], dates: List[str], horizon_days: int = None, workers: int = None,
+                 use_llm_cache: bool = True, output_dir: str = "backtest_results") -> Dict:
+    """
+    Replays the compiled graph for every (symbol, date) pair and scores the final
+    trade decisions against forward returns.
+
+    Price snapshots are refreshed once in the parent process and published to shared
+    memory, where the workers read them in place; each run sees only the prices
+    available on its as-of date. The embedding model is also loaded once in the parent
+    and inherited by the forked workers.
+
+    Args:
+        symbols (List[str]): Stock symbols to replay.
+        dates (List[str]): 'YYYY-MM-DD' as-of dates.
+        horizon_days (int): Forward-return horizon in trading days.
+        workers (int): Size of the process pool.
+        use_llm_cache (bool): Serve repeated prompts from the shared LLM cache.
+        output_dir (str): Directory for the per-run CSV and the summary JSON.
+
+    Returns:
+        The summary dictionary that is also written to disk.
+    """
+    horizon_days = horizon_days or Config.BACKTEST_HORIZON_DAYS
+    workers = workers or Config.BACKTEST_WORKERS
+    pairs = [(symbol, date) for symbol in symbols for date in dates]
+    print(f"--- Backtest: {len(pairs)} runs ({len(symbols)} symbols x {len(dates)} dates) on {workers} worker(s) ---")
+
+    prices = SharedPriceStore()
+    manifest = prices.publish({symbol: ensure_price_snapshot(symbol) for symbol in symbols})
+    embedding_model = create_embedding_model()
+
+    started = time.perf_counter()
+    rows = []
+    try:
+        with forked_pool(workers, _init_worker, (use_llm_cache, manifest), shared={'embedding_model': embedding_model}) as pool:
+            futures = [pool.submit(_run_one, symbol, date) for symbol, date in pairs]
+            for i, future in enumerate(as_completed(futures), start=1):
+                row = future.result()
+                row["forward_return"] = get_forward_return(row["stock_symbol"], row["as_of_date"], horizon_days)
+                row["correct"], row["strategy_return"] = score_decision(row["decision"], row["forward_return"], Config.BACKTEST_RETURN_BAND)
+                rows.append(row)
+                print(f"[{i}/{len(pairs)}] {row['stock_symbol']} {row['as_of_date']}: {row['decision']} (fwd return: {row['forward_return']})")
+    finally:
+        prices.close()
+
+    results = pd.DataFrame(rows).sort_values(['stock_symbol', 'as_of_date'])
+    summary = summarize(results)
+    summary.update({
+        "horizon_days": horizon_days,
+        "return_band": Config.BACKTEST_RETURN_BAND,
+        "model": Config.LLM_MODEL,
+        "wall_time_seconds": round(time.perf_counter() - started, 1)
+    })
+
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    results.to_csv(os.path.join(output_dir, f"runs-{stamp}.csv"), index=False)
+    with open(os.path.join(output_dir, f"summary-{stamp}.json"), 'w') as f:
+        json.dump(summary, f, indent=2)
+
+    print(f"--- Backtest Complete in {summary['wall_time_seconds']}s: hit rate {summary['hit_rate']}, "
+          f"mean strategy return {summary['mean_strategy_return']} ---")
+    return summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Replay the trading graph over historical dates and score its decisions.")
+    parser.add_argument("symbols", nargs="+", help="Stock symbols to backtest.")
+    parser.add_argument("--start", required=True, help="First as-of date (YYYY-MM-DD).")
+    parser.add_argument("--end", required=True, help="Last as-of date (YYYY-MM-DD).")
+    parser.add_argument("--every", type=int, default=5, help="Spacing between as-of dates in business days.")
+    parser.add_argument("--horizon", type=int, default=None, help="Forward-return horizon in trading days.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes.")
+    parser.add_argument("--no-llm-cache", action="store_true", help="Call the LLM for every prompt.")
+    parser.add_argument("--output", default="backtest_results", help="Directory for results.")
+    args = parser.parse_args()
+
+    as_of_dates = [d.strftime('%Y-%m-%d') for d in pd.bdate_range(args.start, args.end, freq=f"{args.every}B")]
+    run_backtest(
+        args.symbols,
+        as_of_dates,
+        horizon_days=args.horizon,
+        workers=args.workers,
+        use_llm_cache=not args.no_llm_cache,
+        output_dir=args.output
+    )
@@ -0,0 +1,136 @@
+import sys
+import os
+import shutil
+import argparse
+import tempfile
+from typing import List
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.stubs import StubEmbedding
+from config.default_config import Config
+from core.embedding_interface import EmbeddingInterface
+from core.embedding_cache import CachedEmbedding
+from memory.memory_manager import MemoryManager
+
+# The store committed with the repository, written by the original Chroma
+# sentence_transformer embedding function
+BASELINE_STORE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'chroma_db'))
+
+
+def check_store(embedding_model: EmbeddingInterface, store_path: str, min_cosine: float = None) -> List[str]:
+    """
+    Opens an existing store with MemoryManager and exercises reads, a query and a write.
+
+    Args:
+        embedding_model: The model MemoryManager embeds with.
+        store_path: A store MemoryManager may modify (pass a copy).
+        min_cosine: When set, the model must reproduce every stored vector from its
+                    document within this cosine similarity, and a query with a stored
+                    document must return that document first. Only meaningful for the
+                    model the store was written with (or another backend of it, e.g. ONNX).
+
+    Returns:
+        A list of failure descriptions, empty when the store is fully usable.
+    """
+    failures = []
+    manager = MemoryManager(embedding_model=embedding_model, persist_path=store_path)
+    records = manager.get_records(include_embeddings=True)
+    if not records:
+        return [f"no records could be read from {store_path}"]
+    dimensions = len(records[0]['embedding'])
+    if dimensions != embedding_model.get_embedding_dimensions():
+        failures.append(f"stored vectors have {dimensions} dimensions, the model produces {embedding_model.get_embedding_dimensions()}")
+        return failures
+
+    if min_cosine is not None:
+        stored = np.asarray([r['embedding'] for r in records])
+        fresh = np.asarray(manager._embed([r['document'] for r in records]))
+        cosines = (stored * fresh).sum(axis=1) / (np.linalg.norm(stored, axis=1) * np.linalg.norm(fresh, axis=1))
+        for record, cosine in zip(records, cosines):
+            if cosine < min_cosine:
+                failures.append(f"{record['id']}: re-embedded vector has cosine {cosine:.5f} to the stored one (required {min_cosine})")
+        for record, vector in zip(records, fresh.tolist()):
+            top = manager.collection.query(query_embeddings=[vector], n_results=1)['ids'][0]
+            if top != [record['id']]:
+                failures.append(f"{record['id']}: a query with its own document returned {top}")
+
+    query = manager._embed([records[0]['document'][:500]])
+    results = manager.collection.query(query_embeddings=query, n_results=min(2, len(records)))
+    if not results['ids'] or not results['ids'][0]:
+        failures.append("a query returned no results")
+
+    manager.save_analysis({
+        "stock_symbol": "CHECK", "final_trade_decision": "HOLD: Store check.",
+        "analyst_reports": ["Store check report."], "investment_plan": "Store check plan.", "risk_analysis": ""
+    }, record_id="CHECK@store@0")
+    if manager.collection.count() != len(records) + 1:
+        failures.append(f"the store holds {manager.collection.count()} record(s) after one save, expected {len(records) + 1}")
+    return failures
+
+
+def check_warm_reingest(embedding_model: EmbeddingInterface, store_path: str, cache_dir: str) -> List[str]:
+    """
+    Re-ingests the documents of an existing store twice through a CachedEmbedding and
+    checks that the second pass and a query on a stored document are served entirely
+    from the cache, with the same vectors.
+
+    Returns:
+        A list of failure descriptions, empty when every repeat was a cache hit.
+    """
+    cached = CachedEmbedding(embedding_model, cache_dir=cache_dir)
+    manager = MemoryManager(embedding_model=cached, persist_path=store_path)
+    records = [r for r in manager.get_records() if not r['id'].startswith('CHECK')]
+    if not records:
+        return [f"no records could be read from {store_path}"]
+
+    manager.add_records([dict(r, id=f"CHECK-cold-{r['id']}") for r in records])
+    cold_misses = cached.misses
+    hits_before = cached.hits
+    manager.add_records([dict(r, id=f"CHECK-warm-{r['id']}") for r in records])
+    manager.collection.query(query_embeddings=manager._embed([records[0]['document']]), n_results=1)
+
+    failures = []
+    if cached.misses != cold_misses:
+        failures.append(f"the warm re-ingest encoded {cached.misses - cold_misses} text(s) again")
+    if cached.hits - hits_before != len(records) + 1:
+        failures.append(f"{cached.hits - hits_before} cache hit(s) on the warm pass and query, expected {len(records) + 1}")
+    cold = manager.collection.get(ids=[f"CHECK-cold-{r['id']}" for r in records], include=['embeddings'])['embeddings']
+    warm = manager.collection.get(ids=[f"CHECK-warm-{r['id']}" for r in records], include=['embeddings'])['embeddings']
+    if not np.allclose(np.asarray(cold), np.asarray(warm)):
+        failures.append("cached vectors differ from the ones first stored")
+    return failures
+
+
+def _create_model(backend: str) -> EmbeddingInterface:
+    if backend == 'stub':
+        return StubEmbedding()
+    from core.embedding_interface import create_embedding_model
+    return create_embedding_model(backend=backend)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check that a Chroma store written by earlier versions opens and answers queries.")
+    parser.add_argument("--store", default=BASELINE_STORE, help="Store to check; it is copied first and never modified.")
+    parser.add_argument("--backend", default="stub", choices=["stub", "torch", "onnx"],
+                        help="Embedding backend; 'stub' needs no model download.")
+    args = parser.parse_args()
+
+    # The check brings its own embedding cache, so a shared one cannot serve its misses
+    Config.EMBEDDING_CACHE = False
+    work_dir = tempfile.mkdtemp(prefix="store_check_")
+    try:
+        store_copy = os.path.join(work_dir, "store")
+        shutil.copytree(args.store, store_copy)
+        # Real backends must reproduce the vectors the store was written with
+        min_cosine = None if args.backend == 'stub' else Config.EMBEDDING_ONNX_MIN_COSINE
+        model = _create_model(args.backend)
+        failures = check_store(model, store_copy, min_cosine)
+        failures += check_warm_reingest(model, store_copy, os.path.join(work_dir, "embedding_cache"))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if failures:
+        print("\n".join(f"FAILED: {failure}" for failure in failures))
+        sys.exit(1)
+    print(f"\nStore {args.store} opened, queried, written and re-ingested from the embedding cache with the '{args.backend}' backend.")
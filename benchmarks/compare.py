@@ -0,0 +1,79 @@
+import sys
+import json
+import argparse
+from typing import Dict, List, Tuple
+
+# Metric path -> (direction, allowed relative regression). 'lower' means smaller is
+# better (latencies, memory); 'higher' means larger is better (rates).
+THRESHOLDS = {
+    "startup.total_seconds": ("lower", 0.20),
+    "graph.per_ticker_seconds.mean": ("lower", 0.10),
+    "graph.per_ticker_seconds.p95": ("lower", 0.15),
+    "peak_rss_mb": ("lower", 0.10),
+    "memory_store.ingest_docs_per_second": ("higher", 0.15),
+    "memory_store.queries_per_second": ("higher", 0.15),
+}
+THROUGHPUT_THRESHOLD = 0.10
+
+
+def _lookup(results: Dict, path: str):
+    value = results
+    for part in path.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def compare(baseline: Dict, candidate: Dict, tolerance_scale: float = 1.0) -> Tuple[List[str], List[str]]:
+    """
+    Compares two benchmark result files.
+
+    Args:
+        baseline: Results of the reference commit.
+        candidate: Results of the commit under test.
+        tolerance_scale: Multiplier for every threshold, e.g. 2.0 on noisy CI hosts.
+
+    Returns:
+        (report_lines, regressions), where regressions lists the metrics over threshold.
+    """
+    thresholds = dict(THRESHOLDS)
+    for level in candidate.get("throughput", {}):
+        thresholds[f"throughput.{level}.tickers_per_second"] = ("higher", THROUGHPUT_THRESHOLD)
+    for node in candidate.get("graph", {}).get("per_node_seconds", {}):
+        thresholds[f"graph.per_node_seconds.{node}.mean"] = ("lower", 0.15)
+
+    report, regressions = [], []
+    for path, (direction, allowed) in sorted(thresholds.items()):
+        old, new = _lookup(baseline, path), _lookup(candidate, path)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        regression = change if direction == "lower" else -change
+        over = regression > allowed * tolerance_scale
+        line = f"{'REGRESSION' if over else 'ok':<10} {path:<55} {old:>12.4f} -> {new:>12.4f} ({change:+.1%})"
+        report.append(line)
+        if over:
+            regressions.append(line)
+    return report, regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files and fail on regressions.")
+    parser.add_argument("baseline", help="Baseline result JSON.")
+    parser.add_argument("candidate", help="Candidate result JSON.")
+    parser.add_argument("--tolerance-scale", type=float, default=1.0, help="Multiply every threshold by this factor.")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline_results = json.load(f)
+    with open(args.candidate) as f:
+        candidate_results = json.load(f)
+
+    lines, failures = compare(baseline_results, candidate_results, args.tolerance_scale)
+    print(f"Baseline {baseline_results.get('commit')} vs candidate {candidate_results.get('commit')}")
+    print("\n".join(lines))
+    if failures:
+        print(f"\n{len(failures)} metric(s) regressed beyond threshold.")
+        sys.exit(1)
+    print("\nNo regressions beyond threshold.")
@@ -0,0 +1,199 @@
+import sys
+import os
+import json
+import time
+import shutil
+import resource
+import argparse
+import platform
+import tempfile
+import subprocess
+import statistics
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.stubs import LatencyModel, StubLLM, StubEmbedding, StubDataSession
+from core.replay import set_data_session
+from graph.state import create_initial_state
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(int(round(pct / 100.0 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def _distribution(values: List[float]) -> Dict[str, float]:
+    return {
+        "mean": round(statistics.fmean(values), 4) if values else 0.0,
+        "p50": round(_percentile(values, 50), 4),
+        "p95": round(_percentile(values, 95), 4),
+        "max": round(max(values), 4) if values else 0.0
+    }
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def measure_startup() -> Dict[str, float]:
+    """
+    Measures cold start in a fresh interpreter: imports plus graph construction and
+    compilation, with the stub LLM so no network time is included.
+    """
+    probe = (
+        "import time; t0 = time.perf_counter();"
+        "import sys; sys.path.insert(0, '.');"
+        "from graph.builder import TradingAgentsGraph;"
+        "from benchmarks.stubs import StubLLM, LatencyModel;"
+        "t1 = time.perf_counter();"
+        "TradingAgentsGraph(llm=StubLLM(LatencyModel())).build();"
+        "t2 = time.perf_counter();"
+        "print(f'{t1 - t0} {t2 - t1}')"
+    )
+    output = subprocess.check_output([sys.executable, "-c", probe], cwd=ROOT, text=True, stderr=subprocess.DEVNULL)
+    import_s, build_s = (float(x) for x in output.strip().splitlines()[-1].split())
+    return {"import_seconds": round(import_s, 4), "build_seconds": round(build_s, 4), "total_seconds": round(import_s + build_s, 4)}
+
+
+def measure_graph(app, symbols: List[str], repetitions: int) -> Dict:
+    """
+    Streams the graph once per (symbol, repetition) and records how long each node
+    took, plus the end-to-end time per ticker. Nodes run sequentially, so the time
+    between consecutive stream events is the node's own latency.
+    """
+    node_times = defaultdict(list)
+    totals = []
+    for _ in range(repetitions):
+        for symbol in symbols:
+            started = last = time.perf_counter()
+            for step in app.stream(create_initial_state(symbol), stream_mode="updates"):
+                now = time.perf_counter()
+                node_times[next(iter(step))].append(now - last)
+                last = now
+            totals.append(time.perf_counter() - started)
+    return {
+        "per_node_seconds": {node: _distribution(times) for node, times in node_times.items()},
+        "per_ticker_seconds": _distribution(totals)
+    }
+
+
+def measure_throughput(app, n_tickers: int, concurrency_levels: List[int]) -> Dict:
+    """Runs N tickers through the graph at each concurrency level and reports tickers/second."""
+    results = {}
+    symbols = [f"T{i:04d}" for i in range(n_tickers)]
+    for level in concurrency_levels:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=level) as pool:
+            list(pool.map(lambda s: app.invoke(create_initial_state(s)), symbols))
+        elapsed = time.perf_counter() - started
+        results[str(level)] = {"seconds": round(elapsed, 4), "tickers_per_second": round(n_tickers / elapsed, 4)}
+        print(f"Throughput at concurrency {level}: {n_tickers / elapsed:.2f} tickers/s")
+    return results
+
+
+def measure_memory_store(n_documents: int, n_queries: int) -> Dict:
+    """Measures MemoryManager ingest and query rates on a throwaway Chroma store."""
+    from memory.memory_manager import MemoryManager
+
+    store_dir = tempfile.mkdtemp(prefix="bench_chroma_")
+    try:
+        manager = MemoryManager(embedding_model=StubEmbedding(), persist_path=store_dir)
+        states = []
+        for i in range(n_documents):
+            state = create_initial_state(f"T{i % 50:04d}")
+            state.update({
+                "analyst_reports": [f"## Report {i}\n" + "Benchmark analysis text. " * 80],
+                "investment_plan": "Benchmark investment plan. " * 40,
+                "risk_analysis": "Benchmark risk debate. " * 40,
+                "final_trade_decision": "HOLD: Benchmark justification."
+            })
+            states.append(state)
+
+        started = time.perf_counter()
+        manager.save_analyses_in_batches(states, batch_size=100)
+        ingest_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for i in range(n_queries):
+            query = f"What was the outlook for T{i % 50:04d}?"
+            manager.collection.query(query_embeddings=manager.embedding_model.embed_documents([query]), n_results=2)
+        query_s = time.perf_counter() - started
+
+        return {
+            "documents": n_documents,
+            "ingest_docs_per_second": round(n_documents / ingest_s, 2),
+            "queries": n_queries,
+            "queries_per_second": round(n_queries / query_s, 2)
+        }
+    finally:
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+
+def run_benchmarks(args) -> Dict:
+    llm_latency = LatencyModel.parse(args.llm_latency, seed=args.seed)
+    data_latency = LatencyModel.parse(args.data_latency, seed=args.seed + 1)
+    set_data_session(StubDataSession(data_latency, seed=args.seed))
+
+    from graph.builder import TradingAgentsGraph
+    app = TradingAgentsGraph(llm=StubLLM(llm_latency, response_words=args.response_words), embedding_model=StubEmbedding()).build()
+
+    results = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        "python": platform.python_version(),
+        "parameters": {
+            "llm_latency": llm_latency.describe(),
+            "data_latency": data_latency.describe(),
+            "response_words": args.response_words,
+            "repetitions": args.repetitions,
+            "tickers": args.tickers,
+            "concurrency": args.concurrency,
+            "seed": args.seed
+        },
+        "startup": measure_startup(),
+        "graph": measure_graph(app, ["BENCH"], args.repetitions),
+        "throughput": measure_throughput(app, args.tickers, args.concurrency)
+    }
+    if not args.skip_memory:
+        results["memory_store"] = measure_memory_store(args.memory_documents, args.memory_queries)
+    results["peak_rss_mb"] = _peak_rss_mb()
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the trading graph offline with stub LLM and data sources.")
+    parser.add_argument("--llm-latency", default="lognormal:50:0.5", help="LLM latency as kind:mean_ms[:spread].")
+    parser.add_argument("--data-latency", default="constant:5", help="Data fetch latency as kind:mean_ms[:spread].")
+    parser.add_argument("--response-words", type=int, default=250, help="Words per stub LLM response.")
+    parser.add_argument("--repetitions", type=int, default=5, help="Sequential runs used for per-node latency.")
+    parser.add_argument("--tickers", type=int, default=20, help="Tickers per throughput measurement.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8], help="Concurrency levels for throughput.")
+    parser.add_argument("--memory-documents", type=int, default=500, help="Documents ingested into the memory store.")
+    parser.add_argument("--memory-queries", type=int, default=100, help="Queries issued against the memory store.")
+    parser.add_argument("--skip-memory", action="store_true", help="Skip the memory-store benchmark.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for latency and data stubs.")
+    parser.add_argument("--output", default=None, help="Result file. Defaults to benchmarks/results/<commit>.json.")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args)
+    output = args.output or os.path.join(ROOT, "benchmarks", "results", f"{results['commit']}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nBenchmark results written to {output}")
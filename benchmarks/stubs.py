@@ -0,0 +1,188 @@
+import sys
+import os
+import time
+import random
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from typing import List, Any, Callable
+import numpy as np
+import pandas as pd
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.llm_interface import LLMInterface
+from core.embedding_interface import EmbeddingInterface
+from core.replay import ReplaySession, OFF
+from dataflows.frame_schema import compact_prices, compact_frame
+
+class LatencyModel:
+    """
+    A seeded latency distribution in milliseconds.
+
+    Supported kinds: 'constant' (mean), 'uniform' (mean +/- spread), 'normal'
+    (mean, spread as stddev) and 'lognormal' (median=mean, spread as sigma), the
+    last being the closest match to the long tail of hosted LLM APIs.
+    """
+
+    def __init__(self, kind: str = 'constant', mean_ms: float = 0.0, spread: float = 0.0, seed: int = 0):
+        if kind not in ('constant', 'uniform', 'normal', 'lognormal'):
+            raise ValueError(f"Unknown latency distribution: '{kind}'")
+        self.kind = kind
+        self.mean_ms = mean_ms
+        self.spread = spread
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def parse(cls, spec: str, seed: int = 0) -> 'LatencyModel':
+        """Parses 'kind:mean_ms[:spread]', e.g. 'lognormal:800:0.6' or 'constant:20'."""
+        parts = spec.split(':')
+        return cls(parts[0], float(parts[1]) if len(parts) > 1 else 0.0, float(parts[2]) if len(parts) > 2 else 0.0, seed)
+
+    def sample_ms(self) -> float:
+        with self._lock:
+            if self.kind == 'uniform':
+                value = self._rng.uniform(self.mean_ms - self.spread, self.mean_ms + self.spread)
+            elif self.kind == 'normal':
+                value = self._rng.gauss(self.mean_ms, self.spread)
+            elif self.kind == 'lognormal':
+                value = self.mean_ms * self._rng.lognormvariate(0.0, self.spread)
+            else:
+                value = self.mean_ms
+        return max(value, 0.0)
+
+    def sleep(self):
+        delay_ms = self.sample_ms()
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000.0)
+
+    def describe(self) -> str:
+        return f"{self.kind}:{self.mean_ms:g}:{self.spread:g}"
+
+class StubLLM(LLMInterface):
+    """
+    An offline LLM that sleeps according to a latency model and returns canned text
+    of a realistic size. The risk manager prompt gets a parseable decision line.
+    """
+
+    _DECISIONS = ("BUY", "HOLD", "SELL", "AVOID")
+
+    def __init__(self, latency: LatencyModel, response_words: int = 250):
+        self.latency = latency
+        self.response_words = response_words
+        self.model = 'stub-llm'
+        self.calls = 0
+
+    def invoke(self, prompt: str) -> str:
+        self.calls += 1
+        self.latency.sleep()
+        digest = int(hashlib.md5(prompt.encode('utf-8')).hexdigest(), 16)
+        if "Final Trade Decision" in prompt:
+            return f"{self._DECISIONS[digest % 4]}: Stubbed justification for benchmarking."
+        words = [f"token{(digest >> (i % 64)) & 0xff}" for i in range(self.response_words)]
+        return "Stubbed analysis. Overall Sentiment: **Neutral**. " + " ".join(words)
+
+class StubEmbedding(EmbeddingInterface):
+    """Deterministic hash-seeded unit vectors, so memory-store benchmarks need no model download."""
+
+    def __init__(self, dimensions: int = 384, latency: LatencyModel = None):
+        self.model_name = 'stub-embedding'
+        self.dimensions = dimensions
+        self.latency = latency or LatencyModel()
+
+    def get_embedding_dimensions(self) -> int:
+        return self.dimensions
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.latency.sleep()
+        vectors = []
+        for text in texts:
+            rng = np.random.default_rng(int(hashlib.md5(text.encode('utf-8')).hexdigest()[:16], 16))
+            vector = rng.standard_normal(self.dimensions).astype(np.float32)
+            vectors.append((vector / np.linalg.norm(vector)).tolist())
+        return vectors
+
+class StubDataSession(ReplaySession):
+    """
+    A data session that answers every DataInterface fetch with synthetic frames of
+    the same shape as the live sources, after a simulated network delay. Installed
+    with core.replay.set_data_session, it replaces the network without touching agents.
+    """
+
+    def __init__(self, latency: LatencyModel, seed: int = 0):
+        super().__init__(OFF)
+        self.latency = latency
+        self.seed = seed
+
+    def call(self, kind: str, key: str, fn: Callable[[], Any]) -> Any:
+        self.latency.sleep()
+        rng = np.random.default_rng(int(key[:12], 16) ^ self.seed)
+        builder = getattr(self, f"_stub_{kind}", None)
+        if builder is None:
+            raise ValueError(f"No stub data defined for '{kind}'")
+        value = builder(rng)
+        # Price frames are compacted by their builder; news and social frames by column name
+        return compact_frame(value) if isinstance(value, pd.DataFrame) else value
+
+    def _stub_get_historical_data(self, rng) -> pd.DataFrame:
+        days = pd.bdate_range(end=datetime.now().date(), periods=65)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(days))))
+        open_ = close * (1 + rng.normal(0, 0.005, len(days)))
+        df = pd.DataFrame({
+            'Open': open_,
+            'High': np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, len(days)))),
+            'Low': np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, len(days)))),
+            'Close': close,
+            'Volume': rng.integers(1_000_000, 50_000_000, len(days)),
+            'Dividends': 0.0,
+            'Stock Splits': 0.0
+        }, index=days)
+        return compact_prices(df)
+
+    def _stub_get_company_news(self, rng) -> pd.DataFrame:
+        n = 25
+        return pd.DataFrame({
+            'datetime': [(datetime.now() - timedelta(days=int(d))).date() for d in rng.integers(0, 30, n)],
+            'headline': [f"Company announces update number {i} amid sector move" for i in range(n)],
+            'source': rng.choice(['Reuters', 'Yahoo', 'MarketWatch', 'SeekingAlpha'], n),
+            'summary': ["Stub summary text for benchmarking. " * 4] * n
+        })
+
+    def _stub_get_financial_fundamentals(self, rng) -> dict:
+        return {
+            'country': 'US', 'currency': 'USD', 'exchange': 'NASDAQ', 'finnhubIndustry': 'Technology',
+            'ipo': '1999-01-22', 'marketCapitalization': float(rng.uniform(1e3, 3e6)), 'name': 'Stub Corp',
+            'shareOutstanding': float(rng.uniform(100, 25000)), 'ticker': 'STUB',
+            'weburl': 'https://example.com', 'logo': 'https://example.com/logo.png'
+        }
+
+    def _stub_get_google_news(self, rng) -> pd.DataFrame:
+        n = 10
+        return pd.DataFrame({
+            'title': [f"Stub Corp stock moves on headline {i}" for i in range(n)],
+            'published': [pd.Timestamp.now() - pd.Timedelta(hours=int(h)) for h in rng.integers(0, 168, n)],
+            'link': [f"https://news.example.com/{i}" for i in range(n)],
+            'source': rng.choice(['Bloomberg', 'CNBC', 'Barron\'s'], n)
+        })
+
+    def _stub_get_reddit_sentiment(self, rng) -> pd.DataFrame:
+        n = 10
+        return pd.DataFrame({
+            'subreddit': rng.choice(['wallstreetbets', 'stocks', 'investing'], n),
+            'title': [f"What do you think about STUB? Post {i}" for i in range(n)],
+            'score': rng.integers(0, 5000, n),
+            'url': [f"https://reddit.example.com/{i}" for i in range(n)]
+        })
+
+    _stub_get_reddit_mentions = _stub_get_reddit_sentiment
+
+    def _stub_get_recent_news(self, rng) -> pd.DataFrame:
+        n = 20
+        return pd.DataFrame({
+            'published': sorted((pd.Timestamp.now() - pd.Timedelta(hours=int(h)) for h in rng.integers(0, 720, n)), reverse=True),
+            'headline': [f"Stub Corp announces update number {i} amid sector move" for i in range(n)],
+            'source': rng.choice(['Reuters', 'Bloomberg', 'CNBC', 'MarketWatch'], n),
+            'url': [f"https://news.example.com/{i}" for i in range(n)],
+            'summary': ["Stub summary text for benchmarking. " * 4] * n,
+            'provider': rng.choice(['finnhub', 'google'], n)
+        })
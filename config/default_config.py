@@ -1,4 +1,5 @@
 import os
+import json
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -22,9 +23,61 @@ s   for different environments (e.g., development, testing, production)
     LLM_TOP_P = float(os.getenv('LLM_TOP_P', 0.5))
     LLM_MAX_TOKENS = int(os.getenv('LLM_MAX_TOKENS', 500))
 
+    # USD price per 1K (input, output) tokens, used for cost instrumentation.
+    # Override or extend with a JSON object, e.g. LLM_PRICING='{"qwen-plus": [0.0004, 0.0012]}'
+    LLM_PRICING = {
+        'qwen-turbo': (0.00005, 0.0002),
+        'qwen-plus': (0.0004, 0.0012),
+        'qwen-max': (0.0016, 0.0064),
+        **{model: tuple(prices) for model, prices in json.loads(os.getenv('LLM_PRICING', '{}')).items()}
+    }
+
+    # Per-role model routing; every role defaults to LLM_MODEL. For example,
+    # MANAGER_LLM_MODEL=qwen-plus moves only research_manager and risk_manager to the larger model
+    LLM_ROLE_MODELS = {
+        'analyst': os.getenv('ANALYST_LLM_MODEL', LLM_MODEL),
+        'researcher': os.getenv('RESEARCHER_LLM_MODEL', LLM_MODEL),
+        'debator': os.getenv('DEBATOR_LLM_MODEL', LLM_MODEL),
+        'manager': os.getenv('MANAGER_LLM_MODEL', LLM_MODEL)
+    }
+
+    # Optional cascade: nodes of the listed roles answer with their own model first and are
+    # re-asked on LLM_CASCADE_MODEL only when the answer fails validation (unset disables it)
+    LLM_CASCADE_MODEL = os.getenv('LLM_CASCADE_MODEL', None)
+    LLM_CASCADE_ROLES = [role.strip() for role in os.getenv('LLM_CASCADE_ROLES', 'manager').split(',') if role.strip()]
+
+    # Optional request hedging (LLM_HEDGING=true): a call still open at the LLM_HEDGE_QUANTILE of
+    # the latencies observed so far gets a duplicate request and the first answer wins. Hedging
+    # starts after LLM_HEDGE_MIN_SAMPLES calls and covers at most LLM_HEDGE_MAX_RATE of them
+    LLM_HEDGING = os.getenv('LLM_HEDGING', 'false').lower() == 'true'
+    LLM_HEDGE_QUANTILE = float(os.getenv('LLM_HEDGE_QUANTILE', 0.95))
+    LLM_HEDGE_MAX_RATE = float(os.getenv('LLM_HEDGE_MAX_RATE', 0.1))
+    LLM_HEDGE_MIN_SAMPLES = int(os.getenv('LLM_HEDGE_MIN_SAMPLES', 20))
+    LLM_HEDGE_MAX_WORKERS = int(os.getenv('LLM_HEDGE_MAX_WORKERS', 16))
+
     # Embedding Model Configuration
     EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
 
+    # Embedding backend: 'torch' (SentenceTransformer) or 'onnx' (the same model exported
+    # to ONNX on first use, int8-quantized and run with onnxruntime, without torch)
+    EMBEDDING_BACKEND = os.getenv('EMBEDDING_BACKEND', 'torch')
+    EMBEDDING_ONNX_DIR = os.getenv('EMBEDDING_ONNX_DIR', os.path.join(os.getenv('FALLBACK_CACHE_DIR', 'cache'), 'onnx_models'))
+
+    # ONNX backend: intra-op threads (0 uses every core) and texts per inference batch
+    EMBEDDING_THREADS = int(os.getenv('EMBEDDING_THREADS', 0))
+    EMBEDDING_BATCH_SIZE = int(os.getenv('EMBEDDING_BATCH_SIZE', 64))
+
+    # Cosine similarity the int8 model's vectors must keep with the torch model's on every
+    # calibration text; otherwise the full-precision ONNX export is used, so collections
+    # already stored in Chroma stay queryable
+    EMBEDDING_ONNX_MIN_COSINE = float(os.getenv('EMBEDDING_ONNX_MIN_COSINE', 0.99))
+
+    # Persistent embedding cache keyed by model and text hash ('true' or 'false'): vectors are
+    # kept in a memory-mapped float32 file, and the least recently used beyond the cap are evicted
+    EMBEDDING_CACHE = os.getenv('EMBEDDING_CACHE', 'true').lower() == 'true'
+    EMBEDDING_CACHE_DIR = os.getenv('EMBEDDING_CACHE_DIR', os.path.join(os.getenv('FALLBACK_CACHE_DIR', 'cache'), 'embeddings'))
+    EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv('EMBEDDING_CACHE_MAX_ENTRIES', 200000))
+
     # 2. API & Dataflow Settings
     
     # General API retry settings
@@ -36,11 +89,154 @@ s   for different environments (e.g., development, testing, production)
     # Finnhub API Key
     FINNHUB_API_KEY = os.getenv('FINNHUB_API_KEY', None) # Recommended to be set in .env
 
+    # Reddit mention scanner: posts pulled per subreddit hot feed, and how long
+    # (seconds) a pulled feed is shared by all tickers before it is fetched again
+    REDDIT_FEED_LIMIT = int(os.getenv('REDDIT_FEED_LIMIT', 100))
+    REDDIT_SCAN_WINDOW_SECONDS = int(os.getenv('REDDIT_SCAN_WINDOW_SECONDS', 900))
+
+    # Incremental news store: SQLite path, minimum seconds between refreshes of one
+    # symbol/provider, and how many of the newest items the news analyst reads
+    NEWS_STORE_PATH = os.getenv('NEWS_STORE_PATH', os.path.join(FALLBACK_CACHE_DIR, 'news.sqlite3'))
+    NEWS_REFRESH_MIN_SECONDS = int(os.getenv('NEWS_REFRESH_MIN_SECONDS', 300))
+    NEWS_PROMPT_ITEMS = int(os.getenv('NEWS_PROMPT_ITEMS', 20))
+
+    # Stored news items published more than this many days ago are deleted (0 keeps everything)
+    NEWS_RETENTION_DAYS = int(os.getenv('NEWS_RETENTION_DAYS', 90))
+
+    # Estimated shingle similarity (0-1) above which two headlines count as the same story
+    NEWS_DEDUP_THRESHOLD = float(os.getenv('NEWS_DEDUP_THRESHOLD', 0.5))
+
+    # Concurrent identical DataInterface fetches share one request ('true' or 'false')
+    DATA_SINGLE_FLIGHT = os.getenv('DATA_SINGLE_FLIGHT', 'true').lower() == 'true'
+
+    # Fetch keys whose single-flight counts are kept; the least recently used are dropped
+    DATA_SINGLE_FLIGHT_MAX_KEYS = int(os.getenv('DATA_SINGLE_FLIGHT_MAX_KEYS', 256))
+
+    # Per-source circuit breakers: a source fails fast once at least BREAKER_MIN_CALLS of its
+    # last BREAKER_WINDOW calls are recorded and BREAKER_FAILURE_RATE of them failed; after
+    # BREAKER_RESET_SECONDS a single probe call decides whether it recovers
+    BREAKER_FAILURE_RATE = float(os.getenv('BREAKER_FAILURE_RATE', 0.5))
+    BREAKER_MIN_CALLS = int(os.getenv('BREAKER_MIN_CALLS', 4))
+    BREAKER_WINDOW = int(os.getenv('BREAKER_WINDOW', 20))
+    BREAKER_RESET_SECONDS = float(os.getenv('BREAKER_RESET_SECONDS', 60))
+    BREAKER_MAX_WORKERS = int(os.getenv('BREAKER_MAX_WORKERS', 4))
+
+    # Deadline (seconds) of one call to each source; 0 waits indefinitely
+    DATA_SOURCE_DEADLINES = {
+        'yahoo': float(os.getenv('YAHOO_DEADLINE_SECONDS', 15)),
+        'finnhub': float(os.getenv('FINNHUB_DEADLINE_SECONDS', 10)),
+        'google_news': float(os.getenv('GOOGLE_NEWS_DEADLINE_SECONDS', 10)),
+        'reddit': float(os.getenv('REDDIT_DEADLINE_SECONDS', 20))
+    }
+
+    # Local point-in-time price snapshots used by historical (as-of) runs
+    SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR', os.path.join(FALLBACK_CACHE_DIR, 'snapshots'))
+
+    # Largest rounding error (in price units) at which a price column is held as float32
+    # rather than float64; 0.001 keeps prices exact to the cent up to about 30,000
+    PRICE_FLOAT32_MAX_ERROR = float(os.getenv('PRICE_FLOAT32_MAX_ERROR', 0.001))
+
+    # Prompt-keyed LLM response cache, shared by all processes of a backtest
+    LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH', os.path.join(FALLBACK_CACHE_DIR, 'llm_cache.sqlite3'))
+
+    # Offline record/replay of LLM responses and data fetches: 'off', 'record' or 'replay'
+    REPLAY_MODE = os.getenv('REPLAY_MODE', 'off')
+    REPLAY_FIXTURE_PATH = os.getenv('REPLAY_FIXTURE_PATH', os.path.join('fixtures', 'fixtures.sqlite3'))
+
+    # Simulated latency (milliseconds) added to replayed calls, with uniform jitter and a fixed seed
+    REPLAY_LLM_LATENCY_MS = float(os.getenv('REPLAY_LLM_LATENCY_MS', 0))
+    REPLAY_DATA_LATENCY_MS = float(os.getenv('REPLAY_DATA_LATENCY_MS', 0))
+    REPLAY_LATENCY_JITTER_MS = float(os.getenv('REPLAY_LATENCY_JITTER_MS', 0))
+    REPLAY_SEED = int(os.getenv('REPLAY_SEED', 0))
+
+    # Per-node metrics export: a file path (unset disables export) and 'jsonl' or 'otlp'
+    TELEMETRY_EXPORT_PATH = os.getenv('TELEMETRY_EXPORT_PATH', None)
+    TELEMETRY_FORMAT = os.getenv('TELEMETRY_FORMAT', 'jsonl')
+
     # 3. Agent & Graph Settings
     
     # Maximum number of debate rounds in the research phase
     MAX_DEBATE_ROUNDS = int(os.getenv('MAX_DEBATE_ROUNDS', 2))
 
+    # The debate stops early once neither side's argument moved between rounds, i.e. the
+    # embedding cosine similarity of both positions to the previous round is at least this
+    DEBATE_CONVERGENCE_THRESHOLD = float(os.getenv('DEBATE_CONVERGENCE_THRESHOLD', 0.92))
+
+    # Time budget (seconds) of one ticker's run: analysts still pending when it runs out are
+    # abandoned (their calls finish in the background, unused), and the debate stops after
+    # the current round. 0 disables the deadline
+    RUN_DEADLINE_SECONDS = float(os.getenv('RUN_DEADLINE_SECONDS', 0))
+
+    # Adaptive routing: strength (0-1) of the news, technical and social consensus at which
+    # the bull/bear debate and the risk debate are skipped. Values above 1 disable skipping.
+    CONSENSUS_SKIP_DEBATE_THRESHOLD = float(os.getenv('CONSENSUS_SKIP_DEBATE_THRESHOLD', 0.8))
+    CONSENSUS_SKIP_RISK_DEBATE_THRESHOLD = float(os.getenv('CONSENSUS_SKIP_RISK_DEBATE_THRESHOLD', 1.0))
+
+    # Risk debate engine: 'per_role' (three calls) or 'combined' (one structured call,
+    # falling back to per-role calls when the response does not validate)
+    RISK_DEBATE_MODE = os.getenv('RISK_DEBATE_MODE', 'per_role')
+
+    # Portfolio risk stage of watchlist runs: one final-decision request per chunk of
+    # tickers, bounded by prompt size (characters) and by tickers per request
+    PORTFOLIO_RISK_MAX_PROMPT_CHARS = int(os.getenv('PORTFOLIO_RISK_MAX_PROMPT_CHARS', 24000))
+    PORTFOLIO_RISK_MAX_SYMBOLS = int(os.getenv('PORTFOLIO_RISK_MAX_SYMBOLS', 8))
+
+    # Worker processes of watchlist runs, forked after the embedding model loads; 1 runs
+    # the tickers one after another in the main process
+    WATCHLIST_PROCESSES = int(os.getenv('WATCHLIST_PROCESSES', 1))
+
+    # Backtest settings: forward-return horizon (trading days), the return band
+    # within which HOLD/AVOID count as correct, and the process pool size
+    BACKTEST_HORIZON_DAYS = int(os.getenv('BACKTEST_HORIZON_DAYS', 5))
+    BACKTEST_RETURN_BAND = float(os.getenv('BACKTEST_RETURN_BAND', 0.01))
+    BACKTEST_WORKERS = int(os.getenv('BACKTEST_WORKERS', os.cpu_count() or 1))
+
+    # 4. Long-Term Memory Settings
+
+    # Location of the persistent ChromaDB store
+    CHROMA_DB_PATH = os.getenv('CHROMA_DB_PATH', './chroma_db')
+
+    # Full analyses older than this are condensed into one summary per symbol and month
+    MEMORY_ROLLUP_AFTER_DAYS = int(os.getenv('MEMORY_ROLLUP_AFTER_DAYS', 30))
+
+    # Records older than this (summaries included) are archived and removed from Chroma
+    MEMORY_RETENTION_DAYS = int(os.getenv('MEMORY_RETENTION_DAYS', 365))
+
+    # Upper bound on live records kept per stock symbol; the oldest are archived first
+    MEMORY_MAX_RECORDS_PER_SYMBOL = int(os.getenv('MEMORY_MAX_RECORDS_PER_SYMBOL', 60))
+
+    # Directory for the compressed Parquet archive of cold records
+    MEMORY_ARCHIVE_DIR = os.getenv('MEMORY_ARCHIVE_DIR', 'archive')
+
+    # Write the live records to one backup file beside the store before each index rebuild
+    MEMORY_COMPACTION_BACKUP = os.getenv('MEMORY_COMPACTION_BACKUP', 'false').lower() == 'true'
+
+    # 5. Analysis Service Settings
+
+    # Address of the long-lived analysis service (service/server.py); localhost only by default
+    SERVICE_HOST = os.getenv('SERVICE_HOST', '127.0.0.1')
+    SERVICE_PORT = int(os.getenv('SERVICE_PORT', 8765))
+
+    # Graph runs executed at once; further distinct requests wait in line
+    SERVICE_MAX_CONCURRENT_RUNS = int(os.getenv('SERVICE_MAX_CONCURRENT_RUNS', 2))
+
+    # A finished analysis is returned for identical requests for this many seconds
+    SERVICE_RESULT_TTL_SECONDS = int(os.getenv('SERVICE_RESULT_TTL_SECONDS', 900))
+
+    # Durable work queue (work_queue/cli.py): broker backend and its SQLite database
+    QUEUE_BROKER = os.getenv('QUEUE_BROKER', 'sqlite')
+    QUEUE_DB_PATH = os.getenv('QUEUE_DB_PATH', os.path.join(FALLBACK_CACHE_DIR, 'work_queue.sqlite3'))
+
+    # A leased job returns to the queue when its worker stops extending the lease for this long
+    QUEUE_VISIBILITY_TIMEOUT_SECONDS = int(os.getenv('QUEUE_VISIBILITY_TIMEOUT_SECONDS', 900))
+
+    # Attempts before a job is dead-lettered, and the first retry delay (doubled on each retry)
+    QUEUE_MAX_ATTEMPTS = int(os.getenv('QUEUE_MAX_ATTEMPTS', 3))
+    QUEUE_RETRY_BACKOFF_SECONDS = int(os.getenv('QUEUE_RETRY_BACKOFF_SECONDS', 60))
+
+    # Wait (seconds) between polls of an empty queue
+    QUEUE_POLL_SECONDS = float(os.getenv('QUEUE_POLL_SECONDS', 5))
+
 
 
 # Verify configuration loading
@@ -57,6 +253,8 @@ if __name__ == '__main__':
         print("FINNHUB_API_KEY: Not found. Please set it in your .env file.")
         
     print(f"LLM Model: {Config.LLM_MODEL}")
+    print(f"Role Models: {Config.LLM_ROLE_MODELS}, cascade to: {Config.LLM_CASCADE_MODEL or 'disabled'}")
     print(f"Embedding Model: {Config.EMBEDDING_MODEL}")
     print(f"Retry Attempts: {Config.RETRY_ATTEMPTS}")
+    print(f"Memory Retention: {Config.MEMORY_RETENTION_DAYS} days, {Config.MEMORY_MAX_RECORDS_PER_SYMBOL} records/symbol")
     print("--------------------------")
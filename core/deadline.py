@@ -0,0 +1,58 @@
+import time
+import functools
+import threading
+import contextvars
+from typing import Callable, Optional
+
+def remaining_seconds(state) -> Optional[float]:
+    """Seconds left before the run's deadline, or None if the run has no deadline."""
+    deadline_ts = state.get('deadline_ts')
+    return None if deadline_ts is None else deadline_ts - time.time()
+
+def deadline_passed(state) -> bool:
+    remaining = remaining_seconds(state)
+    return remaining is not None and remaining <= 0
+
+def _mark_missing(node_name: str, reason: str) -> dict:
+    log_message = f"Deadline: {node_name} {reason}; continuing without its report."
+    print(log_message)
+    return {"missing_inputs": [node_name], "workflow_log": [log_message]}
+
+def bounded_node(node_name: str, node_fn: Callable) -> Callable:
+    """
+    Wraps an input-gathering node (an analyst) so it cannot hold the run past
+    state['deadline_ts']. Once the deadline has passed the node is skipped; otherwise
+    it runs in a worker thread and is abandoned if it does not finish in time. Either
+    way its name is added to state['missing_inputs'] and the graph continues with the
+    reports that are available.
+
+    An abandoned node is not cancelled: its thread keeps running, LLM retries included,
+    until the call returns. Nodes return partial updates rather than writing to the
+    state, so its late result is discarded, and its late metrics stay out of the
+    node's summary (see core.telemetry.summarize_node).
+    """
+    @functools.wraps(node_fn)
+    def wrapper(state, *args, **kwargs):
+        remaining = remaining_seconds(state)
+        if remaining is None:
+            return node_fn(state, *args, **kwargs)
+        if remaining <= 0:
+            return _mark_missing(node_name, "skipped, the run deadline has passed")
+
+        outcome = {}
+        def run():
+            try:
+                outcome['update'] = node_fn(state, *args, **kwargs)
+            except BaseException as e:
+                outcome['error'] = e
+
+        context = contextvars.copy_context()
+        worker = threading.Thread(target=context.run, args=(run,), name=f"deadline-{node_name}", daemon=True)
+        worker.start()
+        worker.join(remaining)
+        if worker.is_alive():
+            return _mark_missing(node_name, f"abandoned after {remaining:.1f}s at the run deadline")
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome['update']
+    return wrapper
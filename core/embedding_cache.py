@@ -0,0 +1,169 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, List
+import numpy as np
+from core.embedding_interface import EmbeddingInterface
+from core.telemetry import record_cache
+from config.default_config import Config
+
+class EmbeddingCache:
+    """
+    Persistent vector store keyed by text hash. Vectors live in a memory-mapped float32
+    file with one fixed-size slot per entry; a SQLite index maps each key to its slot and
+    tracks when it was last used. Beyond `max_entries` the least recently used entry's
+    slot is reused.
+
+    Every lookup and insert runs in one write-locked transaction, so processes sharing
+    the cache never read a slot while it is being reassigned.
+    """
+
+    def __init__(self, directory: str, dimensions: int, max_entries: int = None):
+        """
+        Args:
+            directory (str): Directory holding the vector file and its index.
+            dimensions (int): Length of every vector.
+            max_entries (int): Entries kept before LRU eviction. Defaults to Config.EMBEDDING_CACHE_MAX_ENTRIES.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.dimensions = dimensions
+        self.max_entries = max_entries or Config.EMBEDDING_CACHE_MAX_ENTRIES
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.index_path = os.path.join(directory, "index.sqlite3")
+        self._local = threading.local()
+        self._map_lock = threading.Lock()
+        self._vectors = None
+
+        conn = self._connection()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, slot INTEGER NOT NULL UNIQUE, last_used REAL NOT NULL);
+            CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+            CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+        """)
+        conn.execute("INSERT OR IGNORE INTO meta VALUES ('dimensions', ?)", (dimensions,))
+        stored = conn.execute("SELECT value FROM meta WHERE name = 'dimensions'").fetchone()[0]
+        if stored != dimensions:
+            raise ValueError(f"Embedding cache '{directory}' holds {stored}-dimensional vectors, not {dimensions}.")
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread, and a new one after fork since SQLite handles must not cross it
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.index_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _slots(self, needed: int) -> np.memmap:
+        """The vector file mapped with room for at least `needed` slots, grown by doubling."""
+        with self._map_lock:
+            if self._vectors is None or len(self._vectors) < needed:
+                row_bytes = self.dimensions * 4
+                current = os.path.getsize(self.vectors_path) // row_bytes if os.path.exists(self.vectors_path) else 0
+                if current < needed:
+                    with open(self.vectors_path, 'ab') as f:
+                        f.truncate(min(max(needed, 2 * current, 1024), self.max_entries) * row_bytes)
+                    current = os.path.getsize(self.vectors_path) // row_bytes
+                self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode='r+', shape=(current, self.dimensions))
+            return self._vectors
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Returns copies of the cached vectors among `keys` and marks them as recently used."""
+        if not keys:
+            return {}
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = []
+            unique = list(dict.fromkeys(keys))
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                rows += conn.execute(f"SELECT key, slot FROM entries WHERE key IN ({','.join('?' * len(chunk))})", chunk).fetchall()
+            found = {}
+            if rows:
+                vectors = self._slots(max(slot for _, slot in rows) + 1)
+                found = {key: np.array(vectors[slot]) for key, slot in rows}
+                conn.executemany("UPDATE entries SET last_used = ? WHERE key = ?", [(time.time(), key) for key in found])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]):
+        """Stores vectors, evicting the least recently used entries once the cache is full."""
+        if not items:
+            return
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            next_slot = conn.execute("SELECT COALESCE(MAX(slot) + 1, 0) FROM entries").fetchone()[0]
+            for key, vector in items.items():
+                if conn.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone():
+                    continue
+                if next_slot < self.max_entries:
+                    slot, next_slot = next_slot, next_slot + 1
+                else:
+                    evicted, slot = conn.execute("SELECT key, slot FROM entries ORDER BY last_used LIMIT 1").fetchone()
+                    conn.execute("DELETE FROM entries WHERE key = ?", (evicted,))
+                # The vector is written before its row, so a committed row always points at its data
+                self._slots(slot + 1)[slot] = vector
+                conn.execute("INSERT INTO entries VALUES (?, ?, ?)", (key, slot, time.time()))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+class CachedEmbedding(EmbeddingInterface):
+    """
+    An EmbeddingInterface decorator that serves previously embedded texts from an
+    EmbeddingCache keyed by model and text hash, so re-runs, repeated memory queries and
+    re-ingested documents only encode the texts the model has not seen.
+    """
+
+    def __init__(self, embedding_model: EmbeddingInterface, cache_dir: str = None, max_entries: int = None):
+        """
+        Args:
+            embedding_model: The model used on a cache miss.
+            cache_dir: Root directory of the cache. Defaults to Config.EMBEDDING_CACHE_DIR.
+            max_entries: Entries kept before LRU eviction. Defaults to Config.EMBEDDING_CACHE_MAX_ENTRIES.
+        """
+        self.embedding_model = embedding_model
+        self.model_name = getattr(embedding_model, 'model_name', type(embedding_model).__name__)
+        # Backends of one model produce slightly different vectors, so each gets its own namespace
+        self.namespace = f"{self.model_name}@{type(embedding_model).__name__}"
+        directory = os.path.join(cache_dir or Config.EMBEDDING_CACHE_DIR, re.sub(r'[^A-Za-z0-9_.@-]+', '_', self.namespace))
+        self.cache = EmbeddingCache(directory, embedding_model.get_embedding_dimensions(), max_entries)
+        self.hits = 0
+        self.misses = 0
+
+    def get_embedding_dimensions(self) -> int:
+        return self.embedding_model.get_embedding_dimensions()
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.namespace}\0{text}".encode('utf-8')).hexdigest()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        found = self.cache.get_many(keys)
+        for key in keys:
+            record_cache('embedding', key in found)
+        hits = sum(1 for key in keys if key in found)
+        self.hits += hits
+        self.misses += len(keys) - hits
+
+        missing = {key: text for key, text in zip(keys, texts) if key not in found}
+        if missing:
+            vectors = self.embedding_model.embed_documents(list(missing.values()))
+            fresh = {key: np.asarray(vector, dtype=np.float32) for key, vector in zip(missing, vectors)}
+            self.cache.put_many(fresh)
+            found.update(fresh)
+        if hits:
+            print(f"Embedding cache: {hits} of {len(texts)} text(s) served from cache.")
+        return [found[key].tolist() for key in keys]
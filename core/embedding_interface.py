@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from typing import List
-from sentence_transformers import SentenceTransformer
+from config.default_config import Config
 
 class EmbeddingInterface(ABC):
     """
@@ -31,6 +31,9 @@ class HuggingFaceEmbedding(EmbeddingInterface):
         Args:
             model_name: The name of the Sentence Transformer model to use.
         """
+        # Imported here so the ONNX backend never loads torch
+        from sentence_transformers import SentenceTransformer
+
         print(f"Loading HuggingFace embedding model: '{model_name}'...")
         self.model_name = model_name 
         self.model = SentenceTransformer(self.model_name)
@@ -50,3 +53,27 @@ class HuggingFaceEmbedding(EmbeddingInterface):
         embeddings = self.model.encode(texts, convert_to_tensor=False)
         print("Embeddings generated successfully.")
         return [embedding.tolist() for embedding in embeddings]
+
+def create_embedding_model(model_name: str = None, backend: str = None) -> EmbeddingInterface:
+    """
+    Creates the configured embedding model, behind the persistent embedding cache
+    (core/embedding_cache.py) unless EMBEDDING_CACHE is false.
+
+    Args:
+        model_name (str): The Sentence Transformer model. Defaults to Config.EMBEDDING_MODEL.
+        backend (str): 'torch' (HuggingFaceEmbedding) or 'onnx' (OnnxEmbedding, see
+                       core/onnx_embedding.py). Defaults to Config.EMBEDDING_BACKEND.
+    """
+    model_name = model_name or Config.EMBEDDING_MODEL
+    backend = backend or Config.EMBEDDING_BACKEND
+    if backend == 'onnx':
+        from core.onnx_embedding import OnnxEmbedding
+        model = OnnxEmbedding(model_name=model_name)
+    elif backend == 'torch':
+        model = HuggingFaceEmbedding(model_name=model_name)
+    else:
+        raise ValueError(f"Unknown embedding backend: '{backend}'. Use 'torch' or 'onnx'.")
+    if Config.EMBEDDING_CACHE:
+        from core.embedding_cache import CachedEmbedding
+        model = CachedEmbedding(model)
+    return model
@@ -0,0 +1,72 @@
+import os
+import zlib
+import pickle
+import sqlite3
+import hashlib
+import threading
+from typing import Any
+
+_MISSING = object()
+
+def fixture_key(*parts: Any) -> str:
+    """Builds a stable key from the repr of its parts (prompts, symbols, arguments)."""
+    return hashlib.sha256("\x1f".join(repr(p) for p in parts).encode('utf-8')).hexdigest()
+
+class FixtureStore:
+    """
+    A compact, process-safe key/value store for recorded LLM responses and data frames.
+
+    Values are pickled and zlib-compressed into a single SQLite file, grouped by
+    `kind` (e.g. 'llm', 'get_historical_data'), so a complete recording of a run can
+    be copied to an offline machine as one file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Path of the SQLite file. Parent directories are created if needed.
+        """
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute("CREATE TABLE IF NOT EXISTS fixtures (kind TEXT, key TEXT, payload BLOB, PRIMARY KEY (kind, key))")
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections cannot be shared across threads, so each thread opens its own.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, kind: str, key: str, default: Any = _MISSING) -> Any:
+        """
+        Returns the stored value, or `default` if given.
+
+        Raises:
+            KeyError: If the fixture does not exist and no default was given.
+        """
+        row = self._connection().execute("SELECT payload FROM fixtures WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+        if row is None:
+            if default is _MISSING:
+                raise KeyError(f"No '{kind}' fixture for key {key[:12]}...")
+            return default
+        return pickle.loads(zlib.decompress(row[0]))
+
+    def put(self, kind: str, key: str, value: Any):
+        """Stores (or replaces) a value."""
+        payload = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), 6)
+        conn = self._connection()
+        conn.execute("INSERT OR REPLACE INTO fixtures (kind, key, payload) VALUES (?, ?, ?)", (kind, key, payload))
+        conn.commit()
+
+    def count(self, kind: str = None) -> int:
+        """Returns the number of stored fixtures, optionally for one kind."""
+        if kind is None:
+            return self._connection().execute("SELECT COUNT(*) FROM fixtures").fetchone()[0]
+        return self._connection().execute("SELECT COUNT(*) FROM fixtures WHERE kind = ?", (kind,)).fetchone()[0]
@@ -0,0 +1,41 @@
+from core.llm_interface import LLMInterface
+from core.fixture_store import FixtureStore, fixture_key
+from core.telemetry import record_cache
+
+class CachedLLM(LLMInterface):
+    """
+    An LLMInterface decorator that stores responses in a SQLite file keyed by model
+    and prompt, so identical prompts are answered once across runs and processes.
+
+    Backtests replay the same (symbol, date) prompts many times while only one node's
+    prompt changes; the cache lets every unchanged node be served locally.
+    """
+
+    def __init__(self, llm: LLMInterface, cache_path: str, model_name: str = None):
+        """
+        Args:
+            llm: The underlying LLM used on a cache miss.
+            cache_path: Path of the SQLite cache file.
+            model_name: Namespace for the cache keys. Defaults to `llm.model`.
+        """
+        self.llm = llm
+        self.model = model_name or getattr(llm, 'model', type(llm).__name__)
+        self.store = FixtureStore(cache_path)
+        self.hits = 0
+        self.misses = 0
+
+    def invoke(self, prompt: str) -> str:
+        key = fixture_key(self.model, prompt)
+        response = self.store.get('llm', key, default=None)
+        record_cache('llm', response is not None)
+        if response is not None:
+            self.hits += 1
+            print(f"LLM cache hit for model '{self.model}'.")
+            return response
+
+        self.misses += 1
+        response = self.llm.invoke(prompt)
+        # Empty responses are not cached so a transient failure is retried next time.
+        if response:
+            self.store.put('llm', key, response)
+        return response
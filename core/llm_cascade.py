@@ -0,0 +1,80 @@
+import re
+import threading
+from typing import Callable, Optional
+from core.llm_interface import LLMInterface
+from core.telemetry import record_event
+
+# A validator takes a response and returns None when it is acceptable, or a short reason to escalate
+Validator = Callable[[str], Optional[str]]
+
+_REFUSAL = re.compile(r"\b(i cannot|i can't|i am unable|i'm unable|as an ai)\b", re.IGNORECASE)
+
+def min_length(chars: int) -> Validator:
+    """Rejects empty or truncated responses and refusals."""
+    def validate(response: str) -> Optional[str]:
+        text = (response or '').strip()
+        if len(text) < chars:
+            return f"response shorter than {chars} characters"
+        if _REFUSAL.search(text[:200]):
+            return "response looks like a refusal"
+        return None
+    return validate
+
+def matches(pattern: str, description: str) -> Validator:
+    """Rejects responses that do not match a regular expression (searched, case-insensitive, multiline)."""
+    compiled = re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+    def validate(response: str) -> Optional[str]:
+        return None if compiled.search(response or '') else f"missing {description}"
+    return validate
+
+def all_of(*validators: Validator) -> Validator:
+    """Combines validators; the first failure is reported."""
+    def validate(response: str) -> Optional[str]:
+        for validator in validators:
+            reason = validator(response)
+            if reason:
+                return reason
+        return None
+    return validate
+
+class CascadeLLM(LLMInterface):
+    """
+    An LLMInterface that answers with a cheap model first and escalates the prompt to
+    a stronger model only when the cheap answer fails validation or the call errors.
+    """
+
+    def __init__(self, primary: LLMInterface, fallback: LLMInterface, validator: Validator, name: str = 'cascade'):
+        """
+        Args:
+            primary: The cheap model tried first.
+            fallback: The stronger model used on escalation.
+            validator: Returns None for an acceptable response, else the reason to escalate.
+            name: Label used in log lines and telemetry events (usually the node name).
+        """
+        self.primary = primary
+        self.fallback = fallback
+        self.validator = validator
+        self.name = name
+        self.model = getattr(primary, 'model', None)
+        self.calls = 0
+        self.escalations = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, prompt: str) -> str:
+        with self._lock:
+            self.calls += 1
+        try:
+            response = self.primary.invoke(prompt)
+            reason = self.validator(response)
+        except Exception as e:
+            response, reason = None, f"primary model failed: {e}"
+
+        if reason is None:
+            return response
+
+        with self._lock:
+            self.escalations += 1
+        fallback_model = getattr(self.fallback, 'model', type(self.fallback).__name__)
+        print(f"Cascade '{self.name}': escalating to '{fallback_model}' ({reason}).")
+        record_event('llm_escalation', cascade=self.name, reason=reason, to_model=fallback_model)
+        return self.fallback.invoke(prompt)
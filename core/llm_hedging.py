@@ -0,0 +1,169 @@
+import math
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List
+from core.llm_interface import LLMInterface
+from core.telemetry import record_event, detached_context, merge_metrics
+from config.default_config import Config
+
+class LatencyHistogram:
+    """
+    Thread-safe latency histogram with logarithmic buckets (about 10% wide) from
+    `min_seconds` to `max_seconds`. Quantiles are reported as bucket upper bounds.
+    """
+
+    def __init__(self, min_seconds: float = 0.05, max_seconds: float = 300.0, growth: float = 1.1):
+        self.min_seconds = min_seconds
+        self.growth = growth
+        self.bounds: List[float] = []
+        bound = min_seconds
+        while bound < max_seconds:
+            self.bounds.append(bound)
+            bound *= growth
+        self.bounds.append(max_seconds)
+        self.counts = [0] * (len(self.bounds) + 1)  # The last bucket collects overflow
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def _bucket(self, seconds: float) -> int:
+        if seconds <= self.min_seconds:
+            return 0
+        return min(int(math.ceil(math.log(seconds / self.min_seconds, self.growth))), len(self.bounds))
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self.counts[self._bucket(seconds)] += 1
+            self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """The latency below which a fraction `q` of the observations fall (None when empty)."""
+        with self._lock:
+            if not self.count:
+                return None
+            rank, seen = q * self.count, 0
+            for index, count in enumerate(self.counts):
+                seen += count
+                if seen >= rank:
+                    return self.bounds[min(index, len(self.bounds) - 1)]
+            return self.bounds[-1]
+
+class HedgedLLM(LLMInterface):
+    """
+    An LLMInterface decorator that cuts tail latency. When a request has not returned
+    by the `quantile` latency observed so far, a duplicate request is sent and the first
+    successful response wins. The loser is cancelled if it has not started yet; a request
+    already on the wire cannot be interrupted, so it finishes in the background and its
+    answer is discarded. Hedges are capped at `max_hedge_rate` of all calls.
+
+    Only the winner's LLM call is recorded on the node. The loser shows up as a
+    'hedge_wasted' event, and its cost, known once it finishes, is totalled in stats().
+    """
+
+    def __init__(self, llm: LLMInterface, quantile: float = None, max_hedge_rate: float = None,
+                 min_samples: int = None, max_workers: int = None):
+        """
+        Args:
+            llm: The LLM to hedge (usually a QwenLLM).
+            quantile: Latency quantile after which a duplicate is sent, e.g. 0.95.
+            max_hedge_rate: Upper bound on hedged calls as a fraction of all calls.
+            min_samples: Observed calls required before the first hedge.
+            max_workers: Threads available to in-flight requests, including abandoned ones.
+        """
+        self.llm = llm
+        self.model = getattr(llm, 'model', None)
+        self.quantile = quantile or Config.LLM_HEDGE_QUANTILE
+        self.max_hedge_rate = Config.LLM_HEDGE_MAX_RATE if max_hedge_rate is None else max_hedge_rate
+        self.min_samples = Config.LLM_HEDGE_MIN_SAMPLES if min_samples is None else min_samples
+        self.histogram = LatencyHistogram()
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.wasted_calls = 0
+        self.wasted_cost_usd = 0.0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or Config.LLM_HEDGE_MAX_WORKERS, thread_name_prefix="llm-hedge")
+
+    def _submit(self, prompt: str):
+        # Each request records into its own collector; invoke() attributes the winner's to the node
+        context, collector = detached_context()
+        started = time.perf_counter()
+        future = self._executor.submit(context.run, self.llm.invoke, prompt)
+        future.collector = collector
+        future.add_done_callback(lambda f: not f.cancelled() and f.exception() is None and self.histogram.observe(time.perf_counter() - started))
+        return future
+
+    def _waste(self, future):
+        # Runs once the losing request finished (or at once, if it already had)
+        cost = sum(call['cost_usd'] for call in future.collector['llm_calls'])
+        with self._lock:
+            self.wasted_calls += 1
+            self.wasted_cost_usd += cost
+
+    def _result(self, future) -> str:
+        merge_metrics(future.collector)
+        return future.result()
+
+    def _claim_hedge(self) -> bool:
+        with self._lock:
+            if (self.hedges + 1) / self.calls > self.max_hedge_rate:
+                return False
+            self.hedges += 1
+            return True
+
+    def invoke(self, prompt: str) -> str:
+        with self._lock:
+            self.calls += 1
+        hedge_after = self.histogram.quantile(self.quantile) if self.histogram.count >= self.min_samples else None
+
+        primary = self._submit(prompt)
+        if hedge_after is None:
+            wait([primary])
+            return self._result(primary)
+        done, _ = wait([primary], timeout=hedge_after)
+        if done or not self._claim_hedge():
+            wait([primary])
+            return self._result(primary)
+
+        print(f"Hedging '{self.model}' request: no response after {hedge_after:.2f}s (p{self.quantile * 100:g}).")
+        hedge = self._submit(prompt)
+        pending = {primary, hedge}
+        error = None
+        failed = set()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    # A failed request was spent on this node as much as the winner
+                    merge_metrics(future.collector)
+                    failed.add(future)
+                    error = future.exception()
+                    continue
+                loser = hedge if future is primary else primary
+                if loser not in failed and not loser.cancel():
+                    # Already on the wire: its cost is known now only if it has finished as well
+                    record_event('hedge_wasted', model=self.model, request='primary' if loser is primary else 'hedge',
+                                 cost_usd=round(sum(c['cost_usd'] for c in loser.collector['llm_calls']), 6) if loser.done() else None)
+                    loser.add_done_callback(self._waste)
+                if future is hedge:
+                    with self._lock:
+                        self.hedge_wins += 1
+                record_event('llm_hedge', model=self.model, after_seconds=round(hedge_after, 3), winner='hedge' if future is hedge else 'primary')
+                return self._result(future)
+        raise error
+
+    def stats(self) -> Dict:
+        """Call and hedge counts, the calls and cost spent on losing requests, and the latency quantiles observed so far."""
+        with self._lock:
+            calls, hedges, wins = self.calls, self.hedges, self.hedge_wins
+            wasted_calls, wasted_cost = self.wasted_calls, self.wasted_cost_usd
+        return {
+            "calls": calls,
+            "hedges": hedges,
+            "hedge_rate": round(hedges / calls, 4) if calls else 0.0,
+            "hedge_wins": wins,
+            "wasted_calls": wasted_calls,
+            "wasted_cost_usd": round(wasted_cost, 6),
+            "observed": self.histogram.count,
+            **{f"p{int(q * 100)}_seconds": self.histogram.quantile(q) for q in (0.5, 0.95, 0.99)}
+        }
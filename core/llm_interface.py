@@ -1,8 +1,13 @@
 import os
+import sys
+import time
 from abc import ABC, abstractmethod
 from http import HTTPStatus
 import dashscope
-from tenacity import retry, stop_after_attempt, wait_exponential, RetryError
+from tenacity import Retrying, stop_after_attempt, wait_exponential, RetryError
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.telemetry import record_llm_call
 
 class LLMInterface(ABC):
     """
@@ -63,13 +68,32 @@ class QwenLLM(LLMInterface):
         # Set the API endpoint to the international service URL.
         dashscope.base_http_api_url = 'https://dashscope-intl.aliyuncs.com/api/v1'
 
-    @retry(
-        stop=stop_after_attempt(3), 
-        wait=wait_exponential(multiplier=1, min=4, max=10)
-    )
     def invoke(self, prompt: str) -> str:
+        """
+        Calls the model with exponential-backoff retries and records the latency,
+        retry count and token usage of the request for instrumentation.
+        """
+        started, t0 = time.time(), time.perf_counter()
+        retries = 0
+        usage = {}
+        try:
+            for attempt in Retrying(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10)):
+                with attempt:
+                    retries = attempt.retry_state.attempt_number - 1
+                    content, usage = self._call(prompt)
+            return content
+        finally:
+            record_llm_call(
+                self.model, started, time.perf_counter() - t0, retries,
+                usage.get('input_tokens', 0), usage.get('output_tokens', 0)
+            )
+
+    def _call(self, prompt: str) -> tuple:
         """
         The method that makes the actual API call. A timeout and generation parameters have been added.
+        
+        Returns:
+            A (content, usage) tuple, where usage holds the input and output token counts.
         """
         print(f"Invoking Qwen model '{self.model}' with temp={self.temperature}, top_p={self.top_p}...")
         
@@ -89,11 +113,15 @@ class QwenLLM(LLMInterface):
 
             if response.status_code == HTTPStatus.OK:
                 print("Qwen API call successful.")
-                return response.output.choices[0].message.content
+                usage = getattr(response, 'usage', None) or {}
+                return response.output.choices[0].message.content, {
+                    'input_tokens': usage.get('input_tokens', 0) or 0,
+                    'output_tokens': usage.get('output_tokens', 0) or 0
+                }
             else:
                 print(f"Error from DashScope API: Status {response.status_code}, Code: {response.code}, Message: {response.message}")
                 response.raise_for_status()
-                return ""
+                return "", {}
 
         except Exception as e:
             print(f"An unexpected error occurred while calling Qwen LLM: {e}")
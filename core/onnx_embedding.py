@@ -0,0 +1,231 @@
+import os
+import sys
+import json
+from typing import Dict, List
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.embedding_interface import EmbeddingInterface
+from config.default_config import Config
+
+# Texts the exported models are checked on against the original SentenceTransformer
+CALIBRATION_TEXTS = [
+    "BUY",
+    "NVDA: strong data-center demand and expanding margins support the bull case.",
+    "The company missed revenue estimates and cut its full-year guidance, citing weaker consumer spending.",
+    "RSI is above 70 and the price closed well above the upper Bollinger band, suggesting overbought conditions.",
+    "Final Recommendation: HOLD. The valuation already prices in most of the expected growth, while "
+    "regulatory risk in the EU and a slowing smartphone cycle limit the upside over the next quarter.",
+    "Retail sentiment on r/wallstreetbets turned very bearish after the earnings call.",
+    "Aggressive take: the pullback is an entry point. Conservative take: wait for the downtrend to break. "
+    "Neutral take: scale in with a tight stop below the 200-day moving average.",
+    "Debt-to-equity rose to 1.8 while free cash flow turned negative for the second consecutive quarter.",
+]
+
+_SUPPORTED_MODULES = {"Transformer", "Pooling", "Normalize"}
+
+def _model_dir(model_name: str) -> str:
+    return os.path.join(Config.EMBEDDING_ONNX_DIR, model_name.replace('/', '__'))
+
+def _cosines(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return np.sum(a * b, axis=1)
+
+def export_onnx_model(model_name: str, output_dir: str = None, calibration_texts: List[str] = None,
+                      min_cosine: float = None) -> Dict:
+    """
+    Exports a SentenceTransformer to ONNX, quantizes its weights to int8, and checks both
+    against the original model. This is the only step that needs torch; OnnxEmbedding runs
+    the result with onnxruntime alone.
+
+    The int8 model is selected when its vectors stay within `min_cosine` of the original
+    ones on every calibration text; otherwise the full-precision export is used, so
+    vectors already stored in Chroma remain comparable with new ones either way.
+
+    Args:
+        model_name (str): The SentenceTransformer model name or path.
+        output_dir (str): Where the models, tokenizer and metadata are written.
+        calibration_texts (List[str]): Texts for the check. Defaults to CALIBRATION_TEXTS.
+        min_cosine (float): Required cosine similarity. Defaults to Config.EMBEDDING_ONNX_MIN_COSINE.
+
+    Returns:
+        The metadata written to embedding_config.json.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    output_dir = output_dir or _model_dir(model_name)
+    calibration_texts = calibration_texts or CALIBRATION_TEXTS
+    min_cosine = Config.EMBEDDING_ONNX_MIN_COSINE if min_cosine is None else min_cosine
+    print(f"Exporting embedding model '{model_name}' to ONNX in '{output_dir}'...")
+
+    st_model = SentenceTransformer(model_name, device='cpu')
+    module_types = [type(module).__name__ for module in st_model]
+    if not set(module_types) <= _SUPPORTED_MODULES:
+        raise ValueError(f"'{model_name}' uses modules the ONNX backend does not implement: {module_types}")
+    pooling_module = next(module for module in st_model if type(module).__name__ == "Pooling")
+    # sentence-transformers 2.x exposes the mode through a method, later versions as an attribute
+    pooling = pooling_module.get_pooling_mode_str() if hasattr(pooling_module, 'get_pooling_mode_str') else pooling_module.pooling_mode
+    if pooling not in ("mean", "cls", "max"):
+        raise ValueError(f"Pooling mode '{pooling}' is not supported by the ONNX backend.")
+
+    tokenizer = st_model.tokenizer
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in tokenizer.model_input_names]
+    transformer = st_model[0].auto_model.eval()
+
+    class _Encoder(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, *inputs):
+            return self.transformer(**dict(zip(input_names, inputs))).last_hidden_state
+
+    os.makedirs(output_dir, exist_ok=True)
+    sample = tokenizer(calibration_texts[:2], padding=True, return_tensors='pt')
+    fp32_path = os.path.join(output_dir, "model.onnx")
+    int8_path = os.path.join(output_dir, "model_int8.onnx")
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(_Encoder(), tuple(sample[name] for name in input_names), fp32_path,
+                          input_names=input_names, output_names=["last_hidden_state"],
+                          dynamic_axes=dynamic_axes, opset_version=17, dynamo=False)
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    tokenizer.save_pretrained(output_dir)
+
+    meta = {
+        "model_name": model_name,
+        "pooling": pooling,
+        "normalize": "Normalize" in module_types,
+        "max_seq_length": st_model.max_seq_length,
+        "dimensions": st_model.get_sentence_embedding_dimension(),
+        "input_names": input_names,
+        "pad_token": tokenizer.pad_token,
+        "pad_token_id": tokenizer.pad_token_id,
+    }
+    reference = st_model.encode(calibration_texts, convert_to_numpy=True)
+    for file_name, key in (("model_int8.onnx", "int8_min_cosine"), ("model.onnx", "fp32_min_cosine")):
+        candidate = OnnxEmbedding(model_dir=output_dir, meta={**meta, "model_file": file_name}, threads=0)
+        meta[key] = float(_cosines(reference, np.asarray(candidate.embed_documents(calibration_texts))).min())
+    meta["model_file"] = "model_int8.onnx" if meta["int8_min_cosine"] >= min_cosine else "model.onnx"
+    with open(os.path.join(output_dir, "embedding_config.json"), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    print(f"Export complete: int8 min cosine {meta['int8_min_cosine']:.5f}, fp32 min cosine {meta['fp32_min_cosine']:.5f} "
+          f"(required {min_cosine}); using {meta['model_file']}.")
+    return meta
+
+class OnnxEmbedding(EmbeddingInterface):
+    """
+    CPU implementation of the EmbeddingInterface: an exported (and, within tolerance,
+    int8-quantized) SentenceTransformer run with onnxruntime and the fast tokenizer,
+    without loading torch. The model is exported on first use (see export_onnx_model).
+
+    Texts are sorted by length and embedded in batches that are padded only to their own
+    longest text, so a batch of short headlines does not pay for one long report.
+    """
+
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', model_dir: str = None, threads: int = None,
+                 batch_size: int = None, meta: Dict = None):
+        """
+        Initializes the ONNX embedding model.
+
+        Args:
+            model_name: The SentenceTransformer model the ONNX model was exported from.
+            model_dir: Directory of the export. Defaults to one per model under Config.EMBEDDING_ONNX_DIR.
+            threads: onnxruntime intra-op threads; 0 uses every core. Defaults to Config.EMBEDDING_THREADS.
+            batch_size: Texts per inference batch. Defaults to Config.EMBEDDING_BATCH_SIZE.
+            meta: Export metadata, read from the model directory when omitted.
+        """
+        from tokenizers import Tokenizer
+
+        self.model_dir = model_dir or _model_dir(model_name)
+        meta_path = os.path.join(self.model_dir, "embedding_config.json")
+        if meta is None:
+            if not os.path.exists(meta_path):
+                export_onnx_model(model_name, self.model_dir)
+            with open(meta_path) as f:
+                meta = json.load(f)
+        self.meta = meta
+        self.model_name = meta["model_name"]
+        self.batch_size = batch_size or Config.EMBEDDING_BATCH_SIZE
+        print(f"Loading ONNX embedding model: '{self.model_name}' ({meta['model_file']})...")
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(self.model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=meta["max_seq_length"])
+        self.tokenizer.enable_padding(pad_id=meta["pad_token_id"], pad_token=meta["pad_token"])
+
+        self.threads = Config.EMBEDDING_THREADS if threads is None else threads
+        self._session_pid = None
+        self._session()
+        print("Embedding model loaded successfully.")
+
+    def _session(self):
+        # onnxruntime's thread pool does not survive fork(), so a forked worker (see
+        # core/process_pool.py) opens its own session, sized to its share of the cores
+        if self._session_pid != os.getpid():
+            import onnxruntime as ort
+            from core.process_pool import worker_threads
+
+            options = ort.SessionOptions()
+            options.intra_op_num_threads = worker_threads() if self._session_pid is not None else self.threads
+            options.inter_op_num_threads = 1
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            self.session = ort.InferenceSession(os.path.join(self.model_dir, self.meta["model_file"]), options,
+                                                providers=["CPUExecutionProvider"])
+            self._session_pid = os.getpid()
+        return self.session
+
+    def get_embedding_dimensions(self) -> int:
+        """
+        Gets the embedding dimension of the loaded model.
+        """
+        return self.meta["dimensions"]
+
+    def _pool(self, hidden: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        if self.meta["pooling"] == "cls":
+            pooled = hidden[:, 0]
+        elif self.meta["pooling"] == "max":
+            pooled = np.where(mask[:, :, None] > 0, hidden, -1e9).max(axis=1)
+        else:
+            weights = mask[:, :, None].astype(hidden.dtype)
+            pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+        if self.meta["normalize"]:
+            pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generates embeddings for a list of texts.
+        """
+        print(f"Generating embeddings for {len(texts)} document(s)...")
+        embeddings = np.zeros((len(texts), self.meta["dimensions"]), dtype=np.float32)
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            encodings = self.tokenizer.encode_batch([texts[i] for i in batch])
+            inputs = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+                "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+            }
+            hidden = self._session().run(None, {name: inputs[name] for name in self.meta["input_names"]})[0]
+            embeddings[batch] = self._pool(hidden, inputs["attention_mask"])
+        print("Embeddings generated successfully.")
+        return embeddings.tolist()
+
+if __name__ == '__main__':
+
+    import time
+    from core.embedding_interface import HuggingFaceEmbedding
+
+    texts = CALIBRATION_TEXTS * 32
+    vectors = {}
+    for backend in (HuggingFaceEmbedding(Config.EMBEDDING_MODEL), OnnxEmbedding(Config.EMBEDDING_MODEL)):
+        started = time.perf_counter()
+        vectors[type(backend).__name__] = np.asarray(backend.embed_documents(texts))
+        print(f"{type(backend).__name__}: {len(texts) / (time.perf_counter() - started):.0f} texts/s")
+    print(f"Min cosine, ONNX vs. torch: {_cosines(*vectors.values()).min():.5f}")
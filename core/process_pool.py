@@ -0,0 +1,69 @@
+import os
+import gc
+import sys
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator
+
+# Objects the parent prepared before forking (e.g. a loaded embedding model), inherited
+# copy-on-write by every worker
+_inherited: Dict[str, Any] = {}
+
+# Intra-op threads of this worker process; 0 (every core) outside a pool
+_worker_threads = 0
+
+def inherited(name: str, default: Any = None) -> Any:
+    """Returns an object the parent shared with forked workers, or `default` (e.g. under spawn)."""
+    return _inherited.get(name, default)
+
+def worker_threads() -> int:
+    """Intra-op threads a model in this process should use: the worker's share of the cores, or 0 for all."""
+    return _worker_threads
+
+def _init_worker(threads: int, initializer: Callable, initargs: tuple):
+    # Each worker gets its share of the cores for intra-op parallelism instead of all of them
+    global _worker_threads
+    _worker_threads = threads
+    if 'torch' in sys.modules:
+        sys.modules['torch'].set_num_threads(threads)
+    if initializer is not None:
+        initializer(*initargs)
+
+@contextmanager
+def forked_pool(workers: int, initializer: Callable = None, initargs: tuple = (),
+                shared: Dict[str, Any] = None) -> Iterator[ProcessPoolExecutor]:
+    """
+    A process pool whose workers are forked from the current process, so heavy objects
+    loaded beforehand (model weights above all) are shared copy-on-write rather than
+    loaded once per worker. Workers read them back with inherited().
+
+    The garbage collector is frozen while the pool is open: collections in the workers
+    would otherwise write to every inherited object header and copy the pages holding
+    them. Where fork is unavailable the pool falls back to the default start method and
+    inherited() returns the default, so initializers must be able to load their own copy.
+
+    Args:
+        workers (int): Number of worker processes.
+        initializer (Callable): Optional function run once in every worker, after inheritance.
+        initargs (tuple): Arguments for `initializer`; must be picklable.
+        shared (Dict[str, Any]): Objects to hand to the workers by name.
+    """
+    _inherited.update(shared or {})
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+    else:
+        print("Fork is not available on this platform; each worker loads its own models.")
+        context = None
+
+    gc.collect()
+    gc.freeze()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                                 initargs=(threads, initializer, initargs)) as pool:
+            yield pool
+    finally:
+        gc.unfreeze()
+        for name in shared or {}:
+            _inherited.pop(name, None)
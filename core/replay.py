@@ -0,0 +1,130 @@
+import time
+import random
+import functools
+import threading
+from typing import Any, Callable
+from core.llm_interface import LLMInterface
+from core.fixture_store import FixtureStore, fixture_key
+from core.telemetry import record_cache, record_llm_call
+from config.default_config import Config
+
+RECORD = 'record'
+REPLAY = 'replay'
+OFF = 'off'
+
+class FixtureMissError(RuntimeError):
+    """Raised in replay mode when a prompt or data request was never recorded."""
+
+class SimulatedLatency:
+    """
+    Deterministic latency model for replayed calls: a mean plus uniform jitter,
+    drawn from a seeded generator so repeated benchmark runs sleep identically.
+    """
+
+    def __init__(self, mean_ms: float = 0.0, jitter_ms: float = 0.0, seed: int = 0):
+        self.mean_ms = mean_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sleep(self):
+        if self.mean_ms <= 0 and self.jitter_ms <= 0:
+            return
+        with self._lock:
+            delay_ms = self.mean_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+        time.sleep(max(delay_ms, 0.0) / 1000.0)
+
+class ReplaySession:
+    """
+    Routes calls through the fixture store according to the mode:
+    'off' calls the live function, 'record' calls it and stores the result, and
+    'replay' serves the stored result without touching the network.
+    """
+
+    def __init__(self, mode: str, store: FixtureStore = None, latency: SimulatedLatency = None):
+        if mode not in (OFF, RECORD, REPLAY):
+            raise ValueError(f"Unknown replay mode: '{mode}'. Use 'off', 'record' or 'replay'.")
+        self.mode = mode
+        self.store = store
+        self.latency = latency or SimulatedLatency()
+
+    def call(self, kind: str, key: str, fn: Callable[[], Any]) -> Any:
+        if self.mode == OFF:
+            return fn()
+        if self.mode == REPLAY:
+            try:
+                value = self.store.get(kind, key)
+            except KeyError:
+                record_cache('fixture', False)
+                raise FixtureMissError(f"No recorded '{kind}' fixture for this request. Re-record the fixtures with REPLAY_MODE=record.")
+            record_cache('fixture', True)
+            self.latency.sleep()
+            return value
+        value = fn()
+        self.store.put(kind, key, value)
+        return value
+
+_data_session = None
+_data_session_lock = threading.Lock()
+
+def get_data_session() -> ReplaySession:
+    """Returns the process-wide session used by DataInterface, created from Config on first use."""
+    global _data_session
+    with _data_session_lock:
+        if _data_session is None:
+            store = FixtureStore(Config.REPLAY_FIXTURE_PATH) if Config.REPLAY_MODE != OFF else None
+            latency = SimulatedLatency(Config.REPLAY_DATA_LATENCY_MS, Config.REPLAY_LATENCY_JITTER_MS, Config.REPLAY_SEED)
+            _data_session = ReplaySession(Config.REPLAY_MODE, store, latency)
+        return _data_session
+
+def set_data_session(session: ReplaySession):
+    """Overrides the DataInterface session, e.g. to point a benchmark at a specific fixture file."""
+    global _data_session
+    with _data_session_lock:
+        _data_session = session
+
+def recorded(kind: str):
+    """
+    Decorator for DataInterface methods: keys each call by the method arguments and
+    the instance's as-of date, and routes it through the data replay session.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            key = fixture_key(kind, args, sorted(kwargs.items()), getattr(self, 'as_of_date', None))
+            return get_data_session().call(kind, key, lambda: method(self, *args, **kwargs))
+        return wrapper
+    return decorator
+
+class RecordReplayLLM(LLMInterface):
+    """
+    LLMInterface decorator that records prompts and responses, or replays them offline.
+    In replay mode no underlying LLM (and therefore no API key) is required.
+    """
+
+    def __init__(self, llm: LLMInterface = None, session: ReplaySession = None, model_name: str = None):
+        """
+        Args:
+            llm: The live LLM. Required in 'record' mode, unused in 'replay' mode.
+            session: The replay session. Defaults to one built from Config.
+            model_name: Namespace for fixture keys. Defaults to `llm.model` or Config.LLM_MODEL.
+        """
+        if session is None:
+            store = FixtureStore(Config.REPLAY_FIXTURE_PATH)
+            latency = SimulatedLatency(Config.REPLAY_LLM_LATENCY_MS, Config.REPLAY_LATENCY_JITTER_MS, Config.REPLAY_SEED)
+            session = ReplaySession(Config.REPLAY_MODE, store, latency)
+        if session.mode == RECORD and llm is None:
+            raise ValueError("Record mode needs a live LLM to record from.")
+        self.llm = llm
+        self.session = session
+        self.model = model_name or getattr(llm, 'model', None) or Config.LLM_MODEL
+
+    def invoke(self, prompt: str) -> str:
+        key = fixture_key(self.model, prompt)
+        if self.session.mode != REPLAY:
+            return self.session.call('llm', key, lambda: self.llm.invoke(prompt))
+
+        started, t0 = time.time(), time.perf_counter()
+        response = self.session.call('llm', key, lambda: None)
+        record_llm_call(self.model, started, time.perf_counter() - t0, replayed=True)
+        return response
@@ -0,0 +1,172 @@
+import os
+import copy
+import asyncio
+import inspect
+import functools
+import threading
+import weakref
+from collections import defaultdict, OrderedDict
+from typing import Any, Callable, Dict, Hashable
+import pandas as pd
+from core.telemetry import record_cache
+from config.default_config import Config
+
+class _Call:
+    """One in-flight execution that concurrent callers of the same key wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+        self.future = None
+
+def _private_copy(value: Any) -> Any:
+    # Callers mutate what they get back (e.g. add indicator columns), so waiters get copies
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    return copy.deepcopy(value)
+
+class SingleFlight:
+    """
+    Collapses concurrent identical calls: the first caller for a key runs the function
+    and every caller that arrives while it is in flight waits for that result instead
+    of running it again. Nothing is cached once the call returns.
+
+    Threads use do(); coroutines use `await do_async()`, which also shares in-flight
+    calls with threads. Waiters receive a copy of the result, or the same exception.
+    Statistics are totalled per `kind` of call, and kept per key only for the
+    `max_keys` most recently used keys, so they stay bounded however many distinct
+    keys a long-lived process sees.
+    """
+
+    def __init__(self, max_keys: int = None):
+        """
+        Args:
+            max_keys: Keys whose counts are kept. Defaults to Config.DATA_SINGLE_FLIGHT_MAX_KEYS.
+        """
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._loop_calls = weakref.WeakKeyDictionary()
+        self._stats = defaultdict(lambda: {"calls": 0, "executions": 0})
+        self._key_stats = OrderedDict()
+        self.max_keys = max_keys or Config.DATA_SINGLE_FLIGHT_MAX_KEYS
+
+    def _count(self, key: Hashable, kind: str, executed: bool):
+        with self._lock:
+            self._stats[kind]["calls"] += 1
+            self._stats[kind]["executions"] += int(executed)
+            counts = self._key_stats.pop(key, None) or {"calls": 0, "executions": 0}
+            counts["calls"] += 1
+            counts["executions"] += int(executed)
+            self._key_stats[key] = counts
+            if len(self._key_stats) > self.max_keys:
+                self._key_stats.popitem(last=False)
+        record_cache('single_flight', not executed)
+
+    def do(self, key: Hashable, fn: Callable[[], Any], kind: str = 'other') -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+        self._count(key, kind, leader)
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return _private_copy(call.result)
+
+        result = None
+        try:
+            result = fn()
+            return result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                shared = call.waiters > 0
+            # Waiters copy from a snapshot, since the leader may mutate its result right away
+            call.result = _private_copy(result) if shared and call.error is None else result
+            call.done.set()
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Any], kind: str = 'other') -> Any:
+        """
+        Awaitable do(). `fn` may be a coroutine function, shared among the coroutines of
+        this event loop, or a blocking function, run once in the loop's default executor
+        and shared with threads as well.
+        """
+        loop = asyncio.get_running_loop()
+        calls = self._loop_calls.setdefault(loop, {})
+        call = calls.get(key)
+        if call is not None:
+            self._count(key, kind, False)
+            call.waiters += 1
+            return _private_copy(await asyncio.shield(call.future))
+
+        call = calls[key] = _Call()
+        call.future = future = loop.create_future()
+        try:
+            if inspect.iscoroutinefunction(fn):
+                self._count(key, kind, True)
+                result = await fn()
+            else:
+                result = await loop.run_in_executor(None, self.do, key, fn, kind)
+            future.set_result(_private_copy(result) if call.waiters else result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Marks it retrieved when no coroutine was waiting
+            raise
+        finally:
+            del calls[key]
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-kind calls, executions and calls saved (calls that joined an execution in flight)."""
+        with self._lock:
+            return {kind: {**counts, "saved": counts["calls"] - counts["executions"]} for kind, counts in self._stats.items()}
+
+    def key_stats(self) -> Dict[Hashable, Dict[str, int]]:
+        """The same counts per key, for the most recently used keys (see max_keys), most recent last."""
+        with self._lock:
+            return {key: {**counts, "saved": counts["calls"] - counts["executions"]} for key, counts in self._key_stats.items()}
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+            self._key_stats.clear()
+
+_data_flight = SingleFlight()
+
+def _reset_after_fork():
+    # Calls in flight at fork time have no leader thread in the child, so it starts empty
+    global _data_flight
+    _data_flight = SingleFlight()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+def get_single_flight() -> SingleFlight:
+    """Returns the process-wide single-flight group used by DataInterface."""
+    return _data_flight
+
+def deduplicated(kind: str):
+    """
+    Decorator for DataInterface fetch methods: concurrent calls with the same arguments
+    and as-of date share one fetch. Disabled with DATA_SINGLE_FLIGHT=false.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not Config.DATA_SINGLE_FLIGHT:
+                return method(self, *args, **kwargs)
+            arguments = ", ".join([repr(a) for a in args] + [f"{k}={v!r}" for k, v in sorted(kwargs.items())])
+            as_of_date = getattr(self, 'as_of_date', None)
+            key = f"{kind}({arguments})" + (f"@{as_of_date}" if as_of_date else "")
+            return _data_flight.do(key, lambda: method(self, *args, **kwargs), kind=kind)
+        return wrapper
+    return decorator
@@ -0,0 +1,267 @@
+import os
+import json
+import time
+import uuid
+import functools
+import contextvars
+from typing import Callable, Dict, List, Optional, Tuple
+from config.default_config import Config
+
+# The metrics collector of the node currently executing in this context
+_current_node = contextvars.ContextVar('current_node_metrics', default=None)
+
+def _llm_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    price_in, price_out = Config.LLM_PRICING.get(model, (0.0, 0.0))
+    return (input_tokens * price_in + output_tokens * price_out) / 1000.0
+
+def record_llm_call(model: str, started: float, latency_seconds: float, retries: int = 0,
+                    input_tokens: int = 0, output_tokens: int = 0, **attributes):
+    """
+    Records one LLM request against the node that is currently running.
+    Calls made outside an instrumented node are ignored.
+
+    Args:
+        model: The model that served the request.
+        started: Wall-clock start time (time.time()).
+        latency_seconds: Total time including retries.
+        retries: Number of failed attempts before the final one.
+        input_tokens / output_tokens: Token usage reported by the API.
+        **attributes: Extra span attributes (e.g. hedged=True).
+    """
+    metrics = _current_node.get()
+    if metrics is None:
+        return
+    metrics['llm_calls'].append({
+        "model": model,
+        "start": started,
+        "latency_seconds": round(latency_seconds, 4),
+        "retries": retries,
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "cost_usd": round(_llm_cost(model, input_tokens, output_tokens), 6),
+        **attributes
+    })
+
+def record_data_fetch(source: str, started: float, seconds: float, ok: bool = True):
+    """Records one data-source fetch against the current node."""
+    metrics = _current_node.get()
+    if metrics is None:
+        return
+    metrics['data_fetches'].append({"source": source, "start": started, "seconds": round(seconds, 4), "ok": ok})
+
+def record_cache(kind: str, hit: bool):
+    """Counts a cache hit or miss (kind is e.g. 'llm' or 'data') for the current node."""
+    metrics = _current_node.get()
+    if metrics is None:
+        return
+    counts = metrics['cache'].setdefault(kind, {"hit": 0, "miss": 0})
+    counts["hit" if hit else "miss"] += 1
+
+def record_event(name: str, **attributes):
+    """Records a point-in-time event (e.g. a degraded source) on the current node."""
+    metrics = _current_node.get()
+    if metrics is None:
+        return
+    metrics['events'].append({"name": name, "time": time.time(), **attributes})
+
+def detached_context() -> Tuple[contextvars.Context, Dict]:
+    """
+    Returns a copy of the current context whose records go to a fresh collector
+    instead of the running node, together with that collector. Work run in it is
+    attributed later with merge_metrics, or not at all (e.g. a hedged request that lost).
+    """
+    context = contextvars.copy_context()
+    collector = {"llm_calls": [], "data_fetches": [], "cache": {}, "events": []}
+    context.run(_current_node.set, collector)
+    return context, collector
+
+def merge_metrics(collector: Dict):
+    """Adds the records of a detached collector to the node that is currently running."""
+    metrics = _current_node.get()
+    if metrics is None:
+        return
+    for key in ('llm_calls', 'data_fetches', 'events'):
+        metrics[key].extend(collector[key])
+    for kind, counts in collector['cache'].items():
+        totals = metrics['cache'].setdefault(kind, {"hit": 0, "miss": 0})
+        totals["hit"] += counts["hit"]
+        totals["miss"] += counts["miss"]
+
+def timed_fetch(source: str):
+    """Decorator for DataInterface fetch methods that records their duration per source."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            started, t0 = time.time(), time.perf_counter()
+            ok = False
+            try:
+                result = method(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                record_data_fetch(source, started, time.perf_counter() - t0, ok)
+        return wrapper
+    return decorator
+
+def summarize_node(metrics: Dict) -> Dict:
+    """
+    Adds the per-node totals that dashboards and the workflow log use. The summary
+    holds copies of the collected lists, so work that outlives the node (an abandoned
+    call past the run deadline) cannot change it after the totals were computed.
+    """
+    calls = list(metrics['llm_calls'])
+    fetches = list(metrics['data_fetches'])
+    return {
+        **metrics,
+        "llm_calls": calls,
+        "data_fetches": fetches,
+        "cache": {kind: dict(counts) for kind, counts in metrics['cache'].items()},
+        "events": list(metrics['events']),
+        "llm_seconds": round(sum(c['latency_seconds'] for c in calls), 4),
+        "llm_retries": sum(c['retries'] for c in calls),
+        "input_tokens": sum(c['input_tokens'] for c in calls),
+        "output_tokens": sum(c['output_tokens'] for c in calls),
+        "cost_usd": round(sum(c['cost_usd'] for c in calls), 6),
+        "fetch_seconds": round(sum(f['seconds'] for f in fetches), 4)
+    }
+
+def format_node_summary(summary: Dict) -> str:
+    """One-line, human-readable version of a node's metrics for the workflow log."""
+    cache = ", ".join(f"{kind} cache {c['hit']} hit/{c['miss']} miss" for kind, c in summary['cache'].items())
+    return (
+        f"[metrics] {summary['node']}: {summary['wall_seconds']:.2f}s wall, "
+        f"{len(summary['llm_calls'])} LLM call(s) {summary['llm_seconds']:.2f}s "
+        f"({summary['input_tokens']} in/{summary['output_tokens']} out tokens, {summary['llm_retries']} retries, "
+        f"${summary['cost_usd']:.5f}), {len(summary['data_fetches'])} fetch(es) {summary['fetch_seconds']:.2f}s"
+        + (f", {cache}" if cache else "")
+    )
+
+def instrument_node(node_name: str, node_fn: Callable) -> Callable:
+    """
+    Wraps a graph node so that its wall time and every LLM call, data fetch and
+    cache lookup made while it runs are added to the node's update as a
+    state['node_metrics'] entry, with a one-line summary for the workflow log.
+    """
+    @functools.wraps(node_fn)
+    def wrapper(state, *args, **kwargs):
+        metrics = {
+            "node": node_name,
+            "stock_symbol": state.get('stock_symbol'),
+            "start": time.time(),
+            "wall_seconds": 0.0,
+            "llm_calls": [],
+            "data_fetches": [],
+            "cache": {},
+            "events": []
+        }
+        token = _current_node.set(metrics)
+        t0 = time.perf_counter()
+        try:
+            result = node_fn(state, *args, **kwargs)
+        finally:
+            metrics['wall_seconds'] = round(time.perf_counter() - t0, 4)
+            _current_node.reset(token)
+
+        summary = summarize_node(metrics)
+        result.setdefault('node_metrics', []).append(summary)
+        result.setdefault('workflow_log', []).append(format_node_summary(summary))
+        return result
+    return wrapper
+
+# Exporters
+
+def _ns(seconds: float) -> str:
+    return str(int(seconds * 1e9))
+
+def _attributes(values: Dict) -> List[Dict]:
+    attributes = []
+    for key, value in values.items():
+        if isinstance(value, bool):
+            attributes.append({"key": key, "value": {"boolValue": value}})
+        elif isinstance(value, int):
+            attributes.append({"key": key, "value": {"intValue": str(value)}})
+        elif isinstance(value, float):
+            attributes.append({"key": key, "value": {"doubleValue": value}})
+        elif value is not None:
+            attributes.append({"key": key, "value": {"stringValue": str(value)}})
+    return attributes
+
+def build_spans(node_metrics: List[Dict], stock_symbol: str) -> Dict:
+    """
+    Converts a run's node metrics into an OTLP/JSON trace: one root span for the run,
+    a child span per node, and grandchild spans for each LLM call and data fetch.
+    """
+    trace_id = uuid.uuid4().hex
+    root_id = uuid.uuid4().hex[:16]
+    spans = []
+    for node in node_metrics:
+        node_id = uuid.uuid4().hex[:16]
+        spans.append({
+            "traceId": trace_id, "spanId": node_id, "parentSpanId": root_id, "name": node['node'],
+            "startTimeUnixNano": _ns(node['start']), "endTimeUnixNano": _ns(node['start'] + node['wall_seconds']),
+            "attributes": _attributes({
+                "llm.seconds": node['llm_seconds'], "llm.retries": node['llm_retries'],
+                "llm.input_tokens": node['input_tokens'], "llm.output_tokens": node['output_tokens'],
+                "llm.cost_usd": node['cost_usd'], "data.fetch_seconds": node['fetch_seconds'],
+                **{f"cache.{kind}.{k}": v for kind, c in node['cache'].items() for k, v in c.items()}
+            }),
+            "events": [
+                {"name": e['name'], "timeUnixNano": _ns(e['time']),
+                 "attributes": _attributes({k: v for k, v in e.items() if k not in ('name', 'time')})}
+                for e in node.get('events', [])
+            ]
+        })
+        for call in node['llm_calls']:
+            spans.append({
+                "traceId": trace_id, "spanId": uuid.uuid4().hex[:16], "parentSpanId": node_id, "name": "llm.invoke",
+                "startTimeUnixNano": _ns(call['start']), "endTimeUnixNano": _ns(call['start'] + call['latency_seconds']),
+                "attributes": _attributes({k: v for k, v in call.items() if k not in ('start', 'latency_seconds')})
+            })
+        for fetch in node['data_fetches']:
+            spans.append({
+                "traceId": trace_id, "spanId": uuid.uuid4().hex[:16], "parentSpanId": node_id, "name": f"data.{fetch['source']}",
+                "startTimeUnixNano": _ns(fetch['start']), "endTimeUnixNano": _ns(fetch['start'] + fetch['seconds']),
+                "attributes": _attributes({"ok": fetch['ok']})
+            })
+
+    if node_metrics:
+        run_start = min(n['start'] for n in node_metrics)
+        run_end = max(n['start'] + n['wall_seconds'] for n in node_metrics)
+        spans.insert(0, {
+            "traceId": trace_id, "spanId": root_id, "name": "trading_graph.run",
+            "startTimeUnixNano": _ns(run_start), "endTimeUnixNano": _ns(run_end),
+            "attributes": _attributes({"stock_symbol": stock_symbol})
+        })
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _attributes({"service.name": "qwen-trading-agents"})},
+            "scopeSpans": [{"scope": {"name": "core.telemetry"}, "spans": spans}]
+        }]
+    }
+
+def export_run_metrics(state: Dict, path: Optional[str] = None, fmt: Optional[str] = None):
+    """
+    Appends a finished run's metrics to a local file, one JSON document per line.
+
+    Args:
+        state: The final AgentState of the run.
+        path: Output file. Defaults to Config.TELEMETRY_EXPORT_PATH; nothing is written if unset.
+        fmt: 'otlp' for OpenTelemetry-style trace JSON, or 'jsonl' for the raw node metrics.
+    """
+    path = path or Config.TELEMETRY_EXPORT_PATH
+    fmt = fmt or Config.TELEMETRY_FORMAT
+    node_metrics = state.get('node_metrics') or []
+    if not path or not node_metrics:
+        return
+
+    if fmt == 'otlp':
+        document = build_spans(node_metrics, state.get('stock_symbol'))
+    else:
+        document = {"stock_symbol": state.get('stock_symbol'), "as_of_date": state.get('as_of_date'), "nodes": node_metrics}
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'a') as f:
+        f.write(json.dumps(document) + "\n")
+    print(f"Run metrics exported to {path} ({fmt}).")
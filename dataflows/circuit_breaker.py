@@ -0,0 +1,156 @@
+import sys
+import os
+import time
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.default_config import Config
+from core.telemetry import record_event
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Display names of the upstream sources guarded by a breaker
+SOURCE_NAMES = {
+    "yahoo": "Yahoo Finance",
+    "finnhub": "Finnhub",
+    "google_news": "Google News",
+    "reddit": "Reddit"
+}
+
+class SourceUnavailableError(RuntimeError):
+    """Raised instead of calling a source whose breaker is open, or that missed its deadline."""
+
+class CircuitBreaker:
+    """
+    Tracks the outcome of a source's recent calls. Once at least `min_calls` of the
+    last `window` calls are recorded and the failure rate reaches `failure_rate`, the
+    breaker opens and calls fail fast. After `reset_seconds` it lets a single probe
+    through (half-open): success closes it, failure opens it for another period.
+    """
+
+    def __init__(self, source: str, failure_rate: float = None, min_calls: int = None,
+                 window: int = None, reset_seconds: float = None):
+        self.source = source
+        self.failure_rate = Config.BREAKER_FAILURE_RATE if failure_rate is None else failure_rate
+        self.min_calls = min_calls or Config.BREAKER_MIN_CALLS
+        self.reset_seconds = Config.BREAKER_RESET_SECONDS if reset_seconds is None else reset_seconds
+        self._outcomes = deque(maxlen=window or Config.BREAKER_WINDOW)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                return HALF_OPEN
+            return self._state
+
+    def available(self) -> bool:
+        """Whether a call would be attempted now. Does not claim the half-open probe."""
+        return self.state != OPEN
+
+    def allow(self) -> bool:
+        """Claims permission for one call; in the half-open state only one probe is let through."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._probing or time.monotonic() - self._opened_at < self.reset_seconds:
+                return False
+            self._probing = True
+            return True
+
+    def record(self, success: bool):
+        with self._lock:
+            if self._probing:
+                self._probing = False
+                if success:
+                    print(f"Circuit for {self.source} closed after a successful probe.")
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._opened_at = time.monotonic()
+                return
+
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if (self._state == CLOSED and len(self._outcomes) >= self.min_calls
+                    and failures / len(self._outcomes) >= self.failure_rate):
+                print(f"Circuit for {self.source} opened: {failures} of the last {len(self._outcomes)} calls failed.")
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_registry_lock = threading.Lock()
+
+def _reset_after_fork():
+    # A forked child inherits the executors without their threads, so work submitted to
+    # them would never run; it starts with fresh executors and lock instead
+    global _registry_lock
+    _executors.clear()
+    _registry_lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+def get_breaker(source: str) -> CircuitBreaker:
+    """Returns the process-wide breaker of a source."""
+    with _registry_lock:
+        if source not in _breakers:
+            _breakers[source] = CircuitBreaker(source)
+        return _breakers[source]
+
+def _executor(source: str) -> ThreadPoolExecutor:
+    with _registry_lock:
+        if source not in _executors:
+            _executors[source] = ThreadPoolExecutor(max_workers=Config.BREAKER_MAX_WORKERS, thread_name_prefix=f"source-{source}")
+        return _executors[source]
+
+def guarded_call(source: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Calls a source through its breaker and deadline (Config.DATA_SOURCE_DEADLINES).
+
+    Raises:
+        SourceUnavailableError: At once if the breaker is open, or when the deadline
+                                passes. The abandoned call finishes in the background.
+        Exception: Whatever the call raised, after counting it as a failure.
+    """
+    breaker = get_breaker(source)
+    if not breaker.allow():
+        record_event('source_degraded', source=source, reason='circuit_open')
+        raise SourceUnavailableError(f"{SOURCE_NAMES.get(source, source)} is unavailable (circuit open).")
+
+    deadline = Config.DATA_SOURCE_DEADLINES.get(source)
+    try:
+        if deadline:
+            context = contextvars.copy_context()
+            result = _executor(source).submit(context.run, fn, *args, **kwargs).result(timeout=deadline)
+        else:
+            result = fn(*args, **kwargs)
+    except FutureTimeoutError:
+        breaker.record(False)
+        record_event('source_degraded', source=source, reason='deadline')
+        raise SourceUnavailableError(f"{SOURCE_NAMES.get(source, source)} did not answer within {deadline:g}s.")
+    except Exception:
+        breaker.record(False)
+        raise
+    breaker.record(True)
+    return result
+
+def unavailable_sources(sources: List[str]) -> List[str]:
+    """Returns the sources among `sources` whose breaker is open."""
+    return [source for source in sources if not get_breaker(source).available()]
+
+def degraded_note(sources: List[str]) -> str:
+    """Workflow-log text naming the sources an analyst is running without, and records them."""
+    for source in sources:
+        record_event('source_degraded', source=source, reason='skipped')
+    names = ", ".join(SOURCE_NAMES.get(source, source) for source in sources)
+    return f"degraded mode, {names} unavailable (circuit open)"
@@ -5,6 +5,8 @@ import finnhub
 import pandas as pd
 from datetime import datetime, timedelta
 from config.default_config import Config
+from dataflows.circuit_breaker import guarded_call
+from dataflows.frame_schema import compact_frame
 
 # Finnhub Client Initialization 
 try:
@@ -17,13 +19,14 @@ except Exception as e:
     finnhub_client = None
     print(f"Error initializing Finnhub client: {e}")
 
-def get_company_news(stock_symbol: str, days: int = 30) -> pd.DataFrame:
+def get_company_news(stock_symbol: str, days: int = 30, end_date: str = None) -> pd.DataFrame:
     """
     Fetches company news for a given stock symbol from Finnhub.
     
     Args:
         stock_symbol (str): The stock ticker symbol (e.g., 'NVDA').
         days (int): The number of past days to fetch news for.
+        end_date (str): Optional 'YYYY-MM-DD' last day of the window. Defaults to today.
         
     Returns:
         A pandas DataFrame containing recent news articles,
@@ -36,10 +39,10 @@ def get_company_news(stock_symbol: str, days: int = 30) -> pd.DataFrame:
     print(f"Fetching recent news for {stock_symbol} from Finnhub...")
     try:
         # Calculate the date range for the news query
-        end_date = datetime.now().strftime('%Y-%m-%d')
-        start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+        end = datetime.strptime(end_date, '%Y-%m-%d') if end_date else datetime.now()
+        start_date = (end - timedelta(days=days)).strftime('%Y-%m-%d')
         
-        news_list = finnhub_client.company_news(stock_symbol, _from=start_date, to=end_date)
+        news_list = guarded_call('finnhub', finnhub_client.company_news, stock_symbol, _from=start_date, to=end.strftime('%Y-%m-%d'))
         
         if not news_list:
             print(f"No news found for {stock_symbol} in the last {days} days.")
@@ -47,10 +50,10 @@ def get_company_news(stock_symbol: str, days: int = 30) -> pd.DataFrame:
         
         # Convert the list of news articles into a DataFrame for easier analysis
         news_df = pd.DataFrame(news_list)
-        # Convert timestamp to a readable date format
-        news_df['datetime'] = pd.to_datetime(news_df['datetime'], unit='s').dt.date
+        # Convert the timestamp to the publication date
+        news_df['datetime'] = pd.to_datetime(news_df['datetime'], unit='s').dt.normalize()
         print(f"Successfully fetched {len(news_df)} news articles for {stock_symbol}.")
-        return news_df[['datetime', 'headline', 'source', 'summary']]
+        return compact_frame(news_df[['datetime', 'headline', 'source', 'summary']])
         
     except Exception as e:
         print(f"An error occurred while fetching news for {stock_symbol}: {e}")
@@ -73,7 +76,7 @@ def get_financial_fundamentals(stock_symbol: str) -> dict:
 
     print(f"Fetching financial fundamentals for {stock_symbol} from Finnhub...")
     try:
-        profile = finnhub_client.company_profile2(symbol=stock_symbol)
+        profile = guarded_call('finnhub', finnhub_client.company_profile2, symbol=stock_symbol)
         if not profile:
             print(f"Warning: No financial profile found for {stock_symbol}.")
             return {}
@@ -0,0 +1,98 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+from config.default_config import Config
+
+# Arrow-backed strings; missing values stay NaN, as in the object columns they replace
+try:
+    TEXT = pd.StringDtype("pyarrow", na_value=np.nan)
+except TypeError:
+    # pandas < 2.3 only has the pd.NA variant
+    TEXT = pd.StringDtype("pyarrow")
+
+# Labels repeated across rows (a handful of outlets, two providers, a few subreddits)
+CATEGORY_COLUMNS = ('source', 'provider', 'subreddit')
+
+# Free text, mostly distinct per row
+TEXT_COLUMNS = ('headline', 'title', 'summary', 'url', 'link')
+
+# Timestamps, held tz-naive in UTC
+TIME_COLUMNS = ('published', 'datetime')
+
+# Counts that fit in 32 bits
+INT32_COLUMNS = ('score',)
+
+def float32_if_exact(values: pd.Series, max_error: float = None) -> pd.Series:
+    """
+    Returns a float column as float32 when no value moves by more than `max_error`
+    (defaults to Config.PRICE_FLOAT32_MAX_ERROR) in the conversion, otherwise unchanged.
+    """
+    max_error = Config.PRICE_FLOAT32_MAX_ERROR if max_error is None else max_error
+    narrowed = values.astype(np.float32)
+    error = (values - narrowed.astype(values.dtype)).abs().max()
+    return narrowed if not error > max_error else values
+
+def compact_prices(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Brings a daily price history into the dataflow schema: a tz-naive DatetimeIndex of
+    session dates named 'Date', float32 prices where precision allows (see
+    float32_if_exact) and integer volume. The input frame is not modified.
+    """
+    if df.empty:
+        return df
+    compact = df.copy(deep=False)
+    index = pd.DatetimeIndex(compact.index)
+    if index.tz is not None:
+        # Keep the exchange's calendar date rather than the UTC one
+        index = index.tz_localize(None)
+    compact.index = index.normalize().rename('Date')
+    for column in compact.columns:
+        if pd.api.types.is_float_dtype(compact[column].dtype):
+            compact[column] = float32_if_exact(compact[column])
+    return compact
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Brings a news or social frame into the dataflow schema by column name: categorical
+    labels (CATEGORY_COLUMNS), Arrow-backed text (TEXT_COLUMNS), tz-naive timestamps
+    (TIME_COLUMNS) and 32-bit counts (INT32_COLUMNS). Other columns are kept as they are,
+    and the input frame is not modified.
+    """
+    if df.empty:
+        return df
+    compact = df.copy(deep=False)
+    for column in compact.columns:
+        if column in CATEGORY_COLUMNS:
+            compact[column] = compact[column].astype('category')
+        elif column in TEXT_COLUMNS:
+            compact[column] = compact[column].astype(TEXT)
+        elif column in TIME_COLUMNS:
+            compact[column] = pd.to_datetime(compact[column], errors='coerce', utc=True).dt.tz_localize(None)
+        elif column in INT32_COLUMNS:
+            compact[column] = compact[column].astype(np.int32)
+    return compact
+
+def frame_bytes(df: pd.DataFrame) -> int:
+    """Memory held by a frame, including its index and the contents of its text columns."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+if __name__ == '__main__':
+
+    rng = np.random.default_rng(0)
+    days = pd.bdate_range(end='2024-06-28', periods=2500)
+    prices = pd.DataFrame({column: 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(days))))
+                           for column in ('Open', 'High', 'Low', 'Close')}, index=days.date)
+    prices['Volume'] = rng.integers(1_000_000, 50_000_000, len(days))
+    news = pd.DataFrame({
+        'published': [pd.Timestamp('2024-06-28') - pd.Timedelta(hours=int(h)) for h in rng.integers(0, 720, 500)],
+        'headline': [f"Nvidia shares move on update number {i}" for i in range(500)],
+        'source': rng.choice(['Reuters', 'Bloomberg', 'CNBC', 'MarketWatch'], 500),
+        'url': [f"https://news.example.com/{i}" for i in range(500)],
+        'provider': rng.choice(['finnhub', 'google'], 500)
+    }).astype(object)
+    for name, frame, compact in (("10y prices", prices, compact_prices(prices)), ("news", news, compact_frame(news))):
+        print(f"{name}: {frame_bytes(frame) / 1e3:.1f} KB -> {frame_bytes(compact) / 1e3:.1f} KB")
+        print(compact.dtypes.to_string() + "\n")
@@ -1,9 +1,13 @@
 import sys
 import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from datetime import datetime, timedelta
 from pygooglenews import GoogleNews
 import pandas as pd
+from dataflows.circuit_breaker import guarded_call
+from dataflows.frame_schema import compact_frame
 
-def get_google_news(query: str, period: str = '7d', top_n: int = 10) -> pd.DataFrame:
+def get_google_news(query: str, period: str = '7d', top_n: int = 10, end_date: str = None) -> pd.DataFrame:
     """
     Fetches news articles from Google News based on a search query.
     
@@ -11,6 +15,8 @@ def get_google_news(query: str, period: str = '7d', top_n: int = 10) -> pd.DataF
         query (str): The search term (e.g., 'NVIDIA stock').
         period (str): The time period for the news (e.g., '7d' for 7 days, '1m' for 1 month).
         top_n (int): The number of top news articles to return.
+        end_date (str): Optional 'YYYY-MM-DD' last day of the window. When set, only a
+                        day-based period (e.g. '7d') is supported.
         
     Returns:
         A pandas DataFrame with the news articles, or an empty DataFrame on error.
@@ -18,7 +24,12 @@ def get_google_news(query: str, period: str = '7d', top_n: int = 10) -> pd.DataF
     print(f"Fetching Google News for query: '{query}'...")
     try:
         gn = GoogleNews(lang='en')
-        search_result = gn.search(query, when=period)
+        if end_date:
+            end = datetime.strptime(end_date, '%Y-%m-%d')
+            start = end - timedelta(days=int(period.rstrip('d')))
+            search_result = guarded_call('google_news', gn.search, query, from_=start.strftime('%Y-%m-%d'), to_=end.strftime('%Y-%m-%d'))
+        else:
+            search_result = guarded_call('google_news', gn.search, query, when=period)
         
         if not search_result['entries']:
             print(f"No Google News found for query '{query}'.")
@@ -38,7 +49,7 @@ def get_google_news(query: str, period: str = '7d', top_n: int = 10) -> pd.DataF
         # Convert to DataFrame and return the top N articles
         news_df = pd.DataFrame(articles)
         print(f"Successfully fetched {len(news_df)} articles from Google News.")
-        return news_df.head(top_n)
+        return compact_frame(news_df.head(top_n))
 
     except Exception as e:
         print(f"An error occurred while fetching from Google News: {e}")
@@ -0,0 +1,150 @@
+import sys
+import os
+import math
+from typing import List, Sequence
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+
+# Columns the market analyst actually reads; stockstats intermediates and raw OHLV are dropped
+DEFAULT_COLUMNS = ('close', 'macd', 'macds', 'macdh', 'rsi_14')
+
+# Columns written as the change from the previous row after the first row
+DEFAULT_DELTA_COLUMNS = ('close',)
+
+def significant_decimals(magnitude: float, digits: int = 4) -> int:
+    """Returns the decimals that give `digits` significant digits at a magnitude, e.g. (182.3, 4) -> 1."""
+    if not magnitude or math.isnan(magnitude):
+        return 0
+    return max(digits - 1 - math.floor(math.log10(abs(magnitude))), 0)
+
+def format_significant(value: float, digits: int = 4, decimals: int = None) -> str:
+    """
+    Formats a number to `digits` significant digits without scientific notation,
+    e.g. 182.3456 -> '182.3', 0.012345 -> '0.01235', 12345.6 -> '12346'. A fixed
+    `decimals` overrides the per-value precision so a column lines up.
+    """
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    if decimals is None:
+        decimals = significant_decimals(value, digits)
+    return f"{round(value, decimals):.{decimals}f}"
+
+def _format_dates(index: pd.Index) -> List[str]:
+    dates = pd.to_datetime(index)
+    # The year is stated once in the header, so rows only carry month and day
+    return [d.strftime('%m-%d') for d in dates]
+
+def summarize_indicators(df: pd.DataFrame, window: int = 20) -> str:
+    """
+    Derives the facts the LLM would otherwise have to compute from the raw rows:
+    trend slope, MACD/signal crossovers and the RSI zone.
+
+    Args:
+        df (pd.DataFrame): Indicator frame with at least a 'close' column.
+        window (int): Number of trailing sessions the summary covers.
+
+    Returns:
+        A few short lines of text.
+    """
+    recent = df.tail(window)
+    lines = []
+
+    close = recent['close'].dropna() if 'close' in recent else pd.Series(dtype=float)
+    if len(close) >= 2:
+        # Least-squares slope of log price, reported as % per session
+        slope, _ = np.polyfit(np.arange(len(close)), np.log(close.to_numpy(dtype=float)), 1)
+        change = close.iloc[-1] / close.iloc[0] - 1
+        direction = 'up' if slope > 0.001 else 'down' if slope < -0.001 else 'sideways'
+        lines.append(f"Trend ({len(close)} sessions): {direction}, slope {slope * 100:+.2f}%/session, "
+                     f"change {change * 100:+.1f}%, last close {format_significant(close.iloc[-1])}")
+
+    if 'macdh' in recent:
+        histogram = recent['macdh'].dropna()
+        signs = np.sign(histogram.to_numpy(dtype=float))
+        dates = _format_dates(histogram.index)
+        crossings = [i for i in range(1, len(signs)) if signs[i] != 0 and signs[i] != signs[i - 1]]
+        if crossings:
+            events = ", ".join(f"{'bullish' if signs[i] > 0 else 'bearish'} on {dates[i]}" for i in crossings[-3:])
+            lines.append(f"MACD/signal crossovers: {events} (latest {len(signs) - 1 - crossings[-1]} sessions ago)")
+        elif len(histogram):
+            lines.append(f"MACD/signal crossovers: none; MACD {'above' if signs[-1] > 0 else 'below'} signal throughout")
+
+    if 'rsi_14' in recent:
+        rsi = recent['rsi_14'].dropna()
+        if len(rsi):
+            latest = rsi.iloc[-1]
+            zone = 'overbought' if latest > 70 else 'oversold' if latest < 30 else 'neutral'
+            lookback = rsi.iloc[-min(len(rsi), 6)]
+            trend = 'rising' if latest > lookback + 1 else 'falling' if latest < lookback - 1 else 'flat'
+            lines.append(f"RSI(14): {latest:.0f}, {zone}, {trend} over the last {min(len(rsi), 6) - 1} sessions")
+
+    return "\n".join(lines)
+
+def encode_indicator_frame(df: pd.DataFrame, rows: int = 15, columns: Sequence[str] = DEFAULT_COLUMNS,
+                           delta_columns: Sequence[str] = DEFAULT_DELTA_COLUMNS, digits: int = 4,
+                           summary_window: int = 20) -> str:
+    """
+    Serializes the tail of an indicator frame for an LLM prompt in a fraction of the
+    tokens of DataFrame.to_string(): whitelisted columns only, numbers rounded to
+    significant digits, delta-encoded price columns, pipe-separated rows and a
+    derived summary on top.
+
+    Args:
+        df (pd.DataFrame): Frame from add_technical_indicators.
+        rows (int): Number of trailing sessions to include as rows.
+        columns (Sequence[str]): Columns to keep, in output order; missing ones are skipped.
+        delta_columns (Sequence[str]): Columns written as change from the previous row.
+        digits (int): Significant digits per value.
+        summary_window (int): Sessions covered by the summary lines.
+
+    Returns:
+        The encoded text block, or an empty string for an empty frame.
+    """
+    if df.empty:
+        return ''
+
+    kept = [c for c in columns if c in df.columns]
+    tail = df[kept].tail(rows)
+    dates = pd.to_datetime(tail.index)
+
+    deltas = [c for c in kept if c in delta_columns]
+    header = f"Sessions {dates[0]:%Y-%m-%d} to {dates[-1]:%Y-%m-%d} (dates as MM-DD)"
+    if deltas:
+        header += f"; {', '.join(deltas)} after the first row is the change from the previous session"
+
+    # Each column is rounded relative to its largest value, and deltas keep the column's precision
+    decimals = {c: significant_decimals(tail[c].abs().max(), digits) for c in kept}
+    lines = [header, "date|" + "|".join(kept)]
+    previous = None
+    for date, (_, row) in zip(_format_dates(tail.index), tail.iterrows()):
+        values = []
+        for column in kept:
+            if previous is not None and column in deltas:
+                change = row[column] - previous[column]
+                values.append(('+' if change >= 0 else '') + format_significant(change, decimals=decimals[column]))
+            else:
+                values.append(format_significant(row[column], decimals=decimals[column]))
+        lines.append(date + "|" + "|".join(values))
+        previous = row
+
+    summary = summarize_indicators(df, summary_window)
+    return f"{summary}\n\n" + "\n".join(lines) if summary else "\n".join(lines)
+
+if __name__ == '__main__':
+
+    index = pd.bdate_range(end='2024-05-10', periods=40)
+    close = 100 * np.exp(np.cumsum(np.random.default_rng(0).normal(0.002, 0.02, len(index))))
+    demo = pd.DataFrame({'open': close * 0.99, 'high': close * 1.01, 'low': close * 0.98, 'close': close, 'volume': 1.234e7,
+                         'dividends': 0.0, 'stock splits': 0.0, 'close_12_ema': close, 'close_26_ema': close, 'rs_14': 1.1}, index=index)
+    ema_fast, ema_slow = demo['close'].ewm(span=12).mean(), demo['close'].ewm(span=26).mean()
+    demo['macd'] = ema_fast - ema_slow
+    demo['macds'] = demo['macd'].ewm(span=9).mean()
+    demo['macdh'] = demo['macd'] - demo['macds']
+    demo['rsi_14'] = 50 + 20 * np.sin(np.arange(len(index)) / 5)
+
+    encoded = encode_indicator_frame(demo)
+    raw = demo.tail(15).to_string()
+    print(encoded)
+    print(f"\n{len(raw)} characters as to_string() vs {len(encoded)} encoded")
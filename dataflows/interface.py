@@ -9,41 +9,154 @@ from dataflows.yfin_utils import get_historical_data
 from dataflows.finnhub_utils import get_company_news, get_financial_fundamentals
 from dataflows.googlenews_utils import get_google_news
 from dataflows.stockstats_utils import add_technical_indicators
+from dataflows.indicator_encoding import encode_indicator_frame
 from dataflows.reddit_utils import get_reddit_sentiment
+from dataflows.reddit_scanner import get_reddit_mentions, get_reddit_scanner
+from dataflows.news_store import get_recent_news, normalize_headline
+from dataflows.news_dedup import collapse_near_duplicates
+from dataflows.frame_schema import compact_frame
+from core.replay import recorded
+from core.single_flight import deduplicated
+from dataflows.circuit_breaker import unavailable_sources, degraded_note
+from core.telemetry import timed_fetch
 
 class DataInterface:
     """
     A unified interface for all data retrieval operations.
     This class abstracts the underlying data sources and provides simple methods
     for agents to call. This adheres to the "Interface Pattern" from the blueprint.
+
+    Fetch methods are routed through the record/replay layer (see core/replay.py),
+    so with REPLAY_MODE=replay they are served from recorded fixtures offline, and
+    through a single-flight group (see core/single_flight.py), so concurrent identical
+    fetches from parallel analysts or tickers hit the source once.
     """
+
+
+    def __init__(self, as_of_date: str = None):
+        """
+        Args:
+            as_of_date (str): Optional 'YYYY-MM-DD' date. When set, every method returns
+                              only data that was available on that date.
+        """
+        self.as_of_date = as_of_date
     
     # Individual Data Fetching Methods
 
+    @timed_fetch('yahoo')
+    @deduplicated('get_historical_data')
+    @recorded('get_historical_data')
     def get_historical_data(self, stock_symbol: str, period: str = "1y") -> pd.DataFrame:
         """Wrapper for the yfin_utils function."""
-        return get_historical_data(stock_symbol, period)
+        return get_historical_data(stock_symbol, period, end_date=self.as_of_date)
 
+    @timed_fetch('finnhub_news')
+    @deduplicated('get_company_news')
+    @recorded('get_company_news')
     def get_company_news(self, stock_symbol: str, days: int = 30) -> pd.DataFrame:
         """Wrapper for the finnhub_utils news function."""
-        return get_company_news(stock_symbol, days)
+        return get_company_news(stock_symbol, days, end_date=self.as_of_date)
 
+    @timed_fetch('finnhub_profile')
+    @deduplicated('get_financial_fundamentals')
+    @recorded('get_financial_fundamentals')
     def get_financial_fundamentals(self, stock_symbol: str) -> dict:
-        """Wrapper for the finnhub_utils fundamentals function."""
+        """
+        Wrapper for the finnhub_utils fundamentals function. Finnhub only serves the
+        current profile, so historical runs see today's descriptive fields.
+        """
         return get_financial_fundamentals(stock_symbol)
 
+    @timed_fetch('google_news')
+    @deduplicated('get_google_news')
+    @recorded('get_google_news')
     def get_google_news(self, query: str, period: str = '7d', top_n: int = 10) -> pd.DataFrame:
         """Wrapper for the googlenews_utils function."""
-        return get_google_news(query, period, top_n)
+        return get_google_news(query, period, top_n, end_date=self.as_of_date)
+
+    @timed_fetch('news_store')
+    @deduplicated('get_recent_news')
+    @recorded('get_recent_news')
+    def get_recent_news(self, stock_symbol: str, company_name: str = None, n: int = 20) -> pd.DataFrame:
+        """
+        Wrapper for the news_store function: refreshes the local store incrementally and
+        returns the newest `n` deduplicated headlines. The store only moves forward in
+        time, so historical runs query both providers for their window directly.
+        """
+        if not self.as_of_date:
+            return get_recent_news(stock_symbol, company_name, n)
+
+        company_news = get_company_news(stock_symbol, end_date=self.as_of_date)
+        google_news = get_google_news(f"{company_name or stock_symbol} stock", end_date=self.as_of_date)
+        frames = []
+        if not company_news.empty:
+            frames.append(pd.DataFrame({'published': pd.to_datetime(company_news['datetime']), 'headline': company_news['headline'],
+                                        'source': company_news['source'], 'provider': 'finnhub'}))
+        if not google_news.empty:
+            frames.append(pd.DataFrame({'published': pd.to_datetime(google_news['published'], errors='coerce', utc=True).dt.tz_localize(None),
+                                        'headline': google_news['title'], 'source': google_news['source'], 'provider': 'google'}))
+        if not frames:
+            return pd.DataFrame()
+        news = pd.concat(frames, ignore_index=True).sort_values('published', ascending=False)
+        news = news[~news['headline'].map(normalize_headline).duplicated()]
+        return compact_frame(news.head(n).reset_index(drop=True))
+
+    def collapse_news_duplicates(self, news_df: pd.DataFrame) -> pd.DataFrame:
+        """Wrapper for the news_dedup function."""
+        return collapse_near_duplicates(news_df)
 
     def add_technical_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """Wrapper for the stockstats_utils function."""
         return add_technical_indicators(df)
 
+    def encode_indicators(self, df: pd.DataFrame, rows: int = 15) -> str:
+        """Wrapper for the indicator_encoding function."""
+        return encode_indicator_frame(df, rows=rows)
+
+    @timed_fetch('reddit')
+    @deduplicated('get_reddit_sentiment')
+    @recorded('get_reddit_sentiment')
     def get_reddit_sentiment(self, stock_symbol: str, subreddits: list, limit: int = 10) -> pd.DataFrame:
-        """Wrapper for the reddit_utils function."""
+        """
+        Wrapper for the reddit_utils function. Reddit's hot feeds cannot be queried
+        as of a past date, so historical runs get no posts rather than future ones.
+        """
+        if self.as_of_date:
+            print(f"Reddit data is not available as of {self.as_of_date}. Skipping.")
+            return pd.DataFrame()
         return get_reddit_sentiment(stock_symbol, subreddits, limit)
 
+    @timed_fetch('reddit')
+    @deduplicated('get_reddit_mentions')
+    @recorded('get_reddit_mentions')
+    def get_reddit_mentions(self, stock_symbol: str, subreddits: list, limit: int = 10) -> pd.DataFrame:
+        """
+        Wrapper for the reddit_scanner function. Reads the symbol's posts from the shared
+        scanner, which downloads each subreddit feed once per window for all tickers.
+        """
+        if self.as_of_date:
+            print(f"Reddit data is not available as of {self.as_of_date}. Skipping.")
+            return pd.DataFrame()
+        return get_reddit_mentions(stock_symbol, subreddits, limit)
+
+    def register_reddit_watchlist(self, watchlist: Dict[str, List[str]], subreddits: list):
+        """
+        Registers a batch's symbols and company names with the shared Reddit scanner up
+        front, so the first scan indexes all of them in one pass.
+        """
+        get_reddit_scanner(subreddits).register_watchlist(watchlist)
+
+    def unavailable_sources(self, sources: List[str]) -> List[str]:
+        """
+        Wrapper for the circuit_breaker function: the sources ('yahoo', 'finnhub',
+        'google_news', 'reddit') whose breaker is open, so callers can skip them at once.
+        """
+        return unavailable_sources(sources)
+
+    def degraded_note(self, sources: List[str]) -> str:
+        """Wrapper for the circuit_breaker function."""
+        return degraded_note(sources)
+
     # High-Level Aggregate Method
 
     def get_all_data_for_analyst(self, stock_symbol: str) -> Dict[str, pd.DataFrame | Dict]:
@@ -72,7 +185,7 @@ class DataInterface:
             "company_news": self.get_company_news(stock_symbol, days=90),
             "fundamentals": fundamentals,
             "google_news": self.get_google_news(f"{fundamentals.get('name', stock_symbol)} stock news"),
-            "reddit_sentiment": self.get_reddit_sentiment(stock_symbol, subreddits=['stocks', 'wallstreetbets'])
+            "reddit_sentiment": self.get_reddit_mentions(stock_symbol, subreddits=['stocks', 'wallstreetbets'])
         }
 
 
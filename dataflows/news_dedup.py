@@ -0,0 +1,143 @@
+import sys
+import os
+import zlib
+from collections import Counter, defaultdict
+from typing import List
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+from config.default_config import Config
+from dataflows.news_store import normalize_headline
+
+_PRIME = np.uint64((1 << 31) - 1)
+
+class MinHashLSH:
+    """
+    MinHash signatures with banded locality-sensitive hashing over character
+    shingles. Only headlines that share at least one band are compared, so
+    clustering thousands of headlines stays close to linear time.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, shingle_size: int = 4, seed: int = 1):
+        """
+        Args:
+            num_perm: Number of hash permutations in each signature.
+            bands: Number of LSH bands; `num_perm` must be divisible by it. More bands
+                   find more candidate pairs at lower similarity.
+            shingle_size: Length of the character n-grams a headline is split into.
+            seed: Seed of the permutation coefficients.
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands.")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, num_perm, dtype=np.uint64)[:, None]
+        self._b = rng.integers(0, _PRIME, num_perm, dtype=np.uint64)[:, None]
+
+    def _shingles(self, text: str) -> np.ndarray:
+        text = f" {text} "
+        grams = {text[i:i + self.shingle_size] for i in range(max(len(text) - self.shingle_size + 1, 1))}
+        return np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams), dtype=np.uint64, count=len(grams)) % _PRIME
+
+    def signatures(self, texts: List[str]) -> np.ndarray:
+        """Returns a (len(texts), num_perm) array of MinHash signatures."""
+        signatures = np.empty((len(texts), self.num_perm), dtype=np.uint64)
+        for i, text in enumerate(texts):
+            # (a * x + b) mod p stays below 2**62 because a, b and x are all below 2**31
+            signatures[i] = ((self._a * self._shingles(text)[None, :] + self._b) % _PRIME).min(axis=1)
+        return signatures
+
+    def candidate_pairs(self, signatures: np.ndarray) -> set:
+        """Returns index pairs (i, j), i < j, that collide in at least one band."""
+        pairs = set()
+        for band in range(self.bands):
+            buckets = defaultdict(list)
+            block = np.ascontiguousarray(signatures[:, band * self.rows:(band + 1) * self.rows])
+            for i, row in enumerate(block):
+                buckets[row.tobytes()].append(i)
+            for members in buckets.values():
+                for x in range(len(members)):
+                    for y in range(x + 1, len(members)):
+                        pairs.add((members[x], members[y]))
+        return pairs
+
+def _find(parent: List[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+def cluster_headlines(headlines: List[str], threshold: float = None, lsh: MinHashLSH = None) -> List[int]:
+    """
+    Groups near-duplicate headlines.
+
+    Args:
+        headlines: Headlines in any order.
+        threshold: Minimum estimated Jaccard similarity of shingles for two headlines to merge.
+        lsh: The MinHash/LSH configuration. Defaults to 64 permutations in 16 bands.
+
+    Returns:
+        A cluster label per headline; the label is the index of the cluster's first headline.
+    """
+    threshold = Config.NEWS_DEDUP_THRESHOLD if threshold is None else threshold
+    lsh = lsh or MinHashLSH()
+    normalized = [normalize_headline(h) for h in headlines]
+    signatures = lsh.signatures(normalized)
+
+    parent = list(range(len(headlines)))
+    for i, j in lsh.candidate_pairs(signatures):
+        # Exact duplicates after normalization merge outright; others must clear the threshold
+        if normalized[i] == normalized[j] or np.mean(signatures[i] == signatures[j]) >= threshold:
+            root_i, root_j = _find(parent, i), _find(parent, j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+    return [_find(parent, i) for i in range(len(headlines))]
+
+def collapse_near_duplicates(news_df: pd.DataFrame, text_column: str = 'headline', source_column: str = 'source',
+                             threshold: float = None) -> pd.DataFrame:
+    """
+    Collapses syndicated and reworded copies of the same story into one row.
+
+    The first row of each cluster is kept as its representative, so a frame sorted
+    newest first keeps the newest wording.
+
+    Returns:
+        The representative rows in their original order, with two added columns:
+        'cluster_size' (number of collapsed headlines) and 'sources' (e.g. 'Reuters x3, CNBC').
+    """
+    if news_df.empty:
+        return news_df
+
+    news_df = news_df.reset_index(drop=True)
+    labels = cluster_headlines(news_df[text_column].fillna('').astype(str).tolist(), threshold)
+    members = defaultdict(list)
+    for position, label in enumerate(labels):
+        members[label].append(position)
+
+    representatives = news_df.loc[sorted(members)].copy()
+    representatives['cluster_size'] = [len(members[label]) for label in representatives.index]
+    representatives['sources'] = [
+        ", ".join(f"{source} x{count}" if count > 1 else str(source)
+                  for source, count in Counter(news_df.loc[members[label], source_column].astype(object).fillna('Unknown')).most_common())
+        for label in representatives.index
+    ]
+    print(f"Collapsed {len(news_df)} headlines into {len(representatives)} distinct stories.")
+    return representatives.reset_index(drop=True)
+
+if __name__ == '__main__':
+
+    sample = pd.DataFrame({
+        'headline': [
+            "Nvidia shares jump after record data center revenue - Reuters",
+            "Nvidia Shares Jump After Record Data-Center Revenue",
+            "NVIDIA shares jump after record data center sales",
+            "Apple unveils new iPhone lineup at September event",
+            "Fed holds rates steady, signals cuts later this year"
+        ],
+        'source': ['Reuters', 'Yahoo', 'CNBC', 'Bloomberg', 'Reuters']
+    })
+    print(collapse_near_duplicates(sample)[['headline', 'cluster_size', 'sources']])
@@ -0,0 +1,276 @@
+import sys
+import os
+import re
+import time
+import sqlite3
+import calendar
+import threading
+from datetime import datetime, timedelta
+from typing import List, Dict
+from urllib.parse import quote_plus
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import feedparser
+import pandas as pd
+from config.default_config import Config
+from dataflows.finnhub_utils import finnhub_client
+from dataflows.circuit_breaker import guarded_call
+from dataflows.frame_schema import compact_frame
+
+GOOGLE_NEWS_RSS = "https://news.google.com/rss/search?q={query}&hl=en-US&gl=US&ceid=US:en"
+
+def normalize_headline(headline: str) -> str:
+    """
+    Normalizes a headline for duplicate detection: drops a trailing ' - Source'
+    attribution (as added by Google News), punctuation, case and extra whitespace.
+    """
+    text = re.sub(r"\s+[-|]\s+[^-|]{2,60}$", "", headline if isinstance(headline, str) else "")
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return " ".join(text.split())
+
+class NewsStore:
+    """
+    A local, deduplicated news store with a per-symbol, per-provider high-water mark.
+
+    Items are unique per symbol by URL and by normalized headline, so the same story
+    from Finnhub and Google News, or from repeated refreshes, is stored once. Reads of
+    the newest N items use the (symbol, published_ts) index and do not touch the network.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or Config.NEWS_STORE_PATH
+        self._local = threading.local()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS news (
+                symbol TEXT NOT NULL,
+                provider TEXT NOT NULL,
+                published_ts INTEGER NOT NULL,
+                headline TEXT NOT NULL,
+                norm_headline TEXT NOT NULL,
+                source TEXT,
+                url TEXT NOT NULL,
+                summary TEXT,
+                UNIQUE (symbol, url),
+                UNIQUE (symbol, norm_headline)
+            );
+            CREATE INDEX IF NOT EXISTS news_symbol_published ON news (symbol, published_ts DESC);
+            CREATE TABLE IF NOT EXISTS watermarks (
+                symbol TEXT NOT NULL,
+                provider TEXT NOT NULL,
+                last_published_ts INTEGER DEFAULT 0,
+                etag TEXT,
+                last_modified TEXT,
+                refreshed_at REAL DEFAULT 0,
+                PRIMARY KEY (symbol, provider)
+            );
+        """)
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections cannot be shared across threads, so each thread opens its own.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get_watermark(self, symbol: str, provider: str) -> Dict:
+        row = self._connection().execute(
+            "SELECT last_published_ts, etag, last_modified, refreshed_at FROM watermarks WHERE symbol = ? AND provider = ?",
+            (symbol, provider)
+        ).fetchone()
+        if row is None:
+            return {"last_published_ts": 0, "etag": None, "last_modified": None, "refreshed_at": 0.0}
+        return {"last_published_ts": row[0] or 0, "etag": row[1], "last_modified": row[2], "refreshed_at": row[3] or 0.0}
+
+    def set_watermark(self, symbol: str, provider: str, last_published_ts: int, etag: str = None, last_modified: str = None):
+        conn = self._connection()
+        conn.execute(
+            """INSERT INTO watermarks (symbol, provider, last_published_ts, etag, last_modified, refreshed_at)
+               VALUES (?, ?, ?, ?, ?, ?)
+               ON CONFLICT (symbol, provider) DO UPDATE SET
+                   last_published_ts = MAX(last_published_ts, excluded.last_published_ts),
+                   etag = COALESCE(excluded.etag, etag),
+                   last_modified = COALESCE(excluded.last_modified, last_modified),
+                   refreshed_at = excluded.refreshed_at""",
+            (symbol, provider, last_published_ts, etag, last_modified, time.time())
+        )
+        conn.commit()
+
+    def add_items(self, symbol: str, provider: str, items: List[Dict]) -> int:
+        """
+        Inserts items, skipping any whose URL or normalized headline is already stored.
+
+        Returns:
+            The number of new items.
+        """
+        conn = self._connection()
+        before = conn.total_changes
+        conn.executemany(
+            """INSERT OR IGNORE INTO news (symbol, provider, published_ts, headline, norm_headline, source, url, summary)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            [
+                (symbol, provider, int(item['published_ts']), item['headline'], normalize_headline(item['headline']),
+                 item.get('source'), item['url'], item.get('summary'))
+                for item in items if item.get('headline') and item.get('url')
+            ]
+        )
+        conn.commit()
+        return conn.total_changes - before
+
+    def prune(self, symbol: str, retention_days: int = None) -> int:
+        """
+        Deletes a symbol's items published more than `retention_days` (defaults to
+        Config.NEWS_RETENTION_DAYS) ago. The watermarks are kept, so pruned items are
+        not fetched again.
+
+        Returns:
+            The number of deleted items.
+        """
+        retention_days = Config.NEWS_RETENTION_DAYS if retention_days is None else retention_days
+        if retention_days <= 0:
+            return 0
+        conn = self._connection()
+        deleted = conn.execute(
+            "DELETE FROM news WHERE symbol = ? AND published_ts < ?",
+            (symbol, int(time.time()) - retention_days * 86400)
+        ).rowcount
+        conn.commit()
+        return deleted
+
+    def latest(self, symbol: str, n: int = 20) -> pd.DataFrame:
+        """Returns the newest `n` stored items for a symbol, newest first."""
+        rows = self._connection().execute(
+            """SELECT published_ts, headline, source, url, summary, provider FROM news
+               WHERE symbol = ? ORDER BY published_ts DESC LIMIT ?""",
+            (symbol, n)
+        ).fetchall()
+        df = pd.DataFrame(rows, columns=['published_ts', 'headline', 'source', 'url', 'summary', 'provider'])
+        df.insert(0, 'published', pd.to_datetime(df.pop('published_ts'), unit='s'))
+        return compact_frame(df)
+
+def _is_fresh(store: NewsStore, symbol: str, provider: str) -> bool:
+    return time.time() - store.get_watermark(symbol, provider)['refreshed_at'] < Config.NEWS_REFRESH_MIN_SECONDS
+
+def refresh_finnhub_news(store: NewsStore, stock_symbol: str, days: int = 30) -> int:
+    """
+    Pulls only Finnhub items newer than the symbol's high-water mark. Finnhub filters
+    by whole days, so the request starts on the watermark's day and the overlap is
+    dropped locally.
+
+    Returns:
+        The number of new items stored.
+    """
+    if not finnhub_client:
+        print("Finnhub client not initialized. Cannot refresh company news.")
+        return 0
+    if _is_fresh(store, stock_symbol, 'finnhub'):
+        return 0
+
+    watermark = store.get_watermark(stock_symbol, 'finnhub')['last_published_ts']
+    start = max(datetime.now() - timedelta(days=days), datetime.fromtimestamp(watermark))
+    print(f"Refreshing Finnhub news for {stock_symbol} since {start:%Y-%m-%d}...")
+    try:
+        news_list = guarded_call('finnhub', finnhub_client.company_news, stock_symbol, _from=start.strftime('%Y-%m-%d'), to=datetime.now().strftime('%Y-%m-%d'))
+    except Exception as e:
+        print(f"An error occurred while refreshing Finnhub news for {stock_symbol}: {e}")
+        return 0
+
+    items = [
+        {'published_ts': n['datetime'], 'headline': n.get('headline'), 'source': n.get('source'), 'url': n.get('url'), 'summary': n.get('summary')}
+        for n in news_list or [] if n.get('datetime', 0) > watermark
+    ]
+    added = store.add_items(stock_symbol, 'finnhub', items)
+    store.set_watermark(stock_symbol, 'finnhub', max([watermark] + [i['published_ts'] for i in items]))
+    print(f"Stored {added} new Finnhub item(s) for {stock_symbol}.")
+    return added
+
+def refresh_google_news(store: NewsStore, stock_symbol: str, query: str, period: str = '7d') -> int:
+    """
+    Pulls the Google News RSS search feed with a conditional GET (ETag and
+    If-Modified-Since), so an unchanged feed costs a 304 and no parsing. Only entries
+    newer than the high-water mark are stored; undated entries are skipped, since they
+    cannot be placed against the mark.
+
+    Returns:
+        The number of new items stored.
+    """
+    if _is_fresh(store, stock_symbol, 'google'):
+        return 0
+
+    mark = store.get_watermark(stock_symbol, 'google')
+    url = GOOGLE_NEWS_RSS.format(query=quote_plus(f"{query} when:{period}"))
+    print(f"Refreshing Google News for '{query}'...")
+    try:
+        feed = guarded_call('google_news', feedparser.parse, url, etag=mark['etag'], modified=mark['last_modified'])
+    except Exception as e:
+        print(f"An error occurred while refreshing Google News for '{query}': {e}")
+        return 0
+
+    if getattr(feed, 'status', None) == 304:
+        print(f"Google News feed for '{query}' not modified.")
+        store.set_watermark(stock_symbol, 'google', mark['last_published_ts'])
+        return 0
+
+    items = []
+    for entry in feed.entries:
+        published = entry.get('published_parsed')
+        if not published:
+            continue
+        published_ts = calendar.timegm(published)
+        if published_ts <= mark['last_published_ts']:
+            continue
+        items.append({
+            'published_ts': published_ts,
+            'headline': entry.get('title'),
+            'source': entry.get('source', {}).get('title'),
+            'url': entry.get('link')
+        })
+    added = store.add_items(stock_symbol, 'google', items)
+    store.set_watermark(
+        stock_symbol, 'google',
+        max([mark['last_published_ts']] + [i['published_ts'] for i in items]),
+        etag=getattr(feed, 'etag', None),
+        last_modified=getattr(feed, 'modified', None)
+    )
+    print(f"Stored {added} new Google News item(s) for {stock_symbol}.")
+    return added
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_news_store() -> NewsStore:
+    """Returns the process-wide news store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = NewsStore()
+        return _store
+
+def get_recent_news(stock_symbol: str, company_name: str = None, n: int = 20) -> pd.DataFrame:
+    """
+    Refreshes the store incrementally from Finnhub and Google News, drops items past
+    the retention period, then returns the newest `n` deduplicated items for the symbol.
+
+    Returns:
+        A DataFrame with 'published', 'headline', 'source', 'url', 'summary' and
+        'provider' columns, newest first (empty if nothing is stored).
+    """
+    store = get_news_store()
+    refresh_finnhub_news(store, stock_symbol)
+    refresh_google_news(store, stock_symbol, f"{company_name or stock_symbol} stock")
+    store.prune(stock_symbol)
+    return store.latest(stock_symbol, n)
+
+if __name__ == '__main__':
+
+    test_symbol = "NVDA"
+    recent = get_recent_news(test_symbol, "NVIDIA")
+    print(f"\n--- Newest stored news for {test_symbol} ---")
+    pd.set_option('display.max_colwidth', 80)
+    print(recent[['published', 'headline', 'source', 'provider']])
@@ -0,0 +1,260 @@
+import sys
+import os
+import re
+import time
+import threading
+from collections import deque, defaultdict
+from typing import Dict, Iterable, List, Tuple
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+from config.default_config import Config
+from dataflows.reddit_utils import reddit_client
+from dataflows.circuit_breaker import guarded_call
+from dataflows.frame_schema import compact_frame
+
+# Tickers that are also everyday words (or too short to be unambiguous) only count
+# when written as a cashtag, e.g. "$ON" but not "ON".
+AMBIGUOUS_TICKERS = {
+    'A', 'ALL', 'AM', 'AN', 'ANY', 'ARE', 'AT', 'BE', 'BIG', 'CAN', 'CAR', 'DD', 'EOD', 'FOR', 'FUN', 'GO',
+    'GOOD', 'HAS', 'HE', 'IT', 'JUST', 'KEY', 'LOW', 'MAN', 'NEW', 'NOW', 'ON', 'ONE', 'OPEN', 'OR', 'OUT',
+    'PLAY', 'REAL', 'RUN', 'SEE', 'SO', 'TV', 'TWO', 'UP', 'USA', 'WELL', 'YOLO'
+}
+
+_COMPANY_SUFFIXES = re.compile(
+    r"[,\.]?\s+(inc|incorporated|corp|corporation|co|company|ltd|limited|plc|holdings|group|sa|ag|nv|class [a-c])\.?$",
+    re.IGNORECASE
+)
+
+def company_aliases(company_name: str) -> List[str]:
+    """Returns the company name and its form without legal suffixes (e.g. 'NVIDIA Corp' -> 'NVIDIA')."""
+    if not company_name:
+        return []
+    aliases = {company_name.strip()}
+    stripped = company_name.strip()
+    while True:
+        shorter = _COMPANY_SUFFIXES.sub('', stripped).strip()
+        if shorter == stripped:
+            break
+        stripped = shorter
+    if len(stripped) >= 3:
+        aliases.add(stripped)
+    return sorted(aliases)
+
+class AhoCorasick:
+    """
+    A small Aho-Corasick automaton over lowercase strings. All patterns are found in
+    a single pass over the text, independent of how many patterns are registered.
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, object]]] = [[]]
+
+    def add(self, pattern: str, value: object):
+        """Adds a pattern; `value` is returned with every match of it."""
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        self._output[node].append((len(pattern), value))
+
+    def build(self):
+        """Computes failure links breadth-first. Must be called after the last add()."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def iter_matches(self, text: str) -> Iterable[Tuple[int, int, object]]:
+        """Yields (start, end, value) for every pattern occurrence in `text`."""
+        node = 0
+        for i, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for length, value in self._output[node]:
+                yield i - length + 1, i + 1, value
+
+def _is_boundary(text: str, index: int) -> bool:
+    return index < 0 or index >= len(text) or not (text[index].isalnum() or text[index] == '_')
+
+class RedditMentionScanner:
+    """
+    Scans each subreddit's hot feed once per time window and indexes the posts by
+    every watchlist symbol they mention.
+
+    Matching rules:
+    - Cashtags ('$NVDA') match case-insensitively for every symbol.
+    - Bare tickers ('NVDA') must be written in upper case, as a whole word, and are
+      ignored for tickers that are common words (see AMBIGUOUS_TICKERS).
+    - Company names ('Nvidia') match case-insensitively as whole words.
+    """
+
+    def __init__(self, subreddits: List[str], feed_limit: int = None, window_seconds: int = None, client=None):
+        """
+        Args:
+            subreddits: Subreddits whose hot feeds are scanned.
+            feed_limit: Posts pulled from each feed per window.
+            window_seconds: How long a pulled feed is reused before it is fetched again.
+            client: A PRAW client. Defaults to the shared client from reddit_utils.
+        """
+        self.subreddits = list(subreddits)
+        self.feed_limit = feed_limit or Config.REDDIT_FEED_LIMIT
+        self.window_seconds = window_seconds if window_seconds is not None else Config.REDDIT_SCAN_WINDOW_SECONDS
+        self.client = client or reddit_client
+        self._watchlist: Dict[str, set] = {}
+        self._posts: List[dict] = []
+        self._index: Dict[str, List[int]] = {}
+        self._fetched_at = 0.0
+        self._index_dirty = True
+        self._lock = threading.Lock()
+
+    def register(self, stock_symbol: str, company_names: Iterable[str] = ()):
+        """Adds a symbol (and optional company names) to the watchlist."""
+        symbol = stock_symbol.upper()
+        with self._lock:
+            names = self._watchlist.setdefault(symbol, set())
+            before = len(names)
+            for name in company_names:
+                names.update(company_aliases(name))
+            if symbol not in self._index or len(names) != before:
+                self._index_dirty = True
+
+    def register_watchlist(self, watchlist: Dict[str, Iterable[str]]):
+        """Registers many symbols at once, mapping each symbol to its company names."""
+        for symbol, names in watchlist.items():
+            self.register(symbol, names)
+
+    def _fetch_feeds(self):
+        print(f"Scanning Reddit hot feeds once for {len(self._watchlist)} symbol(s): {self.subreddits}...")
+        posts, seen = [], set()
+        for sub_name in self.subreddits:
+            hot_posts = guarded_call('reddit', lambda: list(self.client.subreddit(sub_name).hot(limit=self.feed_limit)))
+            for post in hot_posts:
+                if post.id in seen:
+                    continue
+                seen.add(post.id)
+                posts.append({
+                    'subreddit': sub_name,
+                    'title': post.title,
+                    'selftext': post.selftext or '',
+                    'score': post.score,
+                    'url': post.url
+                })
+        self._posts = posts
+        self._fetched_at = time.monotonic()
+        self._index_dirty = True
+        print(f"Fetched {len(posts)} posts from {len(self.subreddits)} subreddit(s).")
+
+    def _build_automaton(self) -> AhoCorasick:
+        automaton = AhoCorasick()
+        for symbol, names in self._watchlist.items():
+            lowered = symbol.lower()
+            automaton.add(f"${lowered}", (symbol, 'cashtag'))
+            if symbol not in AMBIGUOUS_TICKERS and len(symbol) >= 2:
+                automaton.add(lowered, (symbol, 'ticker'))
+            for name in names:
+                automaton.add(name.lower(), (symbol, 'name'))
+        automaton.build()
+        return automaton
+
+    def _match_symbols(self, automaton: AhoCorasick, text: str) -> set:
+        lowered = text.lower()
+        found = set()
+        for start, end, (symbol, kind) in automaton.iter_matches(lowered):
+            if symbol in found or not _is_boundary(lowered, end):
+                continue
+            if kind == 'cashtag':
+                if _is_boundary(lowered, start - 1):
+                    found.add(symbol)
+            elif _is_boundary(lowered, start - 1):
+                if kind == 'name' or text[start:end] == symbol:
+                    found.add(symbol)
+        return found
+
+    def _rebuild_index(self):
+        automaton = self._build_automaton()
+        index = defaultdict(list)
+        for position, post in enumerate(self._posts):
+            for symbol in self._match_symbols(automaton, f"{post['title']}\n{post['selftext']}"):
+                index[symbol].append(position)
+        self._index = {symbol: index.get(symbol, []) for symbol in self._watchlist}
+        self._index_dirty = False
+
+    def refresh(self, force: bool = False):
+        """Re-pulls the feeds if the window has expired, and re-indexes if anything changed."""
+        with self._lock:
+            if force or not self._posts or time.monotonic() - self._fetched_at >= self.window_seconds:
+                self._fetch_feeds()
+            if self._index_dirty:
+                self._rebuild_index()
+
+    def get_mentions(self, stock_symbol: str, limit: int = 10) -> pd.DataFrame:
+        """
+        Returns posts mentioning the symbol, in hot-feed order, with the same columns
+        as reddit_utils.get_reddit_sentiment.
+        """
+        self.register(stock_symbol)
+        self.refresh()
+        with self._lock:
+            positions = self._index.get(stock_symbol.upper(), [])[:limit]
+            rows = [{k: self._posts[p][k] for k in ('subreddit', 'title', 'score', 'url')} for p in positions]
+        return compact_frame(pd.DataFrame(rows))
+
+# One scanner per subreddit set, shared by every analyst in the process
+_scanners: Dict[Tuple[str, ...], RedditMentionScanner] = {}
+_scanners_lock = threading.Lock()
+
+def get_reddit_scanner(subreddits: List[str]) -> RedditMentionScanner:
+    """Returns the process-wide scanner for a set of subreddits."""
+    key = tuple(sorted(subreddits))
+    with _scanners_lock:
+        if key not in _scanners:
+            _scanners[key] = RedditMentionScanner(list(key))
+        return _scanners[key]
+
+def get_reddit_mentions(stock_symbol: str, subreddits: list, limit: int = 10) -> pd.DataFrame:
+    """
+    Fetches posts mentioning a stock symbol from the shared scanner, so a batch of
+    tickers costs one feed download per subreddit and window rather than one per ticker.
+
+    Returns:
+        A pandas DataFrame with relevant post titles and scores, or an empty DataFrame on error.
+    """
+    if not reddit_client:
+        print("PRAW client not initialized. Cannot fetch Reddit sentiment.")
+        return pd.DataFrame()
+    try:
+        posts_df = get_reddit_scanner(subreddits).get_mentions(stock_symbol, limit)
+        if posts_df.empty:
+            print(f"No posts found mentioning {stock_symbol}.")
+        else:
+            print(f"Found {len(posts_df)} relevant posts for {stock_symbol} in the scanned feeds.")
+        return posts_df
+    except Exception as e:
+        print(f"An error occurred while scanning Reddit: {e}")
+        return pd.DataFrame()
+
+if __name__ == '__main__':
+
+    automaton_demo = RedditMentionScanner(['stocks'], client=object())
+    automaton_demo.register_watchlist({'NVDA': ['NVIDIA Corp'], 'ON': ['ON Semiconductor Corp'], 'AAPL': ['Apple Inc']})
+    demo_text = "Thinking $on is cheap, NVDA earnings soon, and apple keeps going on and on."
+    print(automaton_demo._match_symbols(automaton_demo._build_automaton(), demo_text))
+
+    if reddit_client:
+        print(get_reddit_mentions("NVDA", ['stocks', 'wallstreetbets']))
@@ -5,6 +5,8 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 import praw
 import pandas as pd
 from config.default_config import Config
+from dataflows.circuit_breaker import guarded_call
+from dataflows.frame_schema import compact_frame
 
 # Reddit Client Initialization
 try:
@@ -14,7 +16,7 @@ try:
             client_id=os.getenv('REDDIT_CLIENT_ID'),
             client_secret=os.getenv('REDDIT_CLIENT_SECRET'),
             user_agent=os.getenv('REDDIT_USER_AGENT'),
-            timeout=30  # Increased timeout to 30 seconds to prevent read errors
+            timeout=int(Config.DATA_SOURCE_DEADLINES['reddit'] or 30)  # Socket timeout; the breaker deadline bounds the whole call
         )
     else:
         reddit_client = None
@@ -46,7 +48,8 @@ def get_reddit_sentiment(stock_symbol: str, subreddits: list, limit: int = 10) -
         for sub_name in subreddits:
             subreddit = reddit_client.subreddit(sub_name)
             # Search for the stock symbol in the top posts of the subreddit
-            for post in subreddit.hot(limit=limit * 5): # Fetch more to filter down
+            hot_posts = guarded_call('reddit', lambda: list(subreddit.hot(limit=limit * 5))) # Fetch more to filter down
+            for post in hot_posts:
                 if len(all_posts) >= limit:
                     break
                 if stock_symbol.lower() in post.title.lower() or stock_symbol.lower() in post.selftext.lower():
@@ -63,7 +66,7 @@ def get_reddit_sentiment(stock_symbol: str, subreddits: list, limit: int = 10) -
 
         posts_df = pd.DataFrame(all_posts)
         print(f"Successfully fetched {len(posts_df)} relevant posts from Reddit.")
-        return posts_df.head(limit)
+        return compact_frame(posts_df.head(limit))
 
     except Exception as e:
         print(f"An error occurred while fetching from Reddit: {e}")
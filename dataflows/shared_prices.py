@@ -0,0 +1,96 @@
+import sys
+import os
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Snapshots this process attached to, served by snapshot_utils.load_price_snapshot
+_attached: Dict[str, pd.DataFrame] = {}
+_attached_blocks: List[shared_memory.SharedMemory] = []
+
+class SharedPriceStore:
+    """
+    Publishes daily price snapshots into shared memory once, so the worker processes of
+    a batch read them in place instead of each loading the snapshot files (or receiving
+    pickled DataFrames) for every run. Each symbol is one block holding its date index
+    (int64 nanoseconds) followed by each numeric column as a contiguous array of its own
+    dtype, so float32 prices (see frame_schema.compact_prices) stay half the size.
+
+    The publishing process owns the blocks and must close() the store when the batch is
+    done; workers attach with attach_shared_prices(store.manifest).
+    """
+
+    def __init__(self):
+        self.manifest: Dict[str, Dict] = {}
+        self._blocks: List[shared_memory.SharedMemory] = []
+
+    def publish(self, snapshots: Dict[str, pd.DataFrame]) -> Dict[str, Dict]:
+        """
+        Copies each non-empty snapshot into its own shared block.
+
+        Returns:
+            The manifest (symbol -> block name, rows and (column, dtype) pairs) that workers attach with.
+        """
+        for symbol, snapshot in snapshots.items():
+            if snapshot.empty:
+                continue
+            numeric = snapshot.select_dtypes('number')
+            rows = len(numeric)
+            columns = [(column, numeric[column].dtype.str) for column in numeric.columns]
+            block = shared_memory.SharedMemory(create=True, size=max(1, _layout(rows, columns)[-1]))
+            self._blocks.append(block)
+            index, values = _views(block, rows, columns)
+            index[:] = pd.DatetimeIndex(numeric.index).as_unit('ns').asi8
+            for column, _ in columns:
+                values[column][:] = numeric[column].to_numpy()
+            self.manifest[symbol.upper()] = {"name": block.name, "rows": rows, "columns": columns}
+        total = sum(block.size for block in self._blocks)
+        print(f"Published {len(self.manifest)} price snapshot(s) to shared memory ({total / 1e6:.1f} MB).")
+        return self.manifest
+
+    def close(self):
+        """Releases and removes every published block."""
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks.clear()
+        self.manifest.clear()
+
+def _layout(rows: int, columns: List[Tuple[str, str]]) -> List[int]:
+    # Byte offsets of the index and each column (8-byte aligned), then the block size
+    offsets = [0, rows * 8]
+    for _, dtype in columns:
+        size = rows * np.dtype(dtype).itemsize
+        offsets.append(offsets[-1] + (size + 7) // 8 * 8)
+    return offsets
+
+def _views(block: shared_memory.SharedMemory, rows: int, columns: List[Tuple[str, str]]):
+    offsets = _layout(rows, columns)
+    index = np.ndarray((rows,), dtype=np.int64, buffer=block.buf)
+    values = {column: np.ndarray((rows,), dtype=dtype, buffer=block.buf, offset=offset)
+              for (column, dtype), offset in zip(columns, offsets[1:])}
+    return index, values
+
+def attach_shared_prices(manifest: Dict[str, Dict]):
+    """
+    Maps the published snapshots into this process as read-only DataFrames that share
+    the blocks' memory. Called once per worker, typically from the pool initializer.
+    """
+    for symbol, entry in manifest.items():
+        if symbol in _attached:
+            continue
+        block = shared_memory.SharedMemory(name=entry["name"])
+        _attached_blocks.append(block)
+        index, values = _views(block, entry["rows"], entry["columns"])
+        # Writes through a snapshot would show up in every worker, so the views are read-only
+        index.flags.writeable = False
+        for column in values.values():
+            column.flags.writeable = False
+        _attached[symbol] = pd.DataFrame(values, index=pd.DatetimeIndex(index.view('datetime64[ns]'), name='Date'),
+                                         copy=False)
+
+def shared_snapshot(stock_symbol: str) -> Optional[pd.DataFrame]:
+    """The attached snapshot of a symbol, or None when this process has none."""
+    return _attached.get(stock_symbol.upper())
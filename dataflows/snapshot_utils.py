@@ -0,0 +1,156 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import yfinance as yf
+import pandas as pd
+import pyarrow as pa
+from config.default_config import Config
+from dataflows.circuit_breaker import guarded_call
+from dataflows.shared_prices import shared_snapshot
+from dataflows.frame_schema import compact_prices
+
+# yfinance period strings mapped to calendar offsets
+_PERIOD_OFFSETS = {
+    'd': lambda n: pd.DateOffset(days=n),
+    'wk': lambda n: pd.DateOffset(weeks=n),
+    'mo': lambda n: pd.DateOffset(months=n),
+    'y': lambda n: pd.DateOffset(years=n),
+}
+
+def period_start(period: str, end_date: pd.Timestamp) -> pd.Timestamp:
+    """
+    Converts a yfinance-style period (e.g. '5d', '3mo', '1y', 'ytd', 'max') into the
+    first date of the window that ends on `end_date`.
+    """
+    if period == 'max':
+        return pd.Timestamp.min
+    if period == 'ytd':
+        return pd.Timestamp(year=end_date.year, month=1, day=1)
+    for suffix in ('wk', 'mo', 'd', 'y'):
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return end_date - _PERIOD_OFFSETS[suffix](int(period[:-len(suffix)]))
+    raise ValueError(f"Unsupported period: '{period}'")
+
+def _snapshot_path(stock_symbol: str) -> str:
+    return os.path.join(Config.SNAPSHOT_DIR, f"{stock_symbol.upper()}.arrow")
+
+def _legacy_snapshot_path(stock_symbol: str) -> str:
+    return os.path.join(Config.SNAPSHOT_DIR, f"{stock_symbol.upper()}.parquet")
+
+def _write_snapshot(stock_symbol: str, snapshot: pd.DataFrame):
+    # Uncompressed Arrow IPC, so readers can map the file instead of decoding it. The
+    # file is replaced rather than rewritten, as other processes may have it mapped.
+    path = _snapshot_path(stock_symbol)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    table = pa.Table.from_pandas(snapshot, preserve_index=True)
+    with pa.OSFile(temp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(temp_path, path)
+
+def load_price_snapshot(stock_symbol: str) -> pd.DataFrame:
+    """
+    Loads the locally stored daily price history for a symbol. The snapshot file is
+    memory-mapped and its columns are read-only views of the mapping, so loading it
+    copies nothing and processes on one host share its pages.
+
+    Returns:
+        A DataFrame indexed by date, or an empty DataFrame if no snapshot exists.
+        Batch workers get the read-only copy their parent published to shared memory.
+    """
+    shared = shared_snapshot(stock_symbol)
+    if shared is not None:
+        return shared
+    path = _snapshot_path(stock_symbol)
+    if not os.path.exists(path):
+        legacy_path = _legacy_snapshot_path(stock_symbol)
+        if not os.path.exists(legacy_path):
+            return pd.DataFrame()
+        # Convert a Parquet snapshot from before the compact schema once, keeping its
+        # write time since that is what ensure_price_snapshot judges freshness by
+        _write_snapshot(stock_symbol, compact_prices(pd.read_parquet(legacy_path)))
+        written_at = os.path.getmtime(legacy_path)
+        os.utime(path, (written_at, written_at))
+        os.remove(legacy_path)
+    return pa.ipc.open_file(pa.memory_map(path)).read_all().to_pandas(split_blocks=True)
+
+def ensure_price_snapshot(stock_symbol: str, through_date: str = None) -> pd.DataFrame:
+    """
+    Makes sure a full-history price snapshot exists locally and covers `through_date`.
+    The snapshot is (re)downloaded from Yahoo Finance only when it is missing or stale.
+
+    Args:
+        stock_symbol (str): The stock ticker symbol.
+        through_date (str): 'YYYY-MM-DD' date the snapshot must reach. Defaults to
+                            yesterday, the last completed trading session.
+
+    Returns:
+        The snapshot DataFrame, or an empty DataFrame if it could not be fetched.
+    """
+    # A shared snapshot was refreshed by the batch's parent process before publishing
+    shared = shared_snapshot(stock_symbol)
+    if shared is not None:
+        return shared
+    snapshot = load_price_snapshot(stock_symbol)
+    required = pd.Timestamp(through_date) if through_date else pd.Timestamp.now().normalize() - pd.Timedelta(days=1)
+    # A snapshot written after the required date is complete for it, even if the
+    # market was closed on that day, so the file time is the freshness marker.
+    if not snapshot.empty:
+        written_on = pd.Timestamp.fromtimestamp(os.path.getmtime(_snapshot_path(stock_symbol))).normalize()
+        if written_on > required:
+            return snapshot
+
+    print(f"Refreshing price snapshot for {stock_symbol}...")
+    try:
+        hist_data = guarded_call('yahoo', yf.Ticker(stock_symbol).history, period='max')
+        if hist_data.empty:
+            print(f"Warning: No price history available for '{stock_symbol}'.")
+            return snapshot
+        hist_data = compact_prices(hist_data)
+        os.makedirs(Config.SNAPSHOT_DIR, exist_ok=True)
+        _write_snapshot(stock_symbol, hist_data)
+        print(f"Saved price snapshot for {stock_symbol} ({len(hist_data)} rows).")
+        return hist_data
+    except Exception as e:
+        print(f"An error occurred while refreshing the snapshot for {stock_symbol}: {e}")
+        return snapshot
+
+def get_historical_data_as_of(stock_symbol: str, period: str, as_of_date: str) -> pd.DataFrame:
+    """
+    Returns the price window of length `period` ending on `as_of_date`, taken from the
+    local snapshot so no data after `as_of_date` can leak into the analysis.
+    """
+    snapshot = ensure_price_snapshot(stock_symbol, as_of_date)
+    if snapshot.empty:
+        return pd.DataFrame()
+    end = pd.Timestamp(as_of_date)
+    return snapshot[(snapshot.index >= period_start(period, end)) & (snapshot.index <= end)].copy()
+
+def get_forward_return(stock_symbol: str, as_of_date: str, horizon_days: int) -> float | None:
+    """
+    Computes the close-to-close return from the last trading day on or before
+    `as_of_date` to `horizon_days` trading days later.
+
+    Returns:
+        The fractional return, or None if the snapshot does not reach that far.
+    """
+    snapshot = load_price_snapshot(stock_symbol)
+    if snapshot.empty:
+        return None
+    closes = snapshot['Close'] if 'Close' in snapshot.columns else snapshot['close']
+    start_pos = closes.index.searchsorted(pd.Timestamp(as_of_date), side='right') - 1
+    end_pos = start_pos + horizon_days
+    if start_pos < 0 or end_pos >= len(closes):
+        return None
+    return float(closes.iloc[end_pos] / closes.iloc[start_pos] - 1.0)
+
+if __name__ == '__main__':
+
+    test_symbol = "AAPL"
+    window = get_historical_data_as_of(test_symbol, period="1mo", as_of_date="2024-06-28")
+    if not window.empty:
+        print(f"\n--- {test_symbol} as of 2024-06-28 (last 5 days) ---")
+        print(window.tail())
+        print(f"5-day forward return: {get_forward_return(test_symbol, '2024-06-28', 5)}")
+    else:
+        print(f"Could not build a snapshot for {test_symbol}.")
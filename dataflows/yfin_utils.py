@@ -1,31 +1,42 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import yfinance as yf
 import pandas as pd
+from dataflows.circuit_breaker import guarded_call
+from dataflows.frame_schema import compact_prices
 
-def get_historical_data(stock_symbol: str, period: str = "1y") -> pd.DataFrame:
+def get_historical_data(stock_symbol: str, period: str = "1y", end_date: str = None) -> pd.DataFrame:
     """
     Fetches historical market data for a given stock symbol from Yahoo Finance.
     
     Args:
         stock_symbol (str): The stock ticker symbol (e.g., 'NVDA').
         period (str): The time period for the data (e.g., '1d', '5d', '1mo', '1y', '5y', 'max').
+        end_date (str): Optional 'YYYY-MM-DD' date the period ends on. When set, the data
+                        is served from the local point-in-time snapshot instead.
         
     Returns:
-        A pandas DataFrame containing the historical data (OHLC, Volume),
-        or an empty DataFrame if the symbol is invalid or an error occurs.
+        A pandas DataFrame containing the historical data (OHLC, Volume) indexed by
+        session date (see frame_schema.compact_prices), or an empty DataFrame if the
+        symbol is invalid or an error occurs.
     """
+    if end_date:
+        from dataflows.snapshot_utils import get_historical_data_as_of
+        print(f"Loading '{period}' historical data for {stock_symbol} as of {end_date} from snapshot...")
+        return get_historical_data_as_of(stock_symbol, period, end_date)
+
     print(f"Fetching '{period}' historical data for {stock_symbol} from Yahoo Finance...")
     try:
         ticker = yf.Ticker(stock_symbol)
-        hist_data = ticker.history(period=period)
+        hist_data = guarded_call('yahoo', ticker.history, period=period)
         
         if hist_data.empty:
             print(f"Warning: No data found for symbol '{stock_symbol}'. It might be an invalid ticker.")
             return pd.DataFrame()
             
         print(f"Successfully fetched data for {stock_symbol}.")
-        # Ensure the index is just the date, not datetime, for cleaner merging later
-        hist_data.index = hist_data.index.date
-        return hist_data
+        return compact_prices(hist_data)
         
     except Exception as e:
         print(f"An error occurred while fetching data for {stock_symbol}: {e}")
@@ -1,9 +1,15 @@
 from langgraph.graph import StateGraph, END
 from functools import partial
+from typing import Callable, Dict
 
 from .state import AgentState
-from core.llm_interface import QwenLLM
-from core.embedding_interface import HuggingFaceEmbedding
+from core.llm_interface import LLMInterface, QwenLLM
+from core.llm_cascade import CascadeLLM, Validator, all_of, matches, min_length
+from core.llm_hedging import HedgedLLM
+from core.replay import RecordReplayLLM, RECORD, REPLAY
+from core.telemetry import instrument_node
+from core.deadline import bounded_node
+from core.embedding_interface import EmbeddingInterface, create_embedding_model
 from config.default_config import Config
 
 # Import all agents
@@ -13,64 +19,205 @@ from agents.analysts.market_analyst import run_market_analyst
 from agents.analysts.social_media_analyst import run_social_media_analyst
 from agents.researchers.bull_researcher import run_bull_researcher
 from agents.researchers.bear_researcher import run_bear_researcher
+from agents.researchers.debate_moderator import run_debate_moderator, should_continue_debate, CONTINUE_DEBATE, END_DEBATE
+from agents.managers.consensus_scorer import run_consensus_scorer, should_debate, should_debate_risk
 from agents.managers.research_manager import run_research_manager
 from agents.risk_mgmt.aggressive_debator import run_aggressive_debator
 from agents.risk_mgmt.conservative_debator import run_conservative_debator
 from agents.risk_mgmt.neutral_debator import run_neutral_debator  
+from agents.risk_mgmt.combined_debator import run_combined_risk_debate, PERSONAS
 from agents.managers.risk_manager import run_risk_manager
 
+# The model role of every node, used to route it to Config.LLM_ROLE_MODELS
+NODE_ROLES = {
+    "fundamentals_analyst": "analyst",
+    "news_analyst": "analyst",
+    "market_analyst": "analyst",
+    "social_media_analyst": "analyst",
+    "bull_researcher": "researcher",
+    "bear_researcher": "researcher",
+    "debate_moderator": "researcher",
+    "research_manager": "manager",
+    "aggressive_debator": "debator",
+    "conservative_debator": "debator",
+    "neutral_debator": "debator",
+    "risk_debate": "debator",
+    "risk_manager": "manager",
+    "portfolio_risk_manager": "manager"
+}
+
+# Checks a cascaded node's cheap answer must pass before it is accepted
+NODE_VALIDATORS: Dict[str, Validator] = {
+    "risk_manager": matches(r"^\W*(BUY|HOLD|SELL|AVOID)\b", "a leading BUY/HOLD/SELL/AVOID decision"),
+    "portfolio_risk_manager": matches(r'(?s)\{.*"\s*:\s*"\W*(BUY|HOLD|SELL|AVOID)\b.*\}', "a JSON object of per-symbol decisions"),
+    "research_manager": all_of(min_length(400), matches(r"final recommendation", "a Final Recommendation section")),
+    "risk_debate": matches(r'(?s)\{.*"aggressive".*"conservative".*"neutral".*\}', "a JSON object with all three takes")
+}
+DEFAULT_VALIDATOR = min_length(200)
+
+# Risk debate engines: three per-role calls, or one structured call for all three takes
+RISK_DEBATE_PER_ROLE = "per_role"
+RISK_DEBATE_COMBINED = "combined"
+
+# Key of the escalation model in the dict returned by create_role_llms
+ESCALATION = "escalation"
+
+def create_llm(model: str = None) -> LLMInterface:
+    """
+    Creates the configured LLM, hedged against tail latency when LLM_HEDGING is set.
+    With REPLAY_MODE=replay no live client is built, so the graph runs without an API
+    key or network access.
+
+    Args:
+        model (str): The model name. Defaults to Config.LLM_MODEL.
+    """
+    model = model or Config.LLM_MODEL
+    if Config.REPLAY_MODE == REPLAY:
+        return RecordReplayLLM(model_name=model)
+
+    llm = QwenLLM(
+        model=model,
+        api_key=Config.DASHSCOPE_API_KEY,
+        temperature=Config.LLM_TEMPERATURE,
+        top_p=Config.LLM_TOP_P,
+        max_tokens=Config.LLM_MAX_TOKENS
+    )
+    if Config.LLM_HEDGING:
+        llm = HedgedLLM(llm)
+    if Config.REPLAY_MODE == RECORD:
+        return RecordReplayLLM(llm)
+    return llm
+
+def create_role_llms(wrap: Callable[[LLMInterface], LLMInterface] = None) -> Dict[str, LLMInterface]:
+    """
+    Creates one LLM per distinct model in Config.LLM_ROLE_MODELS, plus the cascade
+    escalation model when Config.LLM_CASCADE_MODEL is set.
+
+    Args:
+        wrap: Optional decorator applied to each model, e.g. to add a response cache.
+
+    Returns:
+        A dict mapping each role (and ESCALATION, if enabled) to its LLM.
+    """
+    models = dict(Config.LLM_ROLE_MODELS)
+    if Config.LLM_CASCADE_MODEL:
+        models[ESCALATION] = Config.LLM_CASCADE_MODEL
+
+    by_model = {}
+    for model in models.values():
+        if model not in by_model:
+            by_model[model] = wrap(create_llm(model)) if wrap else create_llm(model)
+    return {role: by_model[model] for role, model in models.items()}
+
 class TradingAgentsGraph:
     """
     Master orchestrator for the multi-agent trading analysis workflow.
     """
     
-    def __init__(self):
-        """Initializes the models and the graph."""
+    def __init__(self, llm: LLMInterface = None, llms: Dict[str, LLMInterface] = None,
+                 embedding_model: EmbeddingInterface = None):
+        """
+        Initializes the models and the graph.
+        
+        Args:
+            llm (LLMInterface): Optional LLM to use for every node, bypassing role routing.
+            llms (Dict[str, LLMInterface]): Optional role-to-LLM mapping as returned by
+                                            create_role_llms(). Defaults to create_role_llms(),
+                                            which honours REPLAY_MODE.
+            embedding_model (EmbeddingInterface): Optional embedding model. Defaults to
+                                                  the EMBEDDING_BACKEND model, loaded on first use.
+        """
         print("Initializing Core Intelligence Engine...")
-        self.llm = QwenLLM(
-            model=Config.LLM_MODEL,
-            api_key=Config.DASHSCOPE_API_KEY,
-            temperature=Config.LLM_TEMPERATURE,
-            top_p=Config.LLM_TOP_P,
-            max_tokens=Config.LLM_MAX_TOKENS
-        )
-        self.embedding_model = HuggingFaceEmbedding(model_name=Config.EMBEDDING_MODEL)
+        if llm is not None:
+            self.llms = {role: llm for role in set(NODE_ROLES.values())}
+        else:
+            self.llms = llms or create_role_llms()
+        self._embedding_model = embedding_model
         print("Core Intelligence Engine Initialized.")
         
         self.workflow = StateGraph(AgentState)
         self.app = None
 
-    def build(self):
+    @property
+    def embedding_model(self) -> EmbeddingInterface:
+        """The embedding model, loaded on first use since only memory and debate convergence need it."""
+        if self._embedding_model is None:
+            self._embedding_model = create_embedding_model()
+        return self._embedding_model
+
+    def _embed_texts(self, texts):
+        return self.embedding_model.embed_documents(texts)
+
+    def llm_for(self, node_name: str) -> LLMInterface:
+        """
+        Returns the LLM for a node: its role's model, wrapped in a cascade that escalates
+        to the escalation model when the role is listed in Config.LLM_CASCADE_ROLES.
+        """
+        role = NODE_ROLES[node_name]
+        llm = self.llms[role]
+        escalation = self.llms.get(ESCALATION)
+        if escalation is None or escalation is llm or role not in Config.LLM_CASCADE_ROLES:
+            return llm
+        return CascadeLLM(llm, escalation, NODE_VALIDATORS.get(node_name, DEFAULT_VALIDATOR), name=node_name)
+
+    def build(self, risk_debate_mode: str = None, include_risk_manager: bool = True):
         """
         Constructs the graph by adding nodes and defining the edges between them.
+        
+        Args:
+            risk_debate_mode (str): 'per_role' runs the three risk debators as separate
+                                    nodes; 'combined' asks for all three takes in one
+                                    structured call and falls back to per-role calls if
+                                    it does not validate. Defaults to Config.RISK_DEBATE_MODE.
+            include_risk_manager (bool): When False, the graph ends after the risk debate so
+                                         a watchlist run can make all final decisions in
+                                         batches (see agents/managers/portfolio_risk_manager.py).
         """
-        print("Building the agent workflow graph...")
+        risk_debate_mode = risk_debate_mode or Config.RISK_DEBATE_MODE
+        if risk_debate_mode not in (RISK_DEBATE_PER_ROLE, RISK_DEBATE_COMBINED):
+            raise ValueError(f"Unknown risk debate mode: '{risk_debate_mode}'. Use 'per_role' or 'combined'.")
+        print(f"Building the agent workflow graph (risk debate: {risk_debate_mode})...")
         
         # Callable nodes for all agents
-        fundamentals_analyst_node = partial(run_fundamentals_analyst, llm=self.llm)
-        news_analyst_node = partial(run_news_analyst, llm=self.llm)
-        market_analyst_node = partial(run_market_analyst, llm=self.llm)
-        social_media_analyst_node = partial(run_social_media_analyst, llm=self.llm)
-        bull_researcher_node = partial(run_bull_researcher, llm=self.llm)
-        bear_researcher_node = partial(run_bear_researcher, llm=self.llm)
-        research_manager_node = partial(run_research_manager, llm=self.llm)
-        aggressive_debator_node = partial(run_aggressive_debator, llm=self.llm)
-        conservative_debator_node = partial(run_conservative_debator, llm=self.llm)
-        neutral_debator_node = partial(run_neutral_debator, llm=self.llm) # New node
-        risk_manager_node = partial(run_risk_manager, llm=self.llm)
+        fundamentals_analyst_node = partial(run_fundamentals_analyst, llm=self.llm_for("fundamentals_analyst"))
+        news_analyst_node = partial(run_news_analyst, llm=self.llm_for("news_analyst"))
+        market_analyst_node = partial(run_market_analyst, llm=self.llm_for("market_analyst"))
+        social_media_analyst_node = partial(run_social_media_analyst, llm=self.llm_for("social_media_analyst"))
+        bull_researcher_node = partial(run_bull_researcher, llm=self.llm_for("bull_researcher"))
+        bear_researcher_node = partial(run_bear_researcher, llm=self.llm_for("bear_researcher"))
+        debate_moderator_node = partial(run_debate_moderator, llm=self.llm_for("debate_moderator"), embed=self._embed_texts)
+        research_manager_node = partial(run_research_manager, llm=self.llm_for("research_manager"))
+        risk_manager_node = partial(run_risk_manager, llm=self.llm_for("risk_manager"))
+        
+        if risk_debate_mode == RISK_DEBATE_COMBINED:
+            # The fallback debators answer in prose, so they get their own nodes' models and checks
+            fallback_llms = {persona: self.llm_for(f"{persona}_debator") for persona, _, _ in PERSONAS}
+            risk_debate_node = partial(run_combined_risk_debate, llm=self.llm_for("risk_debate"), fallback_llms=fallback_llms)
+        else:
+            aggressive_debator_node = partial(run_aggressive_debator, llm=self.llm_for("aggressive_debator"))
+            conservative_debator_node = partial(run_conservative_debator, llm=self.llm_for("conservative_debator"))
+            neutral_debator_node = partial(run_neutral_debator, llm=self.llm_for("neutral_debator")) # New node
 
         # Add all agent nodes to the graph
-        self.workflow.add_node("fundamentals_analyst", fundamentals_analyst_node)
-        self.workflow.add_node("news_analyst", news_analyst_node)
-        self.workflow.add_node("market_analyst", market_analyst_node)
-        self.workflow.add_node("social_media_analyst", social_media_analyst_node)
-        self.workflow.add_node("bull_researcher", bull_researcher_node)
-        self.workflow.add_node("bear_researcher", bear_researcher_node)
-        self.workflow.add_node("research_manager", research_manager_node)
-        self.workflow.add_node("aggressive_debator", aggressive_debator_node)
-        self.workflow.add_node("conservative_debator", conservative_debator_node)
-        self.workflow.add_node("neutral_debator", neutral_debator_node) # New node added
-        self.workflow.add_node("risk_manager", risk_manager_node)
+        # Analysts are bounded by the run deadline; later nodes work with the reports that made it
+        self.workflow.add_node("fundamentals_analyst", instrument_node("fundamentals_analyst", bounded_node("fundamentals_analyst", fundamentals_analyst_node)))
+        self.workflow.add_node("news_analyst", instrument_node("news_analyst", bounded_node("news_analyst", news_analyst_node)))
+        self.workflow.add_node("market_analyst", instrument_node("market_analyst", bounded_node("market_analyst", market_analyst_node)))
+        self.workflow.add_node("social_media_analyst", instrument_node("social_media_analyst", bounded_node("social_media_analyst", social_media_analyst_node)))
+        self.workflow.add_node("consensus_scorer", instrument_node("consensus_scorer", run_consensus_scorer))
+        self.workflow.add_node("bull_researcher", instrument_node("bull_researcher", bull_researcher_node))
+        self.workflow.add_node("bear_researcher", instrument_node("bear_researcher", bear_researcher_node))
+        self.workflow.add_node("debate_moderator", instrument_node("debate_moderator", debate_moderator_node))
+        self.workflow.add_node("research_manager", instrument_node("research_manager", research_manager_node))
+        if include_risk_manager:
+            self.workflow.add_node("risk_manager", instrument_node("risk_manager", risk_manager_node))
+        
+        if risk_debate_mode == RISK_DEBATE_COMBINED:
+            self.workflow.add_node("risk_debate", instrument_node("risk_debate", risk_debate_node))
+        else:
+            self.workflow.add_node("aggressive_debator", instrument_node("aggressive_debator", aggressive_debator_node))
+            self.workflow.add_node("conservative_debator", instrument_node("conservative_debator", conservative_debator_node))
+            self.workflow.add_node("neutral_debator", instrument_node("neutral_debator", neutral_debator_node)) # New node added
         
         # Define the full workflow
         self.workflow.set_entry_point("fundamentals_analyst")
@@ -80,25 +227,47 @@ class TradingAgentsGraph:
         self.workflow.add_edge("news_analyst", "market_analyst")
         self.workflow.add_edge("market_analyst", "social_media_analyst")
         
-        # 2. Investment Debate Team runs
-        self.workflow.add_edge("social_media_analyst", "bull_researcher")
+        # 2. The consensus scorer reads the analysts' signals; unanimous names skip the debate.
+        #    Otherwise the Investment Debate Team runs up to MAX_DEBATE_ROUNDS bull/bear
+        #    rounds, stopping early once the moderator sees the positions converge
+        self.workflow.add_edge("social_media_analyst", "consensus_scorer")
+        self.workflow.add_conditional_edges(
+            "consensus_scorer",
+            should_debate,
+            {"debate": "bull_researcher", "skip": "research_manager"}
+        )
         self.workflow.add_edge("bull_researcher", "bear_researcher")
+        self.workflow.add_edge("bear_researcher", "debate_moderator")
+        self.workflow.add_conditional_edges(
+            "debate_moderator",
+            should_continue_debate,
+            {CONTINUE_DEBATE: "bull_researcher", END_DEBATE: "research_manager"}
+        )
         
-        # 3. Research Manager synthesizes the investment plan
-        self.workflow.add_edge("bear_researcher", "research_manager")
-        
-        # 4. Risk Management Team runs
-        self.workflow.add_edge("research_manager", "aggressive_debator")
-        self.workflow.add_edge("aggressive_debator", "conservative_debator")
-        self.workflow.add_edge("conservative_debator", "neutral_debator") # New edge
+        # 3. Research Manager synthesizes the investment plan (after the debate loop)
         
-        # 5. Risk Manager makes the final decision
-        self.workflow.add_edge("neutral_debator", "risk_manager") # New edge
+        # 4. Risk Management Team runs unless the consensus is strong enough to skip it,
+        #    then 5. the Risk Manager makes the final decision
+        last_node = "risk_manager" if include_risk_manager else END
+        first_risk_node = "risk_debate" if risk_debate_mode == RISK_DEBATE_COMBINED else "aggressive_debator"
+        self.workflow.add_conditional_edges(
+            "research_manager",
+            should_debate_risk,
+            {"debate": first_risk_node, "skip": last_node}
+        )
+        if risk_debate_mode == RISK_DEBATE_COMBINED:
+            self.workflow.add_edge("risk_debate", last_node)
+        else:
+            self.workflow.add_edge("aggressive_debator", "conservative_debator")
+            self.workflow.add_edge("conservative_debator", "neutral_debator") # New edge
+            self.workflow.add_edge("neutral_debator", last_node) # New edge
         
         # 6. End of the workflow
-        self.workflow.add_edge("risk_manager", END)
+        if include_risk_manager:
+            self.workflow.add_edge("risk_manager", END)
         
         print("Compiling graph...")
-        self.app = self.workflow.compile()
+        # Each debate round is three steps, so the step limit grows with the round limit
+        self.app = self.workflow.compile().with_config(recursion_limit=25 + 3 * Config.MAX_DEBATE_ROUNDS)
         print("Graph compiled successfully.")
         return self.app
@@ -1,25 +1,113 @@
 # graph/state.py
 
-from typing import TypedDict, List, Optional
+import time
+import operator
+from typing import Annotated, TypedDict, List, Optional, get_type_hints
+from config.default_config import Config
+
+def append_text(current: Optional[str], update: Optional[str]) -> str:
+    """Reducer for text that nodes extend, such as the risk debate transcript."""
+    return (current or "") + (update or "")
 
 class AgentState(TypedDict):
     """
     Defines the shared state for the trading agent graph. This TypedDict acts as the
     memory that is passed between all the nodes (agents) in the workflow.
+
+    Nodes return only the keys they change. Keys annotated with a reducer are
+    accumulated: a node returns just its new list items (or text), which LangGraph
+    appends, so no step copies what earlier nodes produced. All other keys are replaced.
     """
     stock_symbol: str
     
+    # Point-in-time date ('YYYY-MM-DD') for historical runs; None means "now"
+    as_of_date: Optional[str]
+    
+    # Wall-clock time (epoch seconds) by which the analysts must be done, or None for no
+    # bound, and the analyst nodes that missed it (their reports are absent)
+    deadline_ts: Optional[float]
+    missing_inputs: Annotated[List[str], operator.add]
+    
     # Data collected by analysts
-    analyst_reports: Optional[List[str]]
+    analyst_reports: Annotated[List[str], operator.add]
+    
+    # Analyst signals scored after the analyst team, and the debates they allow to skip
+    consensus: Optional[dict]
+    
+    # Bull/bear research debate: each side's latest argument, a rolling summary of
+    # earlier rounds, and per-round positions and similarity (kept for review, never prompted)
+    bull_case: Optional[str]
+    bear_case: Optional[str]
+    debate_summary: Optional[str]
+    debate_history: Annotated[List[dict], operator.add]
+    debate_converged: bool
     
     # Synthesized plans and decisions
     investment_plan: Optional[str]
-    risk_analysis: Optional[str]
+    risk_analysis: Annotated[Optional[str], append_text]
     final_trade_decision: Optional[str]
     
     # For managing debate rounds
     debate_rounds: int
     
     # A log of all actions taken for debugging and review
-    workflow_log: List[str]
+    workflow_log: Annotated[List[str], operator.add]
+    
+    # Structured per-node timing, token, cost and cache metrics (see core/telemetry.py)
+    node_metrics: Annotated[List[dict], operator.add]
+
 
+# The reducer of every accumulated key, as LangGraph reads it from the annotations
+REDUCERS = {
+    key: hint.__metadata__[0]
+    for key, hint in get_type_hints(AgentState, include_extras=True).items()
+    if hasattr(hint, '__metadata__')
+}
+
+def apply_update(state: AgentState, update: Optional[dict]) -> AgentState:
+    """
+    Folds a node's partial update into `state` the way the graph does: keys with a
+    reducer are accumulated, all other keys are replaced. Lets callers that stream
+    only the updates keep the full state without a second stream of every value.
+
+    Returns:
+        The same `state`, updated in place.
+    """
+    for key, value in (update or {}).items():
+        reducer = REDUCERS.get(key)
+        state[key] = reducer(state[key], value) if reducer and key in state else value
+    return state
+
+def create_initial_state(stock_symbol: str, as_of_date: Optional[str] = None, deadline_seconds: Optional[float] = None) -> AgentState:
+    """
+    Builds the empty state a workflow run starts from.
+    
+    Args:
+        stock_symbol (str): The stock symbol to analyze.
+        as_of_date (str): Optional 'YYYY-MM-DD' date to analyze the stock as of.
+        deadline_seconds (float): Time budget of the run from now. Defaults to
+                                  Config.RUN_DEADLINE_SECONDS; 0 means no deadline.
+        
+    Returns:
+        AgentState: A fresh state with all fields initialized.
+    """
+    deadline_seconds = Config.RUN_DEADLINE_SECONDS if deadline_seconds is None else deadline_seconds
+    return {
+        "stock_symbol": stock_symbol,
+        "as_of_date": as_of_date,
+        "deadline_ts": time.time() + deadline_seconds if deadline_seconds else None,
+        "missing_inputs": [],
+        "analyst_reports": [],
+        "consensus": None,
+        "bull_case": "",
+        "bear_case": "",
+        "debate_summary": "",
+        "debate_history": [],
+        "debate_converged": False,
+        "investment_plan": "",
+        "risk_analysis": "",
+        "final_trade_decision": "",
+        "debate_rounds": 0,
+        "workflow_log": [],
+        "node_metrics": []
+    }
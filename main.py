@@ -1,82 +1,165 @@
 import argparse
+from typing import List
 from graph.builder import TradingAgentsGraph
+from graph.state import create_initial_state, apply_update
+from config.default_config import Config
+from core.process_pool import forked_pool, inherited
+from agents.managers.portfolio_risk_manager import run_portfolio_risk_manager
+from agents.analysts.social_media_analyst import REDDIT_SUBREDDITS
+from dataflows.interface import DataInterface
+from core.telemetry import export_run_metrics
 from memory.memory_manager import MemoryManager 
 
+# The compiled graph of each watchlist worker process, built once by _init_watchlist_worker
+_worker_app = None
+
+def _init_watchlist_worker(risk_debate_mode: str):
+    """Builds one compiled graph per worker process around the embedding model inherited from the parent."""
+    global _worker_app
+    graph_builder = TradingAgentsGraph(embedding_model=inherited('embedding_model'))
+    _worker_app = graph_builder.build(risk_debate_mode=risk_debate_mode, include_risk_manager=False)
+
+def _analyze_in_worker(stock_symbol: str):
+    return _worker_app.invoke(create_initial_state(stock_symbol))
+
 def print_header(step_name: str):
     """Prints a standardized header for each step in the workflow."""
     print("\n" + "="*50)
     print(f"💼 Step: {step_name.replace('_', ' ').title()}")
     print("="*50)
 
-def main(stock_symbol: str):
+def run_single(stock_symbol: str, risk_debate_mode: str = None):
     """
-    The main entry point for the Qwen-Powered Trading Agents application.
-    This version streams the output and saves the final analysis to memory.
+    Analyzes one stock, streaming each node's output and saving the final analysis to memory.
     """
     print(f"--- Starting Analysis for Stock: {stock_symbol} ---")
     
     # 1. Initialize and build the graph
     graph_builder = TradingAgentsGraph()
-    app = graph_builder.build()
+    app = graph_builder.build(risk_debate_mode=risk_debate_mode)
     
     # Initialize the memory manager with the embedding model from the graph builder
     memory_manager = MemoryManager(embedding_model=graph_builder.embedding_model)
     
     # 2. Define the initial state for the workflow
-    initial_state = {
-        "stock_symbol": stock_symbol,
-        "analyst_reports": [],
-        "investment_plan": "",
-        "risk_analysis": "",
-        "final_trade_decision": "",
-        "debate_rounds": 0,
-        "workflow_log": []
-    }
+    initial_state = create_initial_state(stock_symbol)
     
     # 3. Stream the events and run the graph
     print("\n--- Running Workflow ---")
-    final_state = None
+    final_state = dict(initial_state)
     
-    for step in app.stream(initial_state):
-        node_name = list(step.keys())[0]
-        updated_state = list(step.values())[0]
+    # Nodes emit only what they changed; folding the updates rebuilds the full state
+    debate_round = 0
+    for chunk in app.stream(initial_state, stream_mode="updates"):
+        node_name, update = next(iter(chunk.items()))
+        apply_update(final_state, update)
         print_header(node_name)
-        if node_name in ["fundamentals_analyst", "news_analyst", "market_analyst", "social_media_analyst", "bull_researcher", "bear_researcher"]:
-            if updated_state['analyst_reports']:
-                print("Output:\n" + updated_state['analyst_reports'][-1])
+        if node_name in ["fundamentals_analyst", "news_analyst", "market_analyst", "social_media_analyst"]:
+            if update.get('analyst_reports'):
+                print("Output:\n" + update['analyst_reports'][-1])
+        elif node_name == "consensus_scorer":
+            consensus = update['consensus']
+            print(f"Signals: {consensus['signals']}; {consensus['direction']} strength {consensus['strength']:.2f}")
+        elif node_name in ["bull_researcher", "bear_researcher"]:
+            case = update.get('bull_case' if node_name == "bull_researcher" else 'bear_case')
+            if case:
+                print(f"Output (round {debate_round + 1}):\n" + case)
+        elif node_name == "debate_moderator":
+            debate_round = update['debate_rounds']
+            if update.get('debate_summary'):
+                print("Debate summary:\n" + update['debate_summary'])
         elif node_name == "research_manager":
-            if updated_state['investment_plan']:
-                 print("Output:\n" + updated_state['investment_plan'])
-        elif node_name in ["aggressive_debator", "conservative_debator", "neutral_debator"]:
-             if updated_state['risk_analysis']:
-                last_report = updated_state['risk_analysis'].split("###")[-1]
-                print(f"Output:\n###{last_report.strip()}")
+            if update.get('investment_plan'):
+                 print("Output:\n" + update['investment_plan'])
+        elif node_name in ["aggressive_debator", "conservative_debator", "neutral_debator", "risk_debate"]:
+            if update.get('risk_analysis'):
+                print("Output:\n" + update['risk_analysis'].strip())
         elif node_name == "risk_manager":
-            if updated_state['final_trade_decision']:
-                print("Output:\n" + updated_state['final_trade_decision'])
-        final_state = updated_state
+            if update.get('final_trade_decision'):
+                print("Output:\n" + update['final_trade_decision'])
 
     # Final Summary
     print_header("Workflow Finished")
-    if final_state:
-        print("--- Investment Plan ---")
-        print(final_state.get('investment_plan', "Not generated.") + "\n")
-        print("--- Risk Debate ---")
-        print(final_state.get('risk_analysis', "Not generated.") + "\n")
-        print("--- FINAL DECISION ---")
-        print(final_state.get('final_trade_decision', "Not generated."))
+    print("--- Investment Plan ---")
+    print((final_state.get('investment_plan') or "Not generated.") + "\n")
+    print("--- Risk Debate ---")
+    print((final_state.get('risk_analysis') or "Not generated.") + "\n")
+    print("--- FINAL DECISION ---")
+    print(final_state.get('final_trade_decision') or "Not generated.")
+    if final_state.get('missing_inputs'):
+        print(f"\n(Partial result: {', '.join(final_state['missing_inputs'])} missed the run deadline.)")
     
-    # 4. Save the final state to long-term memory
-    if final_state:
+    # 4. Save the final state to long-term memory and export the run's metrics
+    if final_state.get('final_trade_decision'):
         memory_manager.save_analysis(final_state)
+    export_run_metrics(final_state)
+    
+    print("\n" + "="*50)
+
+def run_watchlist(stock_symbols: List[str], risk_debate_mode: str = None, processes: int = None):
+    """
+    Analyzes several stocks. Each ticker runs the graph up to the risk debate, then the
+    portfolio risk manager makes all final decisions with one request per chunk of tickers.
+    With more than one process the tickers run in parallel in worker processes forked
+    after the embedding model and the Reddit feeds are loaded, so all workers share them.
+    """
+    processes = min(processes or Config.WATCHLIST_PROCESSES, len(stock_symbols))
+    print(f"--- Starting Watchlist Analysis for: {', '.join(stock_symbols)} ---")
+    
+    graph_builder = TradingAgentsGraph()
+    
+    # Let the shared Reddit scanner index the whole watchlist in its first pass
+    DataInterface().register_reddit_watchlist({symbol: [] for symbol in stock_symbols}, REDDIT_SUBREDDITS)
+    
+    states = []
+    if processes > 1:
+        print_header(f"Analyzing {len(stock_symbols)} Tickers in {processes} Processes")
+        # Pull the feeds once here; the workers inherit the scanner with the whole watchlist indexed
+        DataInterface().get_reddit_mentions(stock_symbols[0], REDDIT_SUBREDDITS)
+        shared = {'embedding_model': graph_builder.embedding_model}
+        with forked_pool(processes, _init_watchlist_worker, (risk_debate_mode,), shared=shared) as pool:
+            states = list(pool.map(_analyze_in_worker, stock_symbols))
+    else:
+        app = graph_builder.build(risk_debate_mode=risk_debate_mode, include_risk_manager=False)
+        for stock_symbol in stock_symbols:
+            print_header(f"Analyzing {stock_symbol}")
+            states.append(app.invoke(create_initial_state(stock_symbol)))
+    
+    print_header("Portfolio Risk Manager")
+    run_portfolio_risk_manager(states, graph_builder.llm_for("portfolio_risk_manager"),
+                               fallback_llm=graph_builder.llm_for("risk_manager"))
+    
+    print_header("Workflow Finished")
+    print("--- FINAL DECISIONS ---")
+    for state in states:
+        print(f"{state['stock_symbol']}: {state.get('final_trade_decision') or 'Not generated.'}")
+    
+    memory_manager = MemoryManager(embedding_model=graph_builder.embedding_model)
+    memory_manager.save_analyses_in_batches(states)
+    for state in states:
+        export_run_metrics(state)
     
     print("\n" + "="*50)
 
+def main(stock_symbols: List[str], risk_debate_mode: str = None, processes: int = None):
+    """
+    The main entry point for the Qwen-Powered Trading Agents application.
+    A single symbol streams its full workflow; several symbols run as a watchlist.
+    """
+    if len(stock_symbols) == 1:
+        run_single(stock_symbols[0], risk_debate_mode)
+    else:
+        run_watchlist(stock_symbols, risk_debate_mode, processes)
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run the Qwen-Powered Trading Agents.")
-    parser.add_argument("stock_symbol", type=str, help="The stock symbol to analyze (e.g., 'NVDA', 'TSLA').")
+    parser.add_argument("stock_symbols", type=str, nargs="+", help="One or more stock symbols to analyze (e.g., 'NVDA' 'TSLA').")
+    parser.add_argument("--risk-debate", choices=["per_role", "combined"], default=None,
+                        help="Risk debate engine. Defaults to RISK_DEBATE_MODE.")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="Worker processes for watchlist runs. Defaults to WATCHLIST_PROCESSES.")
     args = parser.parse_args()
     
-    main(args.stock_symbol)
+    main(args.stock_symbols, risk_debate_mode=args.risk_debate, processes=args.processes)
 
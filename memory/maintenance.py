@@ -0,0 +1,301 @@
+import sys
+import os
+import re
+import sqlite3
+import argparse
+from collections import Counter, defaultdict
+from datetime import datetime, timezone, timedelta
+from typing import List, Dict
+import pandas as pd
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from memory.memory_manager import MemoryManager
+from config.default_config import Config
+
+SECONDS_PER_DAY = 86400
+
+
+def _now_ts() -> int:
+    return int(datetime.now(timezone.utc).timestamp())
+
+
+def _record_type(record: Dict) -> str:
+    # Records written before maintenance existed carry no record_type; they are full analyses.
+    return record['metadata'].get('record_type', 'analysis')
+
+
+def _extract_section(document: str, heading: str) -> str:
+    """Returns the text under a '## heading' in a stored analysis document."""
+    match = re.search(rf"##\s*{re.escape(heading)}\s*\n(.*?)(?=\n\s*##\s|\Z)", document, re.DOTALL)
+    return match.group(1).strip() if match else ""
+
+
+def _records_frame(records: List[Dict], reason: str) -> pd.DataFrame:
+    return pd.DataFrame([
+        {
+            "id": r['id'],
+            "stock_symbol": r['metadata'].get('stock_symbol', 'UNKNOWN'),
+            "final_decision": r['metadata'].get('final_decision'),
+            "date_utc": r['metadata'].get('date_utc'),
+            "record_type": _record_type(r),
+            "document": r['document'],
+            "embedding": r.get('embedding'),
+            "archive_reason": reason
+        }
+        for r in records
+    ])
+
+
+def archive_records(records: List[Dict], archive_dir: str = None, reason: str = "retention") -> int:
+    """
+    Exports records to zstd-compressed Parquet files, partitioned by stock symbol.
+
+    Embeddings are exported alongside documents so archived data can be restored
+    into Chroma later without re-running the embedding model.
+
+    Args:
+        records (List[Dict]): Records as returned by MemoryManager.get_records.
+        archive_dir (str): Root of the archive. Defaults to Config.MEMORY_ARCHIVE_DIR.
+        reason (str): Why the records were archived; stored as a column.
+
+    Returns:
+        The number of records written.
+    """
+    if not records:
+        return 0
+    archive_dir = archive_dir or Config.MEMORY_ARCHIVE_DIR
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')
+    df = _records_frame(records, reason)
+
+    for symbol, group in df.groupby('stock_symbol'):
+        partition_dir = os.path.join(archive_dir, f"stock_symbol={symbol}")
+        os.makedirs(partition_dir, exist_ok=True)
+        path = os.path.join(partition_dir, f"{reason}-{stamp}.parquet")
+        group.drop(columns=['stock_symbol']).to_parquet(path, compression='zstd', index=False)
+        print(f"Archived {len(group)} record(s) for {symbol} to {path}")
+
+    return len(df)
+
+
+def select_expired_records(records: List[Dict], retention_days: int, max_per_symbol: int, now_ts: int = None) -> List[Dict]:
+    """
+    Applies the retention policy: records older than `retention_days` expire, and of
+    the remaining records only the newest `max_per_symbol` per symbol are kept.
+    """
+    now_ts = now_ts or _now_ts()
+    cutoff = now_ts - retention_days * SECONDS_PER_DAY
+
+    by_symbol = defaultdict(list)
+    for r in records:
+        by_symbol[r['metadata'].get('stock_symbol', 'UNKNOWN')].append(r)
+
+    expired = []
+    for symbol_records in by_symbol.values():
+        symbol_records.sort(key=lambda r: r['metadata'].get('date_utc', 0), reverse=True)
+        kept = 0
+        for r in symbol_records:
+            if r['metadata'].get('date_utc', 0) < cutoff or kept >= max_per_symbol:
+                expired.append(r)
+            else:
+                kept += 1
+    return expired
+
+
+def build_rollup_records(records: List[Dict]) -> List[Dict]:
+    """
+    Condenses full analyses into one summary record per symbol and calendar month.
+
+    Each summary keeps the dated decision line of every analysis it replaces and an
+    excerpt of the most recent investment plan, which is what later queries use.
+    """
+    groups = defaultdict(list)
+    for r in records:
+        meta = r['metadata']
+        month = datetime.fromtimestamp(meta.get('date_utc', 0), tz=timezone.utc).strftime('%Y-%m')
+        groups[(meta.get('stock_symbol', 'UNKNOWN'), month)].append(r)
+
+    rollups = []
+    for (symbol, month), group in sorted(groups.items()):
+        group.sort(key=lambda r: r['metadata'].get('date_utc', 0))
+        decision_lines = []
+        for r in group:
+            day = datetime.fromtimestamp(r['metadata'].get('date_utc', 0), tz=timezone.utc).strftime('%Y-%m-%d')
+            decision = _extract_section(r['document'], "Final Decision") or r['metadata'].get('final_decision', '')
+            decision_lines.append(f"- {day}: {' '.join(decision.split())[:300]}")
+
+        latest_plan = _extract_section(group[-1]['document'], "Investment Plan")
+        decisions = Counter(r['metadata'].get('final_decision', '') for r in group)
+
+        document = "\n".join([
+            f"# Rolled-up Analyses for: {symbol}",
+            f"# Period: {month} ({len(group)} analyses)",
+            "## Decisions",
+            *decision_lines,
+            "## Latest Investment Plan (excerpt)",
+            latest_plan[:1500]
+        ])
+        rollups.append({
+            "id": f"{symbol}_rollup_{month.replace('-', '')}_{group[-1]['id']}",
+            "document": document,
+            "metadata": {
+                "stock_symbol": symbol,
+                "final_decision": decisions.most_common(1)[0][0],
+                "date_utc": group[-1]['metadata'].get('date_utc', 0),
+                "record_type": "rollup",
+                "period": month,
+                "source_count": len(group)
+            }
+        })
+    return rollups
+
+
+def rollup_old_analyses(memory_manager: MemoryManager, older_than_days: int, dry_run: bool = False) -> int:
+    """
+    Replaces full analyses older than `older_than_days` with monthly summaries.
+    The originals are archived to Parquet before they are deleted.
+
+    Returns:
+        The number of analyses that were rolled up.
+    """
+    cutoff = _now_ts() - older_than_days * SECONDS_PER_DAY
+    candidates = [
+        r for r in memory_manager.get_records(where={"date_utc": {"$lt": cutoff}}, include_embeddings=True)
+        if _record_type(r) == 'analysis'
+    ]
+    if not candidates:
+        print("Roll-up: no analyses old enough to condense.")
+        return 0
+
+    rollups = build_rollup_records(candidates)
+    print(f"Roll-up: condensing {len(candidates)} analyses into {len(rollups)} summaries.")
+    if dry_run:
+        return len(candidates)
+
+    archive_records(candidates, reason="rollup")
+    memory_manager.add_records(rollups)
+    memory_manager.delete_records([r['id'] for r in candidates])
+    return len(candidates)
+
+
+def apply_retention(memory_manager: MemoryManager, retention_days: int, max_per_symbol: int, dry_run: bool = False) -> int:
+    """
+    Archives and removes records that fall outside the retention policy.
+
+    Returns:
+        The number of records removed from Chroma.
+    """
+    records = memory_manager.get_records(include_embeddings=True)
+    expired = select_expired_records(records, retention_days, max_per_symbol)
+    print(f"Retention: {len(expired)} of {len(records)} record(s) fall outside the policy.")
+    if dry_run or not expired:
+        return len(expired)
+
+    archive_records(expired, reason="retention")
+    memory_manager.delete_records([r['id'] for r in expired])
+    return len(expired)
+
+
+def _write_compaction_backup(records: List[Dict], persist_path: str) -> str:
+    """
+    Writes the live records next to the store, replacing the previous backup, so only
+    the copy from the latest compaction is kept and the archive holds no live records.
+    """
+    path = f"{os.path.normpath(persist_path)}-compaction-backup.parquet"
+    partial_path = f"{path}.partial"
+    _records_frame(records, "compaction-backup").to_parquet(partial_path, compression='zstd', index=False)
+    os.replace(partial_path, path)
+    return path
+
+
+def compact_collection(memory_manager: MemoryManager, deleted: int = None, backup: bool = None, dry_run: bool = False):
+    """
+    Rebuilds the collection so the HNSW index only contains live vectors, then
+    vacuums the SQLite file to return the space freed by deletions.
+
+    Deleted vectors are only marked as such inside the HNSW segment, so without a
+    rebuild the index files keep growing even when the record count is bounded.
+
+    Args:
+        deleted (int): Records deleted since the last compaction. Nothing is done when
+                       this is 0; None means unknown and always rebuilds.
+        backup (bool): Write the live records to a single backup file beside the store
+                       first. Defaults to Config.MEMORY_COMPACTION_BACKUP.
+    """
+    if deleted == 0:
+        print("Compaction: no records were deleted, skipping the rebuild.")
+        return
+    backup = Config.MEMORY_COMPACTION_BACKUP if backup is None else backup
+
+    records = memory_manager.get_records(include_embeddings=True)
+    print(f"Compaction: rebuilding index with {len(records)} live record(s).")
+    if dry_run:
+        return
+
+    if backup:
+        print(f"Compaction: live records backed up to {_write_compaction_backup(records, memory_manager.persist_path)}")
+    memory_manager.rebuild_collection(records)
+
+    sqlite_path = os.path.join(memory_manager.persist_path, "chroma.sqlite3")
+    if os.path.exists(sqlite_path):
+        try:
+            conn = sqlite3.connect(sqlite_path, isolation_level=None)
+            conn.execute("VACUUM")
+            conn.close()
+            print("Compaction: SQLite store vacuumed.")
+        except sqlite3.Error as e:
+            print(f"Compaction: VACUUM skipped. Error: {e}")
+
+
+def _directory_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    return total
+
+
+def run_maintenance(memory_manager: MemoryManager, rollup_after_days: int = None, retention_days: int = None,
+                    max_per_symbol: int = None, compact: bool = True, force_compact: bool = False,
+                    dry_run: bool = False):
+    """
+    Runs the full maintenance cycle: roll-up, retention (with archival) and compaction.
+    Compaction only rebuilds the index when this run deleted records, unless `force_compact` is set.
+    """
+    rollup_after_days = rollup_after_days if rollup_after_days is not None else Config.MEMORY_ROLLUP_AFTER_DAYS
+    retention_days = retention_days if retention_days is not None else Config.MEMORY_RETENTION_DAYS
+    max_per_symbol = max_per_symbol if max_per_symbol is not None else Config.MEMORY_MAX_RECORDS_PER_SYMBOL
+
+    size_before = _directory_size(memory_manager.persist_path)
+    print(f"--- Memory Maintenance (store size: {size_before / 1e6:.1f} MB) ---")
+
+    rolled_up = rollup_old_analyses(memory_manager, rollup_after_days, dry_run=dry_run)
+    removed = apply_retention(memory_manager, retention_days, max_per_symbol, dry_run=dry_run)
+    if compact:
+        compact_collection(memory_manager, deleted=None if force_compact else rolled_up + removed, dry_run=dry_run)
+
+    size_after = _directory_size(memory_manager.persist_path)
+    print(f"--- Maintenance Complete: {rolled_up} rolled up, {removed} removed, "
+          f"store size {size_before / 1e6:.1f} MB -> {size_after / 1e6:.1f} MB ---")
+
+
+if __name__ == '__main__':
+    from core.embedding_interface import create_embedding_model
+
+    parser = argparse.ArgumentParser(description="Apply retention, roll-up, archival and compaction to long-term memory.")
+    parser.add_argument("--rollup-after-days", type=int, default=None, help="Condense analyses older than this many days.")
+    parser.add_argument("--retention-days", type=int, default=None, help="Archive and delete records older than this many days.")
+    parser.add_argument("--max-per-symbol", type=int, default=None, help="Maximum live records kept per stock symbol.")
+    parser.add_argument("--no-compact", action="store_true", help="Skip the index rebuild and SQLite VACUUM.")
+    parser.add_argument("--force-compact", action="store_true", help="Rebuild the index even if this run deleted nothing.")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without modifying the store.")
+    args = parser.parse_args()
+
+    manager = MemoryManager(embedding_model=create_embedding_model())
+    run_maintenance(
+        manager,
+        rollup_after_days=args.rollup_after_days,
+        retention_days=args.retention_days,
+        max_per_symbol=args.max_per_symbol,
+        compact=not args.no_compact,
+        force_compact=args.force_compact,
+        dry_run=args.dry_run
+    )
@@ -2,8 +2,7 @@ import sys
 import os
 import chromadb
 from datetime import datetime, timezone
-from typing import List
-import chromadb.utils.embedding_functions as embedding_functions # Wrapper
+from typing import List, Dict
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from core.embedding_interface import EmbeddingInterface
@@ -14,28 +13,39 @@ class MemoryManager:
     """
     Manages the long-term memory of the trading agent system using ChromaDB.
     """
-    def __init__(self, embedding_model: EmbeddingInterface):
+    COLLECTION_NAME = "trading_analyses"
+
+    def __init__(self, embedding_model: EmbeddingInterface, persist_path: str = None):
         """
         Initializes the MemoryManager.
+
+        Args:
+            embedding_model (EmbeddingInterface): The model used to embed stored analyses.
+            persist_path (str): Directory of the ChromaDB store. Defaults to Config.CHROMA_DB_PATH.
         """
         print("Initializing Memory Manager...")
-        self.client = chromadb.PersistentClient(path="./chroma_db")
+        self.persist_path = persist_path or Config.CHROMA_DB_PATH
+        self.client = chromadb.PersistentClient(path=self.persist_path)
         self.embedding_model = embedding_model
 
-        chroma_embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name=self.embedding_model.model_name 
-        )
-        
+        # Vectors come from the injected model and are passed to Chroma explicitly. The
+        # collection is opened without an embedding function, so stores persisted with
+        # Chroma's sentence_transformer function open without a conflict.
         self.collection = self.client.get_or_create_collection(
-            name="trading_analyses",
-            embedding_function=chroma_embedding_function
+            name=self.COLLECTION_NAME,
+            embedding_function=None
         )
         print("Memory Manager initialized successfully.")
 
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        return self.embedding_model.embed_documents(texts)
+
     def _format_analysis_for_storage(self, state: AgentState) -> str:
         all_reports = "\n\n---\n\n".join(state.get('analyst_reports', []))
         risk_debate = state.get('risk_analysis', 'No risk debate was conducted.')
         investment_plan = state.get('investment_plan', 'No investment plan was generated.')
+        bull_case = state.get('bull_case') or 'No bull case was made.'
+        bear_case = state.get('bear_case') or 'No bear case was made.'
         final_decision = state.get('final_trade_decision', 'No final decision was made.')
         
         return f"""
@@ -45,38 +55,59 @@ class MemoryManager:
         {final_decision}
         ## Investment Plan
         {investment_plan}
+        ## Research Debate
+        ### Bull Case
+        {bull_case}
+        ### Bear Case
+        {bear_case}
         ## Risk Debate
         {risk_debate}
         ## Analyst Reports
         {all_reports}
         """.strip()
 
-    def save_analysis(self, state: AgentState):
+    def save_analysis(self, state: AgentState, record_id: str = None) -> bool:
+        """
+        Stores a finished analysis. With a `record_id` the record is upserted, so saving
+        the same analysis again (e.g. a retried queue job) replaces it instead of adding a copy.
+
+        Returns:
+            True if the analysis was stored; False if it was skipped or the write failed.
+        """
         if not state.get('final_trade_decision'):
             print("Memory Manager: Skipping save, as no final decision was reached.")
-            return
+            return False
 
         print("--- Saving Single Analysis to Long-Term Memory ---")
         document_to_store = self._format_analysis_for_storage(state)
-        record_id = f"{state['stock_symbol']}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        write = self.collection.upsert if record_id else self.collection.add
+        record_id = record_id or f"{state['stock_symbol']}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
         
         metadata = {
             "stock_symbol": state['stock_symbol'],
             "final_decision": state['final_trade_decision'].split(':')[0].strip(),
-            "date_utc": int(datetime.now(timezone.utc).timestamp())
+            "date_utc": int(datetime.now(timezone.utc).timestamp()),
+            "record_type": "analysis"
         }
         
         try:
-            self.collection.add(
+            write(
                 documents=[document_to_store],
+                embeddings=self._embed([document_to_store]),
                 metadatas=[metadata],
                 ids=[record_id]
             )
             print(f"Successfully saved analysis for {state['stock_symbol']} with ID: {record_id}")
+            return True
         except Exception as e:
             print(f"Memory Manager: Failed to save analysis to ChromaDB. Error: {e}")
+            return False
 
     def save_analyses_in_batches(self, states: List[AgentState], batch_size: int = 100):
+        decided = [state for state in states if state.get('final_trade_decision')]
+        if len(decided) < len(states):
+            print(f"Memory Manager: Skipping {len(states) - len(decided)} analyses, as no final decision was reached.")
+        states = decided
         print(f"--- Starting Batch Save of {len(states)} Analyses ---")
         for i in range(0, len(states), batch_size):
             batch = states[i:i + batch_size]
@@ -87,13 +118,14 @@ class MemoryManager:
                 {
                     "stock_symbol": state['stock_symbol'],
                     "final_decision": state['final_trade_decision'].split(':')[0].strip(),
-                    "date_utc": int(datetime.now(timezone.utc).timestamp())
+                    "date_utc": int(datetime.now(timezone.utc).timestamp()),
+                    "record_type": "analysis"
                 } for state in batch
             ]
             ids = [f"{state['stock_symbol']}_{datetime.now().strftime('%Y%m%d%H%M%S')}_{j}" for j, state in enumerate(batch)]
             
             try:
-                self.collection.add(documents=documents, metadatas=metadatas, ids=ids)
+                self.collection.add(documents=documents, embeddings=self._embed(documents), metadatas=metadatas, ids=ids)
                 print(f"Successfully saved batch {i//batch_size + 1}.")
             except Exception as e:
                 print(f"Memory Manager: Failed to save batch. Error: {e}")
@@ -103,7 +135,7 @@ class MemoryManager:
     def query_memory(self, query_text: str, n_results: int = 2):
         print(f"\n--- Querying Memory for: '{query_text}' ---")
         try:
-            results = self.collection.query(query_texts=[query_text], n_results=n_results)
+            results = self.collection.query(query_embeddings=self._embed([query_text]), n_results=n_results)
             if not results or not results.get('documents'):
                 print("No relevant memories found.")
                 return
@@ -111,3 +143,88 @@ class MemoryManager:
                 print(f"\n--- Result {i+1} ---\n{doc[:500]}...")
         except Exception as e:
             print(f"Memory Manager: Failed to query memory. Error: {e}")
+
+    # Maintenance Helpers
+
+    def get_records(self, where: dict = None, include_embeddings: bool = False, page_size: int = 500) -> List[Dict]:
+        """
+        Reads stored records page by page so large collections never load in a single call.
+
+        Args:
+            where (dict): Optional Chroma metadata filter.
+            include_embeddings (bool): Whether to return the stored vectors as well.
+            page_size (int): Number of records fetched per request.
+
+        Returns:
+            A list of dictionaries with 'id', 'document', 'metadata' and optionally 'embedding'.
+        """
+        include = ["documents", "metadatas"] + (["embeddings"] if include_embeddings else [])
+        records = []
+        offset = 0
+        while True:
+            page = self.collection.get(where=where, include=include, limit=page_size, offset=offset)
+            ids = page.get('ids') or []
+            for i, record_id in enumerate(ids):
+                record = {
+                    "id": record_id,
+                    "document": page['documents'][i],
+                    "metadata": page['metadatas'][i] or {}
+                }
+                if include_embeddings:
+                    record["embedding"] = [float(x) for x in page['embeddings'][i]]
+                records.append(record)
+            if len(ids) < page_size:
+                break
+            offset += page_size
+        return records
+
+    def delete_records(self, ids: List[str], batch_size: int = 500):
+        """Deletes records by ID in batches."""
+        for i in range(0, len(ids), batch_size):
+            self.collection.delete(ids=ids[i:i + batch_size])
+
+    def add_records(self, records: List[Dict], batch_size: int = 100):
+        """
+        Adds records in batches. Records that carry an 'embedding' are stored with it,
+        so re-adding archived or compacted data does not re-run the embedding model; the
+        others are embedded here.
+        """
+        for i in range(0, len(records), batch_size):
+            batch = records[i:i + batch_size]
+            kwargs = {
+                "ids": [r['id'] for r in batch],
+                "documents": [r['document'] for r in batch],
+                "metadatas": [r['metadata'] for r in batch]
+            }
+            missing = [r['document'] for r in batch if r.get('embedding') is None]
+            vectors = iter(self._embed(missing) if missing else [])
+            kwargs["embeddings"] = [r['embedding'] if r.get('embedding') is not None else next(vectors) for r in batch]
+            self.collection.add(**kwargs)
+
+    def rebuild_collection(self, records: List[Dict]):
+        """
+        Replaces the collection with a fresh one holding only `records`.
+
+        The new collection is filled under a temporary name and only swapped in once
+        every record was added, so a failure leaves the current collection untouched.
+        """
+        staging_name = f"{self.COLLECTION_NAME}_rebuild"
+        try:
+            # Left over from an interrupted rebuild
+            self.client.delete_collection(name=staging_name)
+        except Exception:
+            pass
+
+        live = self.collection
+        self.collection = self.client.create_collection(name=staging_name, embedding_function=None)
+        try:
+            self.add_records(records)
+            if self.collection.count() != len(records):
+                raise RuntimeError(f"rebuilt collection holds {self.collection.count()} of {len(records)} record(s)")
+        except Exception:
+            self.collection = live
+            self.client.delete_collection(name=staging_name)
+            raise
+
+        self.client.delete_collection(name=self.COLLECTION_NAME)
+        self.collection.modify(name=self.COLLECTION_NAME)
@@ -0,0 +1,301 @@
+import sys
+import os
+import json
+import time
+import uuid
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.default_config import Config
+from graph.builder import TradingAgentsGraph
+from graph.state import create_initial_state, apply_update
+from core.telemetry import export_run_metrics
+from core.single_flight import get_single_flight
+from memory.memory_manager import MemoryManager
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# How a submitted request was served
+NEW = "new"
+COALESCED = "coalesced"
+CACHED = "cached"
+
+
+class AnalysisJob:
+    """
+    One graph run. Progress events are kept in order so that any number of clients can
+    follow the run from the start, including clients that attach after it has finished.
+    """
+
+    def __init__(self, stock_symbol: str, as_of_date: Optional[str] = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.stock_symbol = stock_symbol
+        self.as_of_date = as_of_date
+        self.status = QUEUED
+        self.created = time.time()
+        self.finished = None
+        self.result = None
+        self.error = None
+        self.events = []
+        self._changed = threading.Condition()
+
+    @property
+    def key(self) -> Tuple[str, Optional[str]]:
+        return (self.stock_symbol, self.as_of_date)
+
+    def publish(self, event: Dict):
+        with self._changed:
+            self.events.append({"time": time.time(), **event})
+            self._changed.notify_all()
+
+    def finish(self, status: str, result: Dict = None, error: str = None):
+        with self._changed:
+            self.status, self.result, self.error = status, result, error
+            self.finished = time.time()
+            self.events.append({"time": self.finished, "event": status, **({"error": error} if error else {})})
+            self._changed.notify_all()
+
+    def follow(self, heartbeat_seconds: float = 15.0) -> Iterator[Dict]:
+        """Yields every event of the run, blocking for new ones until it finishes. None is a heartbeat."""
+        position = 0
+        while True:
+            with self._changed:
+                if position == len(self.events) and self.finished is None:
+                    self._changed.wait(heartbeat_seconds)
+                new_events = self.events[position:]
+                finished = self.finished is not None
+            position += len(new_events)
+            if not new_events and not finished:
+                yield None
+            yield from new_events
+            if finished and position == len(self.events):
+                return
+
+    def to_dict(self, include_result: bool = True) -> Dict:
+        info = {
+            "job_id": self.id,
+            "stock_symbol": self.stock_symbol,
+            "as_of_date": self.as_of_date,
+            "status": self.status,
+            "created": self.created,
+            "finished": self.finished,
+            "error": self.error
+        }
+        if include_result and self.result is not None:
+            info["result"] = self.result
+        return info
+
+
+class AnalysisService:
+    """
+    Keeps one compiled graph, its models and the memory store warm for the lifetime of
+    the process. Concurrent requests for the same symbol share one run, and a finished
+    run answers identical requests until Config.SERVICE_RESULT_TTL_SECONDS has passed.
+    """
+
+    def __init__(self, graph_builder: TradingAgentsGraph = None, memory_manager: MemoryManager = None,
+                 risk_debate_mode: str = None, max_concurrent_runs: int = None, result_ttl_seconds: int = None):
+        """
+        Args:
+            graph_builder (TradingAgentsGraph): Optional graph builder. Defaults to one with the configured models.
+            memory_manager (MemoryManager): Optional memory store. Defaults to the configured ChromaDB store.
+            risk_debate_mode (str): Risk debate engine of the compiled graph.
+            max_concurrent_runs (int): Graph runs executed at once.
+            result_ttl_seconds (int): How long a finished result answers identical requests.
+        """
+        print("--- Starting Analysis Service ---")
+        self.graph_builder = graph_builder or TradingAgentsGraph()
+        self.app = self.graph_builder.build(risk_debate_mode=risk_debate_mode)
+        self.memory_manager = memory_manager or MemoryManager(embedding_model=self.graph_builder.embedding_model)
+        self.result_ttl_seconds = Config.SERVICE_RESULT_TTL_SECONDS if result_ttl_seconds is None else result_ttl_seconds
+
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_runs or Config.SERVICE_MAX_CONCURRENT_RUNS)
+        self._lock = threading.Lock()
+        self._memory_lock = threading.Lock()
+        self._jobs: Dict[str, AnalysisJob] = {}
+        self._in_flight: Dict[Tuple, AnalysisJob] = {}
+        self._results: Dict[Tuple, AnalysisJob] = {}
+        print("Analysis Service ready.")
+
+    def submit(self, stock_symbol: str, as_of_date: Optional[str] = None) -> Tuple[AnalysisJob, str]:
+        """
+        Returns the job that answers a request and how it was served: NEW (a run was
+        started), COALESCED (joined an identical run in progress) or CACHED (a recent
+        identical run finished successfully).
+        """
+        job = AnalysisJob(stock_symbol.strip().upper(), as_of_date)
+        with self._lock:
+            self._evict_expired()
+            if job.key in self._results:
+                return self._results[job.key], CACHED
+            if job.key in self._in_flight:
+                return self._in_flight[job.key], COALESCED
+            self._jobs[job.id] = job
+            self._in_flight[job.key] = job
+        job.publish({"event": QUEUED})
+        self._executor.submit(self._run, job)
+        return job, NEW
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._evict_expired()
+            stats = {"runs_in_flight": len(self._in_flight), "cached_results": len(self._results), "jobs": len(self._jobs)}
+        flight = get_single_flight()
+        stats["data_fetches_saved"] = sum(counts["saved"] for counts in flight.stats().values())
+        # Bounded to the most recently used keys (DATA_SINGLE_FLIGHT_MAX_KEYS)
+        stats["data_fetches_saved_by_key"] = {str(key): counts["saved"] for key, counts in flight.key_stats().items() if counts["saved"]}
+        return stats
+
+    def _evict_expired(self):
+        # Caller holds self._lock
+        cutoff = time.time() - self.result_ttl_seconds
+        for job_id, job in list(self._jobs.items()):
+            if job.finished is not None and job.finished < cutoff:
+                del self._jobs[job_id]
+                if self._results.get(job.key) is job:
+                    del self._results[job.key]
+
+    def _run(self, job: AnalysisJob):
+        print(f"--- Service: analyzing {job.stock_symbol} (job {job.id}) ---")
+        job.status = RUNNING
+        job.publish({"event": RUNNING})
+        try:
+            initial_state = create_initial_state(job.stock_symbol, as_of_date=job.as_of_date)
+            final_state = dict(initial_state)
+            for chunk in self.app.stream(initial_state, stream_mode="updates"):
+                # Each node's update carries only the log lines it added
+                node_name, update = next(iter(chunk.items()))
+                apply_update(final_state, update)
+                job.publish({"event": "node", "node": node_name, "log": update.get('workflow_log') or []})
+
+            with self._memory_lock:
+                self.memory_manager.save_analysis(final_state)
+            export_run_metrics(final_state)
+            job.finish(DONE, result=final_state)
+        except Exception as e:
+            print(f"Service: Analysis of {job.stock_symbol} failed. Error: {e}")
+            job.finish(FAILED, error=str(e))
+        finally:
+            with self._lock:
+                del self._in_flight[job.key]
+                # Only successful runs answer later requests; a failure is retried on the next one
+                if job.status == DONE:
+                    self._results[job.key] = job
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON API of the analysis service:
+
+        POST /analyses                {"symbol": "NVDA", "as_of_date": null}  -> job (add ?stream=1 to follow it)
+        GET  /analyses/<job_id>       -> job status and, once done, the final state
+        GET  /analyses/<job_id>/events -> progress as newline-delimited JSON until the run ends
+        GET  /health                  -> service statistics
+    """
+    service: AnalysisService = None
+
+    def _send_json(self, status: int, body: Dict):
+        payload = json.dumps(body, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _stream_events(self, job: AnalysisJob, served: str = None):
+        # HTTP/1.0 response without a length: the body ends when the connection closes
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        try:
+            if served:
+                self.wfile.write((json.dumps({"event": "accepted", "served": served, **job.to_dict(include_result=False)}) + "\n").encode('utf-8'))
+            for event in job.follow():
+                line = json.dumps(event if event is not None else {"event": "heartbeat"}, default=str)
+                self.wfile.write((line + "\n").encode('utf-8'))
+                self.wfile.flush()
+            if job.result is not None:
+                self.wfile.write((json.dumps({"event": "result", "result": job.result}, default=str) + "\n").encode('utf-8'))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def do_GET(self):
+        parts = [p for p in urlparse(self.path).path.split('/') if p]
+        if parts == ["health"]:
+            return self._send_json(200, {"status": "ok", **self.service.stats()})
+        if len(parts) in (2, 3) and parts[0] == "analyses":
+            job = self.service.get(parts[1])
+            if job is None:
+                return self._send_json(404, {"error": f"Unknown job '{parts[1]}'."})
+            if len(parts) == 2:
+                return self._send_json(200, job.to_dict())
+            if parts[2] == "events":
+                return self._stream_events(job)
+        self._send_json(404, {"error": f"Unknown path '{self.path}'."})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path.rstrip('/') != "/analyses":
+            return self._send_json(404, {"error": f"Unknown path '{self.path}'."})
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b'{}')
+            symbol = body.get("symbol") if isinstance(body, dict) else None
+            if not isinstance(symbol, str) or not symbol.strip():
+                raise ValueError("'symbol' must be a non-empty string.")
+        except ValueError as e:
+            return self._send_json(400, {"error": f"Expected a JSON body like {{\"symbol\": \"NVDA\"}}. {e}"})
+
+        job, served = self.service.submit(symbol, body.get("as_of_date"))
+        if parse_qs(url.query).get("stream", ["0"])[0] in ("1", "true"):
+            return self._stream_events(job, served)
+        self._send_json(200 if served == CACHED else 202, {"served": served, **job.to_dict()})
+
+    def log_message(self, format, *args):
+        print(f"Service: {self.address_string()} {format % args}")
+
+
+def serve(host: str = None, port: int = None, service: AnalysisService = None) -> ThreadingHTTPServer:
+    """
+    Creates the HTTP server for a (warm) analysis service. Call serve_forever() on the result.
+    """
+    handler = type("BoundAnalysisRequestHandler", (AnalysisRequestHandler,), {"service": service or AnalysisService()})
+    server = ThreadingHTTPServer((host or Config.SERVICE_HOST, port or Config.SERVICE_PORT), handler)
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve trading analyses over a local HTTP API with warm models.")
+    parser.add_argument("--host", default=None, help="Bind address. Defaults to SERVICE_HOST.")
+    parser.add_argument("--port", type=int, default=None, help="Port. Defaults to SERVICE_PORT.")
+    parser.add_argument("--risk-debate", choices=["per_role", "combined"], default=None,
+                        help="Risk debate engine. Defaults to RISK_DEBATE_MODE.")
+    args = parser.parse_args()
+
+    analysis_service = AnalysisService(risk_debate_mode=args.risk_debate)
+    server = serve(args.host, args.port, analysis_service)
+    print(f"Analysis Service listening on http://{server.server_address[0]}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Shutting down...")
+    finally:
+        server.server_close()
+        analysis_service.shutdown()
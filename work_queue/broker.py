@@ -0,0 +1,77 @@
+import sys
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.default_config import Config
+
+# Job states
+QUEUED = "queued"
+LEASED = "leased"
+DONE = "done"
+DEAD = "dead"
+
+class Broker(ABC):
+    """
+    Abstract Base Class for work-queue brokers.
+
+    A job is one analysis, identified by (symbol, as-of date), and is delivered at least
+    once: a worker leases it for a visibility timeout, and a lease that is neither
+    completed nor extended in time makes the job available to another worker. Failed
+    jobs are retried with a delay until they run out of attempts and are dead-lettered.
+    Jobs are plain dicts with the keys id, symbol, as_of_date, status, attempts,
+    max_attempts, lease_owner, lease_expires, last_error, result, created_at, updated_at.
+    """
+
+    @abstractmethod
+    def enqueue(self, symbol: str, as_of_date: Optional[str] = None, max_attempts: int = None) -> Dict:
+        """
+        Adds a job unless the same (symbol, as-of date) is already queued or leased.
+
+        Returns:
+            A dict with the job 'id' and 'created' (False when an existing job was reused).
+        """
+
+    @abstractmethod
+    def lease(self, worker_id: str, visibility_timeout: float = None) -> Optional[Dict]:
+        """Claims the next available job for `worker_id`, or returns None if there is none."""
+
+    @abstractmethod
+    def extend_lease(self, job_id: int, worker_id: str, visibility_timeout: float = None) -> bool:
+        """Pushes back a held lease's expiry. Returns False if the worker no longer holds it."""
+
+    @abstractmethod
+    def complete(self, job_id: int, worker_id: str, result: Dict = None) -> bool:
+        """Marks a leased job done and stores its result. Returns False if the lease was lost."""
+
+    @abstractmethod
+    def fail(self, job_id: int, worker_id: str, error: str) -> str:
+        """Records a failed attempt. Returns the job's new status: QUEUED (retried later) or DEAD."""
+
+    @abstractmethod
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status."""
+
+    @abstractmethod
+    def list_jobs(self, status: str = None, limit: int = 50) -> List[Dict]:
+        """The most recently updated jobs, optionally of one status."""
+
+    @abstractmethod
+    def requeue_dead(self) -> int:
+        """Moves every dead-lettered job back to the queue with fresh attempts. Returns the count."""
+
+def create_broker(name: str = None, path: str = None) -> Broker:
+    """
+    Creates the configured broker. Only 'sqlite' ships with the repo; another backend
+    implements Broker and is added here.
+
+    Args:
+        name (str): Broker backend. Defaults to Config.QUEUE_BROKER.
+        path (str): Location of the SQLite database. Defaults to Config.QUEUE_DB_PATH.
+    """
+    name = name or Config.QUEUE_BROKER
+    if name == 'sqlite':
+        from work_queue.sqlite_broker import SQLiteBroker
+        return SQLiteBroker(path or Config.QUEUE_DB_PATH)
+    raise ValueError(f"Unknown queue broker: '{name}'. Use 'sqlite'.")
@@ -0,0 +1,63 @@
+import sys
+import os
+import argparse
+from datetime import datetime
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from work_queue.broker import create_broker, DEAD
+
+def enqueue(args):
+    broker = create_broker(args.broker, args.db)
+    for symbol in args.symbols:
+        job = broker.enqueue(symbol, as_of_date=args.as_of, max_attempts=args.max_attempts)
+        print(f"{symbol.upper()}: {'queued as' if job['created'] else 'already pending as'} job {job['id']}")
+
+def worker(args):
+    from work_queue.worker import QueueWorker
+    queue_worker = QueueWorker(create_broker(args.broker, args.db), worker_id=args.worker_id,
+                               risk_debate_mode=args.risk_debate, visibility_timeout=args.visibility_timeout)
+    queue_worker.run(drain=args.drain, max_jobs=args.max_jobs)
+
+def status(args):
+    broker = create_broker(args.broker, args.db)
+    if args.requeue_dead:
+        print(f"Re-queued {broker.requeue_dead()} dead-lettered job(s).")
+    counts = broker.counts()
+    print("  ".join(f"{state}: {count}" for state, count in counts.items()))
+    jobs = broker.list_jobs(args.list, args.limit) if args.list else broker.list_jobs(DEAD, args.limit)
+    for job in jobs:
+        updated = datetime.fromtimestamp(job['updated_at']).strftime('%Y-%m-%d %H:%M:%S')
+        outcome = (job['result'] or {}).get('final_trade_decision') or job['last_error'] or job['lease_owner'] or ''
+        print(f"#{job['id']:<6} {job['symbol']:<8} {job['as_of_date'] or 'live':<10} {job['status']:<7} "
+              f"{job['attempts']}/{job['max_attempts']}  {updated}  {outcome[:80]}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Distribute analyses across worker processes through a durable queue.")
+    parser.add_argument("--broker", default=None, help="Broker backend. Defaults to QUEUE_BROKER.")
+    parser.add_argument("--db", default=None, help="Queue database path. Defaults to QUEUE_DB_PATH.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue_parser = commands.add_parser("enqueue", help="Add analyses to the queue (skipping symbols already pending).")
+    enqueue_parser.add_argument("symbols", nargs="+", help="Stock symbols to analyze.")
+    enqueue_parser.add_argument("--as-of", default=None, help="Optional 'YYYY-MM-DD' date to analyze as of.")
+    enqueue_parser.add_argument("--max-attempts", type=int, default=None, help="Attempts before dead-lettering. Defaults to QUEUE_MAX_ATTEMPTS.")
+    enqueue_parser.set_defaults(handler=enqueue)
+
+    worker_parser = commands.add_parser("worker", help="Run a worker that leases and processes jobs.")
+    worker_parser.add_argument("--worker-id", default=None, help="Lease owner name. Defaults to host:pid.")
+    worker_parser.add_argument("--drain", action="store_true", help="Exit when the queue is empty instead of polling.")
+    worker_parser.add_argument("--max-jobs", type=int, default=None, help="Exit after this many jobs.")
+    worker_parser.add_argument("--visibility-timeout", type=float, default=None, help="Lease length in seconds.")
+    worker_parser.add_argument("--risk-debate", choices=["per_role", "combined"], default=None,
+                               help="Risk debate engine. Defaults to RISK_DEBATE_MODE.")
+    worker_parser.set_defaults(handler=worker)
+
+    status_parser = commands.add_parser("status", help="Show job counts and recent jobs (dead-lettered by default).")
+    status_parser.add_argument("--list", choices=["queued", "leased", "done", "dead"], default=None, help="Status of the jobs to list.")
+    status_parser.add_argument("--limit", type=int, default=20, help="Jobs to list.")
+    status_parser.add_argument("--requeue-dead", action="store_true", help="Move dead-lettered jobs back to the queue first.")
+    status_parser.set_defaults(handler=status)
+
+    args = parser.parse_args()
+    args.handler(args)
@@ -0,0 +1,194 @@
+import sys
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.default_config import Config
+from work_queue.broker import Broker, QUEUED, LEASED, DONE, DEAD
+
+_COLUMNS = ("id", "symbol", "as_of_date", "status", "attempts", "max_attempts", "lease_owner",
+            "lease_expires", "last_error", "result", "created_at", "updated_at")
+
+class SQLiteBroker(Broker):
+    """
+    Broker backed by one SQLite file. Leases are claimed inside an immediate (write-locked)
+    transaction, so any number of worker processes on one machine, or on machines that
+    share the file over a filesystem with working locks, never lease the same job twice.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                symbol TEXT NOT NULL,
+                as_of_date TEXT,
+                dedup_key TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                available_at REAL NOT NULL,
+                lease_owner TEXT,
+                lease_expires REAL,
+                last_error TEXT,
+                result TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS jobs_pending_dedup ON jobs (dedup_key) WHERE status IN ('queued', 'leased');
+            CREATE INDEX IF NOT EXISTS jobs_status_available ON jobs (status, available_at);
+        """)
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections cannot be shared across threads, so each thread opens its own.
+        # Autocommit mode; multi-statement updates use explicit BEGIN IMMEDIATE transactions.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        return conn
+
+    @staticmethod
+    def _job(row) -> Dict:
+        job = dict(zip(_COLUMNS, row))
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def enqueue(self, symbol: str, as_of_date: Optional[str] = None, max_attempts: int = None) -> Dict:
+        symbol = symbol.strip().upper()
+        dedup_key = f"{symbol}@{as_of_date or 'live'}"
+        now = time.time()
+        conn = self._transaction()
+        try:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO jobs (symbol, as_of_date, dedup_key, status, max_attempts, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (symbol, as_of_date, dedup_key, QUEUED, max_attempts or Config.QUEUE_MAX_ATTEMPTS, now, now, now)
+            )
+            if cursor.rowcount:
+                job_id, created = cursor.lastrowid, True
+            else:
+                job_id = conn.execute("SELECT id FROM jobs WHERE dedup_key = ? AND status IN (?, ?)", (dedup_key, QUEUED, LEASED)).fetchone()[0]
+                created = False
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return {"id": job_id, "created": created}
+
+    def lease(self, worker_id: str, visibility_timeout: float = None) -> Optional[Dict]:
+        visibility_timeout = visibility_timeout or Config.QUEUE_VISIBILITY_TIMEOUT_SECONDS
+        now = time.time()
+        conn = self._transaction()
+        try:
+            # A lease that expired on its last attempt means the worker died mid-run every time
+            conn.execute(
+                "UPDATE jobs SET status = ?, lease_owner = NULL, updated_at = ?, "
+                "last_error = COALESCE(last_error, 'lease expired') "
+                "WHERE status = ? AND lease_expires <= ? AND attempts >= max_attempts",
+                (DEAD, now, LEASED, now)
+            )
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE (status = ? AND available_at <= ?) OR (status = ? AND lease_expires <= ?) "
+                "ORDER BY available_at, id LIMIT 1",
+                (QUEUED, now, LEASED, now)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, lease_owner = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (LEASED, worker_id, now + visibility_timeout, now, row[0])
+            )
+            job = self._job(conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?", (row[0],)).fetchone())
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return job
+
+    def extend_lease(self, job_id: int, worker_id: str, visibility_timeout: float = None) -> bool:
+        visibility_timeout = visibility_timeout or Config.QUEUE_VISIBILITY_TIMEOUT_SECONDS
+        now = time.time()
+        cursor = self._connection().execute(
+            "UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+            (now + visibility_timeout, now, job_id, LEASED, worker_id)
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker_id: str, result: Dict = None) -> bool:
+        cursor = self._connection().execute(
+            "UPDATE jobs SET status = ?, lease_owner = NULL, lease_expires = NULL, result = ?, updated_at = ? "
+            "WHERE id = ? AND status = ? AND lease_owner = ?",
+            (DONE, json.dumps(result, default=str) if result is not None else None, time.time(), job_id, LEASED, worker_id)
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: int, worker_id: str, error: str) -> str:
+        now = time.time()
+        conn = self._transaction()
+        try:
+            row = conn.execute("SELECT attempts, max_attempts FROM jobs WHERE id = ? AND status = ? AND lease_owner = ?",
+                               (job_id, LEASED, worker_id)).fetchone()
+            if row is None:
+                # The lease was lost, so the job's fate belongs to the worker now holding it
+                conn.execute("COMMIT")
+                return conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+            attempts, max_attempts = row
+            status = DEAD if attempts >= max_attempts else QUEUED
+            # Exponential backoff between attempts
+            delay = Config.QUEUE_RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1)
+            conn.execute(
+                "UPDATE jobs SET status = ?, lease_owner = NULL, lease_expires = NULL, last_error = ?, available_at = ?, updated_at = ? WHERE id = ?",
+                (status, error, now + delay, now, job_id)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return status
+
+    def counts(self) -> Dict[str, int]:
+        counts = {status: 0 for status in (QUEUED, LEASED, DONE, DEAD)}
+        counts.update(dict(self._connection().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()))
+        return counts
+
+    def list_jobs(self, status: str = None, limit: int = 50) -> List[Dict]:
+        query = f"SELECT {', '.join(_COLUMNS)} FROM jobs"
+        params = ()
+        if status:
+            query, params = query + " WHERE status = ?", (status,)
+        rows = self._connection().execute(query + " ORDER BY updated_at DESC LIMIT ?", params + (limit,)).fetchall()
+        return [self._job(row) for row in rows]
+
+    def requeue_dead(self) -> int:
+        now = time.time()
+        conn = self._transaction()
+        try:
+            # Only the latest dead job per symbol is revived, and none whose symbol was enqueued again meanwhile
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, attempts = 0, available_at = ?, updated_at = ? "
+                "WHERE id IN (SELECT MAX(id) FROM jobs WHERE status = ? GROUP BY dedup_key) "
+                "AND dedup_key NOT IN (SELECT dedup_key FROM jobs WHERE status IN (?, ?))",
+                (QUEUED, now, now, DEAD, QUEUED, LEASED)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return cursor.rowcount
@@ -0,0 +1,129 @@
+import sys
+import os
+import socket
+import signal
+import threading
+from typing import Dict
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.default_config import Config
+from graph.builder import TradingAgentsGraph
+from graph.state import AgentState, create_initial_state
+from core.telemetry import export_run_metrics
+from memory.memory_manager import MemoryManager
+from work_queue.broker import Broker
+
+def summarize_result(state: AgentState) -> Dict:
+    """The part of a finished run stored on the job; the full analysis goes to MemoryManager."""
+    return {
+        "final_trade_decision": state.get('final_trade_decision'),
+        "investment_plan": state.get('investment_plan'),
+        "missing_inputs": state.get('missing_inputs') or [],
+        "consensus": state.get('consensus')
+    }
+
+class QueueWorker:
+    """
+    Drains a work queue with one warm graph and memory store. While a job runs, a
+    heartbeat thread keeps extending its lease, so the visibility timeout only expires
+    when the worker itself has died or hung.
+    """
+
+    def __init__(self, broker: Broker, worker_id: str = None, graph_builder: TradingAgentsGraph = None,
+                 memory_manager: MemoryManager = None, risk_debate_mode: str = None, visibility_timeout: float = None):
+        """
+        Args:
+            broker (Broker): The queue to drain.
+            worker_id (str): Lease owner name. Defaults to '<host>:<pid>'.
+            graph_builder (TradingAgentsGraph): Optional graph builder. Defaults to one with the configured models.
+            memory_manager (MemoryManager): Optional memory store that receives every finished analysis.
+            risk_debate_mode (str): Risk debate engine of the compiled graph.
+            visibility_timeout (float): Lease length in seconds. Defaults to Config.QUEUE_VISIBILITY_TIMEOUT_SECONDS.
+        """
+        self.broker = broker
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.visibility_timeout = visibility_timeout or Config.QUEUE_VISIBILITY_TIMEOUT_SECONDS
+        self.graph_builder = graph_builder or TradingAgentsGraph()
+        self.app = self.graph_builder.build(risk_debate_mode=risk_debate_mode)
+        self.memory_manager = memory_manager or MemoryManager(embedding_model=self.graph_builder.embedding_model)
+        self._stopping = threading.Event()
+
+    def stop(self, *_):
+        """Finishes the current job, then exits the loop (also bound to SIGINT/SIGTERM by run())."""
+        print(f"Worker {self.worker_id}: stopping after the current job...")
+        self._stopping.set()
+
+    def _heartbeat(self, job_id: int, done: threading.Event):
+        while not done.wait(self.visibility_timeout / 3):
+            if not self.broker.extend_lease(job_id, self.worker_id, self.visibility_timeout):
+                print(f"Worker {self.worker_id}: lost the lease on job {job_id}.")
+                return
+
+    def process(self, job: Dict) -> bool:
+        """
+        Runs one leased job and reports the outcome to the broker. Returns True on success.
+
+        The analysis is written back before the job is completed, and a failed write-back
+        fails the job so it is retried. The record ID is derived from the job, so a
+        repeated write-back (a retry, or a worker that lost its lease) replaces the
+        earlier record instead of adding a copy.
+        """
+        label = job['symbol'] + (f" as of {job['as_of_date']}" if job['as_of_date'] else "")
+        print(f"--- Worker {self.worker_id}: job {job['id']} {label} (attempt {job['attempts']}/{job['max_attempts']}) ---")
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job['id'], done), daemon=True)
+        heartbeat.start()
+        try:
+            final_state = self.app.invoke(create_initial_state(job['symbol'], as_of_date=job['as_of_date']))
+            if not final_state.get('final_trade_decision'):
+                raise RuntimeError("the run ended without a final trade decision")
+            record_id = f"{job['symbol']}@{job['as_of_date'] or 'latest'}@{job['id']}"
+            if not self.memory_manager.save_analysis(final_state, record_id=record_id):
+                raise RuntimeError("the analysis could not be written to memory")
+        except Exception as e:
+            done.set()
+            status = self.broker.fail(job['id'], self.worker_id, str(e))
+            print(f"Worker {self.worker_id}: job {job['id']} failed ({e}); now {status}.")
+            return False
+        done.set()
+        if not self.broker.complete(job['id'], self.worker_id, summarize_result(final_state)):
+            print(f"Worker {self.worker_id}: job {job['id']} finished after its lease was lost; another worker owns it.")
+            return False
+
+        try:
+            export_run_metrics(final_state)
+        except Exception as e:
+            print(f"Worker {self.worker_id}: could not export the metrics of job {job['id']}. Error: {e}")
+        print(f"Worker {self.worker_id}: job {job['id']} done: {final_state['final_trade_decision']}")
+        return True
+
+    def run(self, drain: bool = False, poll_seconds: float = None, max_jobs: int = None) -> int:
+        """
+        Leases and processes jobs until stopped.
+
+        Args:
+            drain (bool): Exit once the queue has nothing available instead of polling.
+            poll_seconds (float): Wait between polls of an empty queue.
+            max_jobs (int): Exit after this many jobs.
+
+        Returns:
+            The number of jobs processed.
+        """
+        poll_seconds = poll_seconds or Config.QUEUE_POLL_SECONDS
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, self.stop)
+            signal.signal(signal.SIGTERM, self.stop)
+
+        print(f"Worker {self.worker_id}: waiting for jobs...")
+        processed = 0
+        while not self._stopping.is_set() and (max_jobs is None or processed < max_jobs):
+            job = self.broker.lease(self.worker_id, self.visibility_timeout)
+            if job is None:
+                if drain:
+                    break
+                self._stopping.wait(poll_seconds)
+                continue
+            self.process(job)
+            processed += 1
+        print(f"Worker {self.worker_id}: exiting after {processed} job(s).")
+        return processed